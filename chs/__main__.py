@@ -2,6 +2,7 @@
 
 import sys
 import os
+import time
 from chs.utils.core import Colors, Levels
 
 
@@ -28,6 +29,18 @@ def is_version_command(arg):
     arg == '-v'
   )
 
+def is_bench_command(arg):
+  return arg == 'bench'
+
+def is_selfplay_command(arg):
+  return arg == 'selfplay'
+
+def is_analyze_command(arg):
+  return arg == 'analyze'
+
+def is_trace_summary_command(arg):
+  return arg == 'trace-summary'
+
 def get_level_from_args(args):
   lvl = [arg for arg in args if "--level" in arg]
   if lvl:
@@ -55,15 +68,139 @@ def get_player_from_args(args):
     return chess.BLACK
   return chess.WHITE
 
+def get_profile_startup_from_args(args):
+  return '--profile-startup' in args
+
+def get_ponder_from_args(args):
+  return '--ponder' in args
+
+def get_book_from_args(args):
+  from chs.engine.book import OpeningBook
+  path = get_flag_from_args(args, 'book', os.environ.get('CHS_BOOK_PATH'))
+  if not path:
+    return None
+  try:
+    return OpeningBook(path)
+  except (OSError, ValueError):
+    print("Warning: Could not open opening book '{}', playing without it.".format(path), file=sys.stderr)
+    return None
+
+def get_time_control_from_args(args):
+  from chs.client.clock import parse_time_control
+  time_control = [arg for arg in args if "--time-control" in arg]
+  if not time_control:
+    return None
+  try:
+    return parse_time_control(time_control[0].split('=', 1)[1])
+  except (IndexError, ValueError):
+    print("Warning: Could not read time control '{}', playing without clocks.".format(time_control[0]), file=sys.stderr)
+    return None
+
+def get_candidates_from_args(args):
+  candidates = get_flag_from_args(args, 'candidates', '0')
+  try:
+    return max(0, int(candidates))
+  except ValueError:
+    print("Warning: Could not read --candidates={}, not showing the best moves.".format(candidates), file=sys.stderr)
+    return 0
+
+def get_games_from_args(args):
+  games = get_flag_from_args(args, 'games', '1')
+  try:
+    return max(1, int(games))
+  except ValueError:
+    print("Warning: Could not read --games={}, playing one game.".format(games), file=sys.stderr)
+    return 1
+
+def get_trace_from_args(args):
+  from chs.client.trace import Trace
+  path = get_flag_from_args(args, 'trace')
+  if not path:
+    return None
+  try:
+    return Trace(path)
+  except OSError:
+    print("Warning: Could not open trace file '{}', playing without tracing.".format(path), file=sys.stderr)
+    return None
+
+def apply_engine_settings_from_args(args):
+  """--threads and --hash override the automatic sizing for every engine chs starts."""
+  for (name, variable) in [('threads', 'CHS_THREADS'), ('hash', 'CHS_HASH')]:
+    value = get_flag_from_args(args, name)
+    if value is not None:
+      os.environ[variable] = value
+
+def get_flag_from_args(args, name, default=None):
+  flag = [arg for arg in args if arg.startswith('--{}='.format(name))]
+  return flag[0].split('=', 1)[1] if flag else default
+
+def get_selfplay_from_args(args):
+  from chs.client.selfplay import SelfPlay
+  levels = get_flag_from_args(args, 'levels', '1,8').split(',')
+  workers = get_flag_from_args(args, 'workers')
+  games = int(get_flag_from_args(args, 'games', '100'))
+  if games < 1:
+    raise ValueError(games)
+  return SelfPlay(
+    (Levels.level_of_int(int(levels[0])), Levels.level_of_int(int(levels[-1]))),
+    games=games,
+    workers=int(workers) if workers else None,
+    output=get_flag_from_args(args, 'output', 'selfplay.pgn'),
+    book_path=get_flag_from_args(args, 'book', os.environ.get('CHS_BOOK_PATH')),
+  )
+
+def get_analysis_from_args(args):
+  from chs.client.analyze import Analysis
+  paths = [arg for arg in args[2:] if not arg.startswith('--')]
+  if not paths:
+    raise ValueError('No PGN file given')
+  workers = get_flag_from_args(args, 'workers')
+  depth = get_flag_from_args(args, 'depth')
+  return Analysis(
+    paths[0],
+    output=get_flag_from_args(args, 'output'),
+    workers=int(workers) if workers else None,
+    time_limit=float(get_flag_from_args(args, 'time', '0.5')),
+    depth=int(depth) if depth else None,
+  )
+
 def main():
+  apply_engine_settings_from_args(sys.argv)
   if len(sys.argv) > 1 and is_help_command(sys.argv[1]):
     print('Usage: chs [COMMAND] [FLAGS]\n')
     print('Valid values for [COMMAND]')
     print('  help         Print all the possible usage information')
     print('  version      Print the current version')
+    print('  bench        Measure how fast the engine and board run on this device')
+    print('  selfplay     Play levels against each other, e.g. selfplay --levels=3,4 --games=200')
+    print('  analyze      Annotate the games in a PGN file, e.g. analyze games.pgn')
+    print('  trace-summary')
+    print('               Print percentiles of a --trace file, e.g. trace-summary trace.jsonl')
     print('\nValid values for [FLAGS]')
     print('  --play-black   Play the game with the black pieces')
     print('  --level=[LVL]  Start a game with the given difficulty level')
+    print('  --ponder       Let the engine think while you choose your move')
+    print('  --book=[PATH]  Play openings from a Polyglot (.bin) opening book')
+    print('  --time-control=[MIN+INC]')
+    print('                 Play with clocks, e.g. 5+3 is 5 minutes each plus 3 seconds a move')
+    print('  --candidates=[N]')
+    print('                 Show the engine\'s N best moves and their scores while you think')
+    print('  --games=[N]    Play up to N games in a row without restarting the engine')
+    print('  --threads=[N]  Search with N threads (default every CPU but one)')
+    print('  --hash=[MB]    Use a hash table of MB megabytes (default sized to free memory)')
+    print('  --trace=[PATH] Record where each move\'s time goes as JSON lines, see trace-summary')
+    print('  --profile-startup')
+    print('                 Show how long each step of starting a game takes, without playing')
+    print('\nFlags for selfplay')
+    print('  --levels=[LVL],[LVL]  The two levels to play against each other (default 1,8)')
+    print('  --games=[N]           How many games to play (default 100)')
+    print('  --workers=[N]         How many games to play at once (default one per CPU)')
+    print('  --output=[PATH]       PGN file to write the games to (default selfplay.pgn)')
+    print('\nFlags for analyze')
+    print('  --time=[SEC]          Seconds to analyse each position for (default 0.5)')
+    print('  --depth=[N]           Also stop each analysis at this depth')
+    print('  --workers=[N]         How many positions to analyse at once (default one per CPU)')
+    print('  --output=[PATH]       Where to write the annotated PGN (default [FILE].analyzed.pgn)')
     print('\nValid values for [LVL]')
     print('  1     The least difficult setting')
     print('  2..7  Increasing difficulty')
@@ -72,19 +209,54 @@ def main():
     print('How to play: Your move: [MOVE]\n')
     print('Valid values for [MOVE]:')
     print('        Make moves using valid alegraic notation (e.g. Nf3, e4, etc.)')
+    print('        Press Tab to complete a move or command')
+    print('        Type a move while the engine thinks to premove it')
     print('  back  Take back your last move')
     print('  hint  Get a hint from the engine')
     print('')
     print('Environment Variables:')
-    print('  CHS_STOCKFISH_PATH   Override Stockfish engine path')
+    print('  CHS_STOCKFISH_PATH   Override Stockfish engine path (skips the binary chs bench picked)')
+    print('  CHS_CACHE_DIR        Where analysis is cached between games (empty to disable)')
+    print('  CHS_BOOK_PATH        Polyglot opening book to use when --book is not given')
+    print('  CHS_SYZYGY_PATH      Directory of Syzygy tablebases for endgames')
+    print('  CHS_THREADS          Engine threads when --threads is not given')
+    print('  CHS_HASH             Engine hash table size in MB when --hash is not given')
+    print('  CHS_CONFIG           Config file to read (default ~/.config/chs/config.json)')
     print('')
     print('For Termux users: Install with "pkg install stockfish && pip install chs"')
     print('See TERMUX.md for detailed Termux installation and usage instructions.')
     print('')
   elif len(sys.argv) > 1 and is_version_command(sys.argv[1]):
     print('Running chs {}v{}{}\n'.format(Colors.BOLD, get_version(), Colors.RESET))
+  elif len(sys.argv) > 1 and is_selfplay_command(sys.argv[1]):
+    try:
+      selfplay = get_selfplay_from_args(sys.argv)
+    except ValueError:
+      print('Error: --levels, --games and --workers take positive numbers, see chs help.', file=sys.stderr)
+      return
+    selfplay.run()
+  elif len(sys.argv) > 1 and is_analyze_command(sys.argv[1]):
+    try:
+      analysis = get_analysis_from_args(sys.argv)
+    except ValueError:
+      print('Error: Usage is chs analyze [FILE] with number flags, see chs help.', file=sys.stderr)
+      return
+    analysis.run()
+  elif len(sys.argv) > 1 and is_trace_summary_command(sys.argv[1]):
+    from chs.client.trace import print_summary
+    if len(sys.argv) < 3:
+      print('Error: Usage is chs trace-summary [FILE], see chs help.', file=sys.stderr)
+      return
+    try:
+      print_summary(sys.argv[2])
+    except OSError:
+      print("Error: Could not read trace file '{}'.".format(sys.argv[2]), file=sys.stderr)
+  elif len(sys.argv) > 1 and is_bench_command(sys.argv[1]):
+    from chs.client.bench import Bench
+    Bench().run()
   else:
     # Import chess and Client only when starting a game
+    started = time.perf_counter()
     try:
       import chess
       from chs.client.runner import Client
@@ -95,14 +267,25 @@ def main():
       print("Or install the package with:", file=sys.stderr)
       print("  pip install python-chess", file=sys.stderr)
       return
-      
+    imported = time.perf_counter()
+
     try:
       level = get_level_from_args(sys.argv)
       play_as = get_player_from_args(sys.argv)
     except:
       level = Levels.ONE
       play_as = chess.WHITE
-    client = Client(level, play_as)
+    client = Client(
+      level, play_as, get_ponder_from_args(sys.argv), get_book_from_args(sys.argv),
+      get_time_control_from_args(sys.argv), get_candidates_from_args(sys.argv), get_trace_from_args(sys.argv),
+      get_games_from_args(sys.argv)
+    )
+    if get_profile_startup_from_args(sys.argv):
+      from chs.client.bench import profile_startup
+      profile_startup(client, {
+        'import': imported - started, 'client': time.perf_counter() - imported
+      })
+      return
     client.run()
 
 def run():
@@ -0,0 +1,204 @@
+import collections
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import chess
+import chess.engine
+import chess.pgn
+
+from chs.engine.stockfish import normalize, start_worker_engine
+from chs.utils.core import Colors, Levels, Styles
+
+
+MATE_SCORE = 100000
+
+# How far a move drops the mover's winning chances (normalize's -1 to 1
+# scale) for it to be a blunder, mistake or inaccuracy, as lichess judges.
+JUDGEMENTS = [
+  (0.3, chess.pgn.NAG_BLUNDER, 'Blunder'),
+  (0.2, chess.pgn.NAG_MISTAKE, 'Mistake'),
+  (0.1, chess.pgn.NAG_DUBIOUS_MOVE, 'Inaccuracy'),
+]
+
+# The full strength engine in each worker process.
+_engine = None
+
+def start_worker():
+  global _engine
+  _engine = start_worker_engine(Levels.EIGHT)
+
+def analyse_position(task):
+  """Score and best move (UCI) for a FEN, or (None, None) if the game is over there."""
+  (fen, limit) = task
+  board = chess.Board(fen)
+  if board.is_game_over():
+    return (None, None)
+  entry = _engine.analyse(board, limit)
+  if entry is None:
+    return (None, None)
+  return (entry.score, entry.move.uci() if entry.move is not None else None)
+
+def white_cp(board, score):
+  """White's centipawns for a position, counting mates and finished games."""
+  if score is not None:
+    return score.white().score(mate_score=MATE_SCORE)
+  if board.is_checkmate():
+    return -MATE_SCORE if board.turn == chess.WHITE else MATE_SCORE
+  return 0
+
+def annotate(game, results):
+  """
+  Adds eval comments, win chances and blunder, mistake and inaccuracy marks
+  to the mainline of game, given (score, best move) for every position on it.
+  """
+  board = game.board()
+  cps = [white_cp(board, results[0][0])]
+  for (node, (score, _)) in zip(game.mainline(), results[1:]):
+    board.push(node.move)
+    cps.append(white_cp(board, score))
+
+  board = game.board()
+  for (i, node) in enumerate(game.mainline()):
+    mover = 1 if board.turn == chess.WHITE else -1
+    drop = mover * (normalize(cps[i]) - normalize(cps[i + 1]))
+    best = results[i][1]
+    notes = []
+    # The engine's own choice isn't a mistake, however the next search sees it.
+    for (threshold, nag, name) in JUDGEMENTS if best != node.move.uci() else []:
+      if drop >= threshold:
+        node.nags.add(nag)
+        if best is not None:
+          notes.append('{}. Best was {}.'.format(name, board.san(chess.Move.from_uci(best))))
+        else:
+          notes.append('{}.'.format(name))
+        break
+    board.push(node.move)
+    chances = 50 + 50 * normalize(cps[i + 1])
+    notes.append('White {:.0f}%'.format(chances))
+    node.comment = ' '.join(([node.comment] if node.comment else []) + notes)
+    score = results[i + 1][0]
+    if score is not None:
+      node.set_eval(score)
+  return game
+
+class Analysis(object):
+  """
+  Annotates every game in a PGN file, streaming games in and out so the file
+  can be any size. Positions are analysed on a pool of engine workers, and
+  games are written in their original order as soon as they're done. A
+  progress file next to the output records how far it got, so running the
+  same analysis again resumes where it was interrupted.
+  """
+  def __init__(self, path, output=None, workers=None, time_limit=0.5, depth=None):
+    self.path = path
+    self.output = output or '{}.analyzed.pgn'.format(os.path.splitext(path)[0])
+    self.progress_path = self.output + '.progress'
+    self.workers = max(1, workers or os.cpu_count() or 1)
+    self.limit = chess.engine.Limit(time=time_limit, depth=depth)
+    # Positions in flight at once, which bounds memory whatever the file size.
+    self.window = self.workers * 8
+    self.games = 0
+    self.positions = 0
+
+  def identity(self):
+    """What a progress file has to match to be resumed from."""
+    stat = os.stat(self.path)
+    return {
+      'input': os.path.abspath(self.path),
+      'size': stat.st_size,
+      'mtime': stat.st_mtime,
+      'time': self.limit.time,
+      'depth': self.limit.depth,
+    }
+
+  def load_progress(self):
+    try:
+      with open(self.progress_path, 'r') as f:
+        progress = json.load(f)
+    except (OSError, ValueError):
+      return None
+    if progress.get('identity') != self.identity() or not os.path.exists(self.output):
+      return None
+    return progress
+
+  def save_progress(self, input_offset, output_offset, games):
+    # Written to the side and renamed, so it's never half a file.
+    partial = self.progress_path + '.tmp'
+    with open(partial, 'w') as f:
+      json.dump({
+        'identity': self.identity(),
+        'input_offset': input_offset,
+        'output_offset': output_offset,
+        'games': games,
+      }, f)
+    os.replace(partial, self.progress_path)
+
+  def read_games(self, pgn):
+    """Yields games one at a time with the offset just past each."""
+    while True:
+      game = chess.pgn.read_game(pgn)
+      if game is None:
+        return
+      yield (game, pgn.tell())
+
+  def run(self):
+    progress = self.load_progress()
+    with open(self.path, 'r') as pgn_in, open(self.output, 'r+' if progress else 'w') as pgn_out:
+      if progress is not None:
+        # Drop anything written after the last recorded game, it may be cut off.
+        pgn_in.seek(progress['input_offset'])
+        pgn_out.seek(progress['output_offset'])
+        pgn_out.truncate()
+        self.games = progress['games']
+        print('{}Resuming after {} games'.format(Styles.PADDING_SMALL, self.games))
+      started = time.perf_counter()
+      try:
+        with multiprocessing.Pool(self.workers, initializer=start_worker) as pool:
+          self.analyse_games(pool, pgn_in, pgn_out, started)
+          pool.close()
+          pool.join()  # Lets workers quit their engines.
+      except KeyboardInterrupt:
+        print('\n{}{}Stopped, run the same command again to resume.{}'.format(
+          Styles.PADDING_SMALL, Colors.ORANGE, Colors.RESET
+        ))
+        return False
+    if os.path.exists(self.progress_path):
+      os.remove(self.progress_path)
+    print('\n{}{}Saved to {}{}'.format(Styles.PADDING_SMALL, Colors.GRAY, self.output, Colors.RESET))
+    return True
+
+  def analyse_games(self, pool, pgn_in, pgn_out, started):
+    pending = collections.deque()
+    in_flight = 0
+    for (game, input_offset) in self.read_games(pgn_in):
+      board = game.board()
+      fens = [board.fen()]
+      for move in game.mainline_moves():
+        board.push(move)
+        fens.append(board.fen())
+      results = [pool.apply_async(analyse_position, ((fen, self.limit),)) for fen in fens]
+      pending.append((game, input_offset, results))
+      in_flight += len(results)
+      while in_flight > self.window:
+        in_flight -= self.finish(pending.popleft(), pgn_out, started)
+    while pending:
+      self.finish(pending.popleft(), pgn_out, started)
+
+  def finish(self, task, pgn_out, started):
+    """Waits for the oldest game's positions, writes it and records the progress."""
+    (game, input_offset, results) = task
+    annotate(game, [result.get() for result in results])
+    pgn_out.write(str(game) + '\n\n')
+    pgn_out.flush()
+    os.fsync(pgn_out.fileno())
+    self.games += 1
+    self.positions += len(results)
+    self.save_progress(input_offset, pgn_out.tell(), self.games)
+    sys.stdout.write('\r{}{} games, {} positions, {:.1f} positions/s'.format(
+      Styles.PADDING_SMALL, self.games, self.positions, self.positions / (time.perf_counter() - started)
+    ))
+    sys.stdout.flush()
+    return len(results)
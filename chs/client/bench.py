@@ -0,0 +1,212 @@
+import io
+import os
+import statistics
+import time
+
+import chess
+import chess.engine
+
+from chs.engine.discovery import discover, rank
+from chs.engine.stockfish import (
+  DEFAULT_HASH, Engine, get_available_memory, get_cpu_limit, get_engine_config, get_engine_path, get_hash_size
+)
+from chs.ui.board import Board
+from chs.ui.renderer import Renderer
+from chs.utils.core import Colors, Levels, Styles
+
+
+# Opening, middlegame and endgame, as moves so the board has a move history to draw.
+POSITIONS = [
+  ['e4', 'e5', 'Nf3', 'Nc6', 'Bb5', 'a6'],
+  ['d4', 'Nf6', 'c4', 'e6', 'Nc3', 'Bb4', 'e3', 'O-O', 'Bd3', 'd5', 'Nf3', 'c5', 'O-O', 'Nc6'],
+  ['e4', 'e5', 'Nf3', 'Nc6', 'd4', 'exd4', 'Nxd4', 'Nxd4', 'Qxd4', 'Qf6', 'Qxf6', 'Nxf6'],
+]
+
+def make_board(moves):
+  board = chess.Board()
+  board.san_move_stack_white = []
+  board.san_move_stack_black = []
+  for move in moves:
+    stack = board.san_move_stack_white if board.turn else board.san_move_stack_black
+    stack.append(move)
+    board.push_san(move)
+  board.help_engine_hint = None
+  return board
+
+def get_settings(cpus, memory):
+  """
+  Threads worth trying on this device, each with the Hash a game would
+  give it. A bigger hash only lowers nodes per second, so its size comes
+  from the memory rather than from the measurements.
+  """
+  threads = [1]
+  while threads[-1] * 2 <= cpus:
+    threads.append(threads[-1] * 2)
+  if threads[-1] != cpus:
+    threads.append(cpus)
+  return [(t, get_hash_size(t, memory)) for t in threads]
+
+def recommend(speeds, tolerance=0.9):
+  """
+  The setting with the fewest threads within tolerance of the fastest one,
+  since more threads drain a phone's battery for little gain.
+  """
+  fastest = max(speeds.values())
+  return min(setting for (setting, nps) in speeds.items() if nps >= fastest * tolerance)
+
+def profile_startup(client, timings):
+  """
+  Prints how long each step of starting a game took, given timings for the
+  steps before the engine (e.g. imports), then stops the client's engine.
+  """
+  started = time.perf_counter()
+  try:
+    client.engine.shared.wait()
+    waiting = time.perf_counter() - started
+  finally:
+    client.engine.done()
+    client.hint_engine.done()
+  timings = dict(timings, **client.engine.shared.timings, waiting=waiting)
+  rows = [
+    ('Imports', 'import', 'loading python-chess and chs'),
+    ('Client', 'client', 'until the board can be drawn'),
+    ('Engine path', 'path', 'finding the Stockfish binary'),
+    ('Spawn', 'spawn', 'starting the process and the UCI handshake'),
+    ('isready', 'isready', 'setting options until the engine answers readyok'),
+    ('Waiting', 'waiting', 'for the engine after the client was ready'),
+  ]
+  print('')
+  for (name, key, description) in rows:
+    print('{}{}{:<16}{}{:>8.1f} ms  {}{}{}'.format(
+      Styles.PADDING_SMALL, Colors.GRAY, name, Colors.RESET, timings.get(key, 0) * 1e3, Colors.GRAY, description, Colors.RESET
+    ))
+  print('')
+
+class Bench(object):
+  """
+  Measures how fast chs runs on this device, with the same engine and
+  settings a game would use.
+  """
+  def __init__(self, search_time=1.0, repeat=3):
+    self.search_time = search_time
+    self.repeat = repeat
+    self.boards = [make_board(moves) for moves in POSITIONS]
+
+  def run(self):
+    print('{}{}Benchmarking chs on this device, this takes a minute.{}\n'.format(
+      Styles.PADDING_SMALL, Colors.BOLD, Colors.RESET
+    ))
+    # Probed before the cache is disabled so the pick is kept for games.
+    self.report_binaries(discover())
+    # Cached scores would make the engine look instant.
+    os.environ['CHS_CACHE_DIR'] = ''
+    self.report('Engine', get_engine_path())
+    startup = self.measure_startup()
+    self.report('Startup', '{:.0f} ms'.format(startup * 1e3))
+    engine = Engine(Levels.EIGHT)
+    try:
+      self.report('Name', engine.engine.id.get('name', 'unknown'))
+      latency = self.measure_score(engine)
+      self.report('Score latency', '{:.0f} ms'.format(latency * 1e3))
+      (draw, render) = self.measure_render()
+      self.report('Render', '{:.2f} ms/frame ({:.2f} ms drawing, {:.2f} ms output)'.format(
+        (draw + render) * 1e3, draw * 1e3, render * 1e3
+      ))
+      print('')
+      speeds = self.measure_speeds(engine)
+    finally:
+      engine.done()
+    self.report_speeds(speeds)
+
+  def report_binaries(self, probes):
+    working = [(found, path) for (path, found) in probes.items() if found is not None]
+    for (found, path) in sorted(working, key=lambda item: rank(item[0]), reverse=True):
+      self.report(os.path.basename(path)[:15], '{}, {:,.0f} knps'.format(found.name or 'unknown', found.nps / 1000))
+    for path in sorted(path for (path, found) in probes.items() if found is None):
+      self.report(os.path.basename(path)[:15], '{}doesn\'t run here{}'.format(Colors.RED, Colors.RESET))
+    if probes:
+      print('')
+
+  def report(self, name, value):
+    print('{}{}{:<16}{}{}'.format(Styles.PADDING_SMALL, Colors.GRAY, name, Colors.RESET, value))
+
+  def measure_startup(self):
+    """Median time to start the engine and have it ready for a search."""
+    times = []
+    for _ in range(self.repeat):
+      started = time.perf_counter()
+      engine = Engine(Levels.ONE)
+      engine.engine.ping()
+      times.append(time.perf_counter() - started)
+      engine.done()
+    return statistics.median(times)
+
+  def measure_score(self, engine):
+    """Median time for Engine.score, which the eval bar waits on every move."""
+    times = []
+    for board in self.boards:
+      started = time.perf_counter()
+      engine.score(board)
+      times.append(time.perf_counter() - started)
+    return statistics.median(times)
+
+  def measure_render(self, frames=300):
+    """Seconds per frame spent building it and spent diffing and writing it."""
+    ui = Board(Levels.ONE, chess.WHITE)
+    ui._renderer = Renderer(io.StringIO())
+    fens = [board.fen() for board in self.boards]
+    draw = 0
+    render = 0
+    for i in range(frames):
+      (fen, board) = (fens[i % len(fens)], self.boards[i % len(fens)])
+      started = time.perf_counter()
+      rows = ui._generate(fen, board, None)
+      drawn = time.perf_counter()
+      ui._renderer.render(rows)
+      draw += drawn - started
+      render += time.perf_counter() - drawn
+    return (draw / frames, render / frames)
+
+  def measure_speeds(self, engine):
+    """Nodes per second for each Threads and Hash setting the engine supports."""
+    if 'Threads' not in engine.engine.options or 'Hash' not in engine.engine.options:
+      return {}
+    speeds = {}
+    board = self.boards[1]
+    limit = chess.engine.Limit(time=self.search_time)
+    for (threads, hash_size) in get_settings(get_cpu_limit(), get_available_memory()):
+      options = {'Skill Level': 20, 'Threads': threads, 'Hash': hash_size}
+      with engine.shared.lock:
+        # A new game each time so no run starts from another's hash table.
+        info = engine.engine.analyse(board, limit, game=object(), options=options)
+      nps = info.get('nps') or info.get('nodes', 0) / max(info.get('time', self.search_time), 1e-3)
+      speeds[(threads, hash_size)] = nps
+      print('{}{}Threads {:<3} Hash {:>4} MB{}  {:>8,.0f} knps'.format(
+        Styles.PADDING_SMALL, Colors.GRAY, threads, hash_size, Colors.RESET, nps / 1000
+      ))
+    return speeds
+
+  def report_speeds(self, speeds):
+    if not speeds:
+      print('{}The engine doesn\'t support Threads and Hash, nothing to recommend.'.format(Styles.PADDING_SMALL))
+      return
+    current = get_engine_config(Levels.value(Levels.EIGHT))
+    current = (current.get('Threads', 1), current.get('Hash', DEFAULT_HASH))
+    (threads, hash_size) = recommend(speeds)
+    print('')
+    self.report('Current', 'Threads {}, Hash {} MB'.format(*current))
+    if current == (threads, hash_size):
+      gain_text = ' (what chs uses already)'
+    elif current in speeds and speeds[current] > 0:
+      gain = speeds[(threads, hash_size)] / speeds[current] - 1
+      gain_text = ' ({:+.0%} speed)'.format(gain)
+    else:
+      gain_text = ''
+    self.report('Recommended', '{}Threads {}, Hash {} MB{}{}'.format(
+      Colors.GREEN, threads, hash_size, Colors.RESET, gain_text
+    ))
+    if current != (threads, hash_size):
+      print('\n{}Play with it using chs --threads={} --hash={}, or set CHS_THREADS and CHS_HASH.'.format(
+        Styles.PADDING_SMALL, threads, hash_size
+      ))
+    print('')
@@ -0,0 +1,99 @@
+import collections
+import math
+import threading
+import time
+
+import chess
+import chess.engine
+
+
+# Seconds each side starts with, and seconds added after each of their moves.
+TimeControl = collections.namedtuple('TimeControl', ['base', 'increment'])
+
+def parse_time_control(text):
+  """
+  Parses minutes and an optional increment in seconds, e.g. '5+3' or '10'.
+  Raises ValueError if it isn't a usable time control.
+  """
+  (minutes, _, increment) = text.partition('+')
+  control = TimeControl(float(minutes) * 60, float(increment or 0))
+  if control.base <= 0 or control.increment < 0:
+    raise ValueError('Invalid time control {}'.format(text))
+  return control
+
+def format_clock(seconds):
+  """Clock face for seconds left, with tenths once it's under ten seconds."""
+  if seconds < 10:
+    return '0:{:04.1f}'.format(math.floor(max(0, seconds) * 10) / 10)
+  seconds = int(seconds)
+  (minutes, seconds) = divmod(seconds, 60)
+  if minutes >= 60:
+    return '{}:{:02}:{:02}'.format(minutes // 60, minutes % 60, seconds)
+  return '{}:{:02}'.format(minutes, seconds)
+
+class Clock(object):
+  """
+  A chess clock for both sides with a Fischer increment. At most one side's
+  clock runs at a time, and it's safe to read from the drawing thread.
+  """
+  def __init__(self, control, now=time.monotonic):
+    self.control = control
+    self.now = now
+    self.lock = threading.Lock()
+    self.remaining = {chess.WHITE: control.base, chess.BLACK: control.base}
+    self.running = None
+    self.started = None
+
+  def start(self, color):
+    """Starts color's clock, stopping the other one. Does nothing if it's already running."""
+    with self.lock:
+      if self.running == color:
+        return
+      self._stop()
+      self.running = color
+      self.started = self.now()
+
+  def stop(self):
+    """Stops the running clock and adds the increment, unless that side ran out of time."""
+    with self.lock:
+      self._stop()
+
+  def _stop(self):
+    if self.running is None:
+      return
+    self.remaining[self.running] -= self.now() - self.started
+    if self.remaining[self.running] > 0:
+      self.remaining[self.running] += self.control.increment
+    self.running = None
+
+  def time_left(self, color):
+    with self.lock:
+      left = self.remaining[color]
+      if self.running == color:
+        left -= self.now() - self.started
+      return max(0, left)
+
+  def flagged(self, color):
+    return self.time_left(color) <= 0
+
+  def is_running(self, color):
+    return self.running == color
+
+  def until_change(self):
+    """Seconds until the running clock's face next changes."""
+    running = self.running
+    if running is None:
+      return 1.0
+    left = self.time_left(running)
+    step = 0.1 if left < 10 else 1.0
+    # Just past the next tick, since the face rounds down.
+    return (left % step) + 0.01
+
+  def limit(self):
+    """Search limit that lets the engine manage its own time from the clocks."""
+    return chess.engine.Limit(
+      white_clock=self.time_left(chess.WHITE),
+      black_clock=self.time_left(chess.BLACK),
+      white_inc=self.control.increment,
+      black_inc=self.control.increment,
+    )
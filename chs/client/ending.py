@@ -6,3 +6,5 @@ class GameOver(Enum):
   WHITE_WINS = 2
   DRAW = 3
   RESIGN = 4
+  WHITE_WINS_ON_TIME = 5
+  BLACK_WINS_ON_TIME = 6
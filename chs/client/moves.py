@@ -0,0 +1,43 @@
+import editdistance_s as editdistance
+
+
+class MoveIndex(object):
+  """
+  The legal moves of one position as SAN and UCI strings, worked out once
+  so completing and correcting what the user types doesn't redo the SAN
+  (and its check test) for every move on every keystroke or typo.
+  """
+  def __init__(self, board):
+    self.fen = board.fen()
+    self.moves = {}  # SAN and UCI to the move.
+    self.sans = []
+    for move in board.legal_moves:
+      san = board.san(move)
+      self.sans.append(san)
+      self.moves[san] = move
+      self.moves[move.uci()] = move
+    self.sans.sort()
+
+  def get(self, text):
+    """The move text is the SAN or UCI of, or None."""
+    return self.moves.get(text)
+
+  def complete(self, prefix, extra=()):
+    """SAN moves (and extra words, e.g. commands) that start with prefix, sorted."""
+    words = [san for san in self.sans if san.startswith(prefix)]
+    return words + sorted(word for word in extra if word.startswith(prefix))
+
+  def suggest(self, text, limit=3):
+    """
+    Up to limit SAN moves the user may have meant by text, closest first:
+    those one edit away, then those text is the start of.
+    """
+    ranked = []
+    for san in self.sans:
+      distance = editdistance.distance(san, text)
+      if distance <= 1:
+        ranked.append((0, distance, san))
+      elif text and san.startswith(text):
+        ranked.append((1, distance, san))
+    ranked.sort()
+    return [san for (_, _, san) in ranked[:limit]]
@@ -1,12 +1,29 @@
 
+import concurrent.futures
+import sys
+import threading
+import time
+
 import chess
-import editdistance_s as editdistance
 
+try:
+  import readline
+except ImportError:  # Not on Windows, where moves just aren't completed.
+  readline = None
+
+try:
+  import termios
+except ImportError:  # Windows
+  termios = None
+
+from chs.client.clock import Clock
 from chs.client.ending import GameOver
+from chs.client.moves import MoveIndex
 from chs.engine.parser import FenParser
-from chs.engine.stockfish import Engine
+from chs.engine.stockfish import Engine, EngineStartError
 from chs.ui.board import Board
-from chs.utils.core import Colors, Styles
+from chs.ui.renderer import ANSI_ESCAPE
+from chs.utils.core import Colors, Levels, Styles
 
 
 class GameOverException(Exception):
@@ -21,25 +38,113 @@ class BlackWinsException(GameOverException):
 class DrawException(GameOverException):
   pass
 
+class WhiteWinsOnTimeException(GameOverException):
+  pass
+
+class BlackWinsOnTimeException(GameOverException):
+  pass
+
 class ResignException(GameOverException):
   pass
 
+def in_thread(function):
+  """
+  Runs a blocking call (e.g. input) on a daemon thread, as a Future to
+  wait on later. On a daemon thread, an unanswered prompt never holds up
+  exiting.
+  """
+  future = concurrent.futures.Future()
+  def target():
+    try:
+      future.set_result(function())
+    except BaseException as e:
+      future.set_exception(e)
+  threading.Thread(target=target, daemon=True).start()
+  return future
+
+def save_terminal():
+  """The terminal's settings, or None if stdin isn't one."""
+  if termios is None or not sys.stdin.isatty():
+    return None
+  try:
+    return termios.tcgetattr(sys.stdin)
+  except termios.error:
+    return None
+
+def restore_terminal(settings):
+  if settings is not None:
+    termios.tcsetattr(sys.stdin, termios.TCSADRAIN, settings)
+
 class Client(object):
   BACK = 'back'
   HINT = 'hint'
 
-  def __init__(self, level, play_as):
-    self.ui_board = Board(level, play_as)
+  def __init__(self, level, play_as, ponder=False, book=None, time_control=None, candidates=0, trace=None, games=1):
+    self.level = level
     self.play_as = play_as
+    self.ponder = ponder  # Let the engine think on your time.
+    self.book = book
+    self.time_control = time_control
+    self.candidates = candidates
+    self.games = games  # How many games to play in a row on the same engine process.
+    self.engine = Engine(level, book=book, background=True)  # Engine you're playing against, starting while the board is drawn.
+    self.hint_engine = self.engine.share(Levels.EIGHT)  # Same process, used to give you hints.
+    self._completions = []
+    self.trace = trace  # Optional Trace that each ply's timings are written to.
+    self._trace_mark = None
+    self._input_seconds = 0.0
+    self._line = None  # The line being read, kept until something takes it, e.g. a premove.
+    self.reset()
+
+  def reset(self):
+    """Sets up the board and clock for a game from the starting position."""
+    self.clock = Clock(self.time_control) if self.time_control is not None else None
+    self.ui_board = Board(self.level, self.play_as, self.clock, self.candidates)
     self.board = chess.Board()
     self.parser = FenParser(self.board.fen())
-    self.engine = Engine(level)  # Engine you're playing against.
-    self.hint_engine = Engine(8)  # Engine used to help give you hints.
     self.board.san_move_stack_white = []
     self.board.san_move_stack_black = []
     self.board.help_engine_hint = None
+    self._move_index = None
+
+  def new_game(self):
+    """Starts the next game on the engine process that's already running."""
+    self.ui_board.cancel_evaluation()
+    self.reset()
+    self.engine.new_game()
 
   def run(self):
+    self.enable_completion()
+    # A premove may still be mid-read at exit, with readline holding the terminal.
+    terminal = save_terminal()
+    try:
+      self.play_games()
+    except KeyboardInterrupt:
+      pass  # Ctrl-C, which resigned a game waiting on your move on its way out.
+    except EngineStartError as error:
+      # Nothing may draw over the advice, e.g. the board's evaluation.
+      self.ui_board.cancel_evaluation()
+      print('\n{}{}{}'.format(Colors.RED, error, Colors.RESET), file=sys.stderr)
+    finally:
+      restore_terminal(terminal)
+      self.engine.done()
+      self.hint_engine.done()
+      if self.book is not None:
+        self.book.close()
+      if self.trace is not None:
+        self.trace.close()
+
+  def play_games(self):
+    """One game after another on the same engine process."""
+    for game in range(self.games):
+      if game > 0:
+        if not self.play_again(game + 1):
+          break
+        self.new_game()
+      self.play()
+
+  def play(self):
+    self.mark_trace()
     try:
       while True:
         self.check_game_over()
@@ -53,13 +158,73 @@ class Client(object):
       self.ui_board.generate(self.fen(), self.board, self.engine, GameOver.WHITE_WINS)
     except DrawException:
       self.ui_board.generate(self.fen(), self.board, self.engine, GameOver.DRAW)
+    except WhiteWinsOnTimeException:
+      self.ui_board.generate(self.fen(), self.board, self.engine, GameOver.WHITE_WINS_ON_TIME)
+    except BlackWinsOnTimeException:
+      self.ui_board.generate(self.fen(), self.board, self.engine, GameOver.BLACK_WINS_ON_TIME)
     except ResignException:
       self.ui_board.generate(self.fen(), self.board, self.engine, GameOver.RESIGN)
+
+  def play_again(self, game):
+    """Asks before starting game number game, False if the user would rather stop."""
+    try:
+      answer = self.read_line('\n{}{}Press Enter for game {} of {}, or q to quit {}'.format(
+        Styles.PADDING_SMALL, Colors.GRAY, game, self.games, Colors.RESET
+      ))
+    except (EOFError, KeyboardInterrupt):
+      return False
+    return answer.strip().lower() not in ('q', 'quit')
+
+  def read_line(self, text, timeout=None):
+    """
+    A line from stdin, read with input() on a thread so readline still
+    edits and completes it, and it can be typed while the engine searches.
+    A line that's already being read (e.g. a premove still being typed) is
+    carried on with, text standing in for its prompt. Raises
+    concurrent.futures.TimeoutError after timeout seconds, leaving the
+    line to be read.
+    """
+    if self._line is None:
+      prompt = self.prompt(text)
+      self._line = in_thread(lambda: input(prompt))
+    else:
+      print(text, end='', flush=True)
+    line = self._line
+    try:
+      return line.result(timeout)
     finally:
-      self.engine.done()
-      self.hint_engine.done()
+      if line.done() and self._line is line:
+        self._line = None
+
+  def time_to_flag(self):
+    """Seconds until your flag falls, just past it so the clock agrees, or None without clocks."""
+    if self.clock is None:
+      return None
+    return self.clock.time_left(self.play_as) + 0.01
+
+  def read_ahead(self, text):
+    """Starts reading a line, if one isn't being read already, without waiting for it."""
+    if self._line is None:
+      prompt = self.prompt(text)
+      self._line = in_thread(lambda: input(prompt))
+
+  def take_premove(self):
+    """The line typed while the engine was thinking, if it was entered before the engine moved."""
+    line = self._line
+    if line is None or not line.done() or line.cancelled() or line.exception() is not None:
+      return None
+    self._line = None
+    return line.result()
 
   def check_game_over(self):
+    # A move made after the flag fell doesn't count, checkmate or not.
+    if self.clock is not None:
+      for color in chess.COLORS:
+        if self.clock.flagged(color):
+          self.clock.stop()
+          if self.board.has_insufficient_material(not color):
+            raise DrawException
+          raise BlackWinsOnTimeException if color == chess.WHITE else WhiteWinsOnTimeException
     if self.board.is_game_over():
       result = self.board.result()
       if result == '1-0':
@@ -69,75 +234,204 @@ class Client(object):
       if result == '1/2-1/2':
         raise DrawException
 
-  def moves(self):
-    return map(self.board.san, self.board.legal_moves)
+  def start_clock(self, color):
+    if self.clock is not None:
+      self.clock.start(color)
+
+  def stop_clock(self):
+    if self.clock is not None:
+      self.clock.stop()
+
+  def limit(self):
+    """Clock limits for the engine, or None to search for a fixed time."""
+    return self.clock.limit() if self.clock is not None else None
+
+  def mark_trace(self):
+    """Starts measuring the next ply from here."""
+    self._trace_mark = (self.engine.shared.stats(), self.ui_board.render_seconds, self.ui_board.frames)
+    self._input_seconds = 0.0
+
+  def record_trace(self, side, move):
+    """Writes what the ply that just ended spent its time on, if tracing."""
+    if self.trace is None:
+      return
+    ((searches, seconds, nodes, hits, misses), render_seconds, frames) = self._trace_mark
+    (searches_now, seconds_now, nodes_now, hits_now, misses_now) = self.engine.shared.stats()
+    (searches, seconds, nodes) = (searches_now - searches, seconds_now - seconds, nodes_now - nodes)
+    searched = searches > 0
+    self.trace.record(
+      ply=self.board.ply(),
+      side=side,
+      move=move,
+      input_ms=self._input_seconds * 1e3 if side == 'user' else None,
+      render_ms=(self.ui_board.render_seconds - render_seconds) * 1e3,
+      frames=self.ui_board.frames - frames,
+      search_ms=seconds * 1e3 if searched else None,
+      nodes=nodes if searched else None,
+      nps=round(nodes / seconds) if searched and seconds > 0 else None,
+      depth=self.engine.shared.last_info.get('depth') if searched else None,
+      cache_hits=hits_now - hits,
+      cache_misses=misses_now - misses,
+    )
+    self.mark_trace()
+
+  def hint(self):
+    """
+    Best move from the analysis behind the eval bar, which is usually done
+    by the time you ask, or from a search of its own if there isn't one,
+    e.g. while the engine ponders on your time.
+    """
+    candidates = self.ui_board.analysis(self.fen(), wait=True)
+    if not candidates:
+      candidates = self.hint_engine.candidates(self.board, max(1, self.candidates), self.limit())
+      self.ui_board.analysed(self.fen(), candidates, self.hint_engine)
+    if candidates:
+      return candidates[0].move
+    return self.hint_engine.play(self.board, limit=self.limit()).move
+
+  def move_index(self):
+    """Legal moves of the current position, indexed once per position."""
+    fen = self.fen()
+    if self._move_index is None or self._move_index.fen != fen:
+      self._move_index = MoveIndex(self.board)
+    return self._move_index
+
+  def suggestions(self, illegal_move):
+    return self.move_index().suggest(illegal_move)
 
   def closest_move(self, illegal_move):
-    for move in self.moves():
-      distance = editdistance.distance(move, illegal_move)
-      if distance <= 1:
-        return move
-    return None
+    suggestions = self.suggestions(illegal_move)
+    return suggestions[0] if suggestions else None
 
-  def make_turn(self, meta=(False, None)):
-    (failed, prev_move) = meta
-    self.ui_board.generate(self.fen(), self.board, self.engine)
-    if failed:
-      if prev_move == self.BACK:
-        print('{}{}  ⃠ You cannot go back, no moves were made.{}'.format(
-          Styles.PADDING_SMALL, Colors.RED, Colors.RESET
-        ))
-      else:
-        maybe_move = self.closest_move(prev_move)
-        if maybe_move is not None:
-          error_string = '{}{}  ⃠ Illegal, did you mean {}{}{}{}{}'.format(
-            Colors.RED, Styles.PADDING_SMALL,\
-            Colors.WHITE, Colors.UNDERLINE, Colors.BOLD, maybe_move, Colors.RESET
-          )
-        else:
-          error_string = '{}{}  ⃠ Illegal, try again.'.format(Styles.PADDING_SMALL, Colors.RED)
-        print(error_string)
+  def complete(self, text, state):
+    """readline completer for moves and commands."""
+    if state == 0:
+      self._completions = self.move_index().complete(text, [self.BACK, self.HINT])
+    return self._completions[state] if state < len(self._completions) else None
+
+  def enable_completion(self):
+    if readline is None:
+      return
+    readline.set_completer(self.complete)
+    # SAN uses characters readline would otherwise split words on, e.g. O-O and e8=Q+.
+    readline.set_completer_delims(' \t\n')
+    if 'libedit' in (readline.__doc__ or ''):
+      readline.parse_and_bind('bind ^I rl_complete')
     else:
+      readline.parse_and_bind('tab: complete')
+
+  def prompt(self, text):
+    """text for input(), with colors marked so readline knows they take no space."""
+    if readline is None:
+      return text
+    return ANSI_ESCAPE.sub(lambda escape: '\001{}\002'.format(escape.group(0)), text)
+
+  def print_rejected(self, rejected):
+    """Says why the last input was rejected, given (input, whether it was a premove), or None."""
+    (move, premove) = rejected if rejected is not None else (None, False)
+    if move is None:
       print('')
-    try:
-      move = input('{}{}{}┏━ Your move ━━━━━━━━━━━┓ \n{}┗{}{}'.format(
-        Styles.PADDING_SMALL, Colors.WHITE, Colors.BOLD,\
-        Styles.PADDING_SMALL, Styles.PADDING_SMALL, Colors.RESET)
-      )
-      if move == self.BACK:
-        self.board.pop()
-        self.board.pop()
-      elif move == self.HINT:
-        hint = self.hint_engine.play(self.board, 1.000)
-        self.board.help_engine_hint = self.board.uci(hint.move)
+    elif premove:
+      replies = self.board.san_move_stack_black if self.play_as == chess.WHITE else self.board.san_move_stack_white
+      print('{}{}  ⃠ Premove {} is illegal after {}, dropped.{}'.format(
+        Styles.PADDING_SMALL, Colors.RED, move, replies[-1] if replies else 'the reply', Colors.RESET
+      ))
+    elif move == self.BACK:
+      print('{}{}  ⃠ You cannot go back, no moves were made.{}'.format(
+        Styles.PADDING_SMALL, Colors.RED, Colors.RESET
+      ))
+    else:
+      suggestions = ['{}{}{}{}{}'.format(
+        Colors.WHITE, Colors.UNDERLINE, Colors.BOLD, suggestion, Colors.RESET
+      ) for suggestion in self.suggestions(move)]
+      if len(suggestions) > 1:
+        suggestions = ['{}, '.format(Colors.RED).join(suggestions[:-1]), suggestions[-1]]
+      if suggestions:
+        error_string = '{}{}  ⃠ Illegal, did you mean {}'.format(
+          Colors.RED, Styles.PADDING_SMALL, '{} or '.format(Colors.RED).join(suggestions)
+        )
       else:
-        s = self.board.parse_san(move)
-        if self.play_as == chess.WHITE:
-          self.board.san_move_stack_white.append(self.board.san(s))
+        error_string = '{}{}  ⃠ Illegal, try again.'.format(Styles.PADDING_SMALL, Colors.RED)
+      print(error_string)
+
+  def make_turn(self):
+    rejected = None
+    # A move typed while the engine was thinking goes first, checked against its reply.
+    premove = self.take_premove()
+    # Asks again until the input is something we can do, rather than recursing.
+    while True:
+      self.start_clock(self.play_as)
+      if premove is None:
+        # Analysed at full strength, so the same search answers hints.
+        self.ui_board.generate(self.fen(), self.board, self.hint_engine)
+        self.print_rejected(rejected)
+        # The board is drawn while the engine starts, but it has to run before you move.
+        self.engine.shared.wait()
+      move = None
+      waiting = time.perf_counter()
+      try:
+        if premove is not None:
+          move = premove
+        else:
+          move = self.read_line('{}{}{}┏━ Your move ━━━━━━━━━━━┓ \n{}┗{}{}'.format(
+            Styles.PADDING_SMALL, Colors.WHITE, Colors.BOLD,\
+            Styles.PADDING_SMALL, Styles.PADDING_SMALL, Colors.RESET),
+            self.time_to_flag()
+          )
+        self._input_seconds += time.perf_counter() - waiting
+        # A move entered after your flag fell doesn't count.
+        self.check_game_over()
+        if move != self.HINT:
+          self.ui_board.cancel_evaluation()
+        if move == self.BACK:
+          self.board.pop()
+          self.board.pop()
+        elif move == self.HINT:
+          self.board.help_engine_hint = self.board.uci(self.hint())
         else:
-          self.board.san_move_stack_black.append(self.board.san(s))
-        self.board.push_san(move)
-        self.board.help_engine_hint = None  # Reset hint if you've made your move.
-    except ValueError:
-      self.board.help_engine_hint = None  # Reset hint if you wanna dismiss it by invalid moving.
-      self.make_turn((True, move))
-    except IndexError:
-      self.make_turn((True, move))
-    except:
-      raise ResignException
+          s = self.move_index().get(move) or self.board.parse_san(move)
+          san = self.board.san(s)
+          if self.play_as == chess.WHITE:
+            self.board.san_move_stack_white.append(san)
+          else:
+            self.board.san_move_stack_black.append(san)
+          self.board.push(s)
+          self.stop_clock()
+          self.board.help_engine_hint = None  # Reset hint if you've made your move.
+          self.record_trace('user', san)
+        return
+      except ValueError:
+        self.board.help_engine_hint = None  # Reset hint if you wanna dismiss it by invalid moving.
+        rejected = (move, premove is not None)
+      except IndexError:
+        rejected = (move, premove is not None)
+      except concurrent.futures.TimeoutError:
+        # Your flag fell while the prompt was open.
+        self.check_game_over()
+      except GameOverException:
+        raise
+      except:
+        raise ResignException
+      premove = None
 
   def computer_turn(self):
+    self.start_clock(not self.play_as)
     self.ui_board.generate(self.fen(), self.board, self.engine)
-    print('\n{}{}{}┏━ Opponent\'s move ━━━━━┓ \n{}┗{}{}{}thinking...{}'.format(
+    # Whatever you type while the engine thinks is your premove, played once it has moved.
+    self.read_ahead('\n{}{}{}┏━ Opponent\'s move ━━━━━┓ \n{}┗{}{}{}thinking...{} '.format(
       Styles.PADDING_SMALL, Colors.WHITE, Colors.BOLD,\
       Styles.PADDING_SMALL, Styles.PADDING_SMALL, Colors.RESET, Colors.GRAY, Colors.RESET)
     )
-    result = self.engine.play(self.board)
+    result = self.engine.play(self.board, ponder=self.ponder, limit=self.limit())
+    self.ui_board.cancel_evaluation()
+    san = self.board.san(result.move)
     if self.play_as == chess.WHITE:
-      self.board.san_move_stack_black.append(self.board.san(result.move))
+      self.board.san_move_stack_black.append(san)
     else:
-      self.board.san_move_stack_white.append(self.board.san(result.move))
+      self.board.san_move_stack_white.append(san)
     self.board.push(result.move)
+    self.stop_clock()
+    self.record_trace('engine', san)
 
   def fen(self):
     return self.board.fen()
@@ -0,0 +1,149 @@
+import datetime
+import math
+import multiprocessing
+import multiprocessing.util
+import os
+import sys
+import time
+
+import chess
+import chess.pgn
+
+from chs.engine.book import OpeningBook
+from chs.engine.cache import AnalysisCache
+from chs.engine.stockfish import start_worker_engine
+from chs.utils.core import Colors, Styles
+
+
+# Engine handles for (first level, second level) in each worker process.
+_engines = None
+
+def start_worker(levels, book_path):
+  """Starts one engine process per worker, shared by both levels."""
+  global _engines
+  # Every game should be searched, not replayed from earlier games' cache.
+  os.environ['CHS_CACHE_DIR'] = ''
+  book = OpeningBook(book_path) if book_path else None
+  engine = start_worker_engine(levels[0], book)
+  engine.shared.cache = AnalysisCache(size=0)
+  _engines = (engine, engine.share(levels[1]))
+  def stop():
+    # Finalizers run newest first, so the engine quits after this.
+    _engines[1].done()
+    if book is not None:
+      book.close()
+  multiprocessing.util.Finalize(None, stop, exitpriority=10)
+
+def play_game(task):
+  """
+  Plays game number index with the first level as white if first_is_white.
+  Returns the index, the result from the first level's point of view
+  (1, 0.5 or 0) and the game as PGN.
+  """
+  (index, first_is_white, levels, max_plies) = task
+  (first, second) = _engines
+  players = {chess.WHITE: first, chess.BLACK: second} if first_is_white else {chess.WHITE: second, chess.BLACK: first}
+  board = chess.Board()
+  while board.outcome(claim_draw=True) is None and board.ply() < max_plies:
+    board.push(players[board.turn].play(board).move)
+
+  outcome = board.outcome(claim_draw=True)
+  result = outcome.result() if outcome is not None else '1/2-1/2'
+  game = chess.pgn.Game.from_board(board)
+  game.headers['Event'] = 'chs selfplay'
+  game.headers['Site'] = 'chs'
+  game.headers['Date'] = datetime.date.today().strftime('%Y.%m.%d')
+  game.headers['Round'] = str(index + 1)
+  game.headers['White'] = 'chs level {}'.format(levels[0] if first_is_white else levels[1])
+  game.headers['Black'] = 'chs level {}'.format(levels[1] if first_is_white else levels[0])
+  game.headers['Result'] = result
+  game.headers['Termination'] = outcome.termination.name.lower() if outcome is not None else 'adjudication'
+
+  white_score = {'1-0': 1, '0-1': 0}.get(result, 0.5)
+  score = white_score if first_is_white else 1 - white_score
+  return (index, score, str(game))
+
+def elo_difference(score):
+  """Elo gap implied by an expected score, infinite for a clean sweep."""
+  if score <= 0:
+    return -math.inf
+  if score >= 1:
+    return math.inf
+  return -400 * math.log10(1 / score - 1)
+
+def estimate_elo(scores):
+  """
+  Elo gap of the first level over the second from per-game scores, with a
+  95% confidence interval from the spread of the scores.
+  """
+  n = len(scores)
+  mean = sum(scores) / n
+  deviation = math.sqrt(sum((s - mean) ** 2 for s in scores) / n) / math.sqrt(n)
+  return (
+    elo_difference(mean),
+    elo_difference(mean - 1.96 * deviation),
+    elo_difference(mean + 1.96 * deviation),
+  )
+
+def format_elo(elo):
+  if math.isinf(elo):
+    return '+inf' if elo > 0 else '-inf'
+  return '{:+.0f}'.format(elo)
+
+class SelfPlay(object):
+  """
+  Plays games between two levels on a pool of worker processes, without
+  drawing anything, alternating colors and writing every game to a PGN file.
+  """
+  def __init__(self, levels, games=100, workers=None, output='selfplay.pgn', book_path=None, max_plies=400):
+    self.levels = levels
+    self.games = games
+    self.workers = max(1, min(workers or os.cpu_count() or 1, games))
+    self.output = output
+    self.book_path = book_path
+    self.max_plies = max_plies
+
+  def run(self):
+    tasks = [(i, i % 2 == 0, self.levels, self.max_plies) for i in range(self.games)]
+    scores = []
+    print('{}{}Level {} vs level {}{}, {} games on {} workers\n'.format(
+      Styles.PADDING_SMALL, Colors.BOLD, self.levels[0], self.levels[1], Colors.RESET, self.games, self.workers
+    ))
+    started = time.perf_counter()
+    with open(self.output, 'w') as pgn, multiprocessing.Pool(
+      self.workers, initializer=start_worker, initargs=(self.levels, self.book_path)
+    ) as pool:
+      # Games are written as they finish, Round says which game each is.
+      for (_, score, game) in pool.imap_unordered(play_game, tasks):
+        scores.append(score)
+        pgn.write(game + '\n\n')
+        pgn.flush()
+        self.report_progress(scores, time.perf_counter() - started)
+      pool.close()
+      pool.join()  # Lets workers quit their engines.
+    print('\n')
+    return self.report(scores, time.perf_counter() - started)
+
+  def tally(self, scores):
+    return (scores.count(1), scores.count(0.5), scores.count(0))
+
+  def report_progress(self, scores, seconds):
+    (wins, draws, losses) = self.tally(scores)
+    sys.stdout.write('\r{}{}/{} games  +{} ={} -{}  {:.2f} games/s'.format(
+      Styles.PADDING_SMALL, len(scores), self.games, wins, draws, losses, len(scores) / seconds
+    ))
+    sys.stdout.flush()
+
+  def report(self, scores, seconds):
+    (wins, draws, losses) = self.tally(scores)
+    (elo, low, high) = estimate_elo(scores)
+    rows = [
+      ('Games', '{} in {:.1f} s ({:.2f} games/s)'.format(len(scores), seconds, len(scores) / seconds)),
+      ('Level {}'.format(self.levels[0]), '{} wins, {} draws, {} losses'.format(wins, draws, losses)),
+      ('Elo difference', '{} ({} to {}, 95%)'.format(format_elo(elo), format_elo(low), format_elo(high))),
+      ('Saved to', self.output),
+    ]
+    for (name, value) in rows:
+      print('{}{}{:<16}{}{}'.format(Styles.PADDING_SMALL, Colors.GRAY, name, Colors.RESET, value))
+    print('')
+    return (wins, draws, losses, elo)
@@ -0,0 +1,77 @@
+import json
+import math
+
+from chs.utils.core import Colors, Styles
+
+
+# Fields summarized by trace-summary, in the order they're listed.
+FIELDS = ['input_ms', 'render_ms', 'search_ms', 'nodes', 'nps', 'depth', 'cache_hits', 'cache_misses']
+
+PERCENTILES = [50, 90, 99]
+
+class Trace(object):
+  """
+  Writes one JSON line per ply with where its time went, so a game that
+  feels slow can be measured afterwards with chs trace-summary.
+  """
+  def __init__(self, path):
+    self.path = path
+    self.file = open(path, 'a')
+
+  def record(self, **fields):
+    self.file.write(json.dumps(fields) + '\n')
+    self.file.flush()
+
+  def close(self):
+    self.file.close()
+
+def load_trace(path):
+  """Records of a trace file, skipping lines cut off by a crash."""
+  records = []
+  with open(path, 'r') as f:
+    for line in f:
+      try:
+        records.append(json.loads(line))
+      except ValueError:
+        continue
+  return records
+
+def percentile(values, p):
+  """The nearest-rank pth percentile of values."""
+  ordered = sorted(values)
+  rank = max(1, math.ceil(p / 100 * len(ordered)))
+  return ordered[rank - 1]
+
+def summarize(records):
+  """Percentiles and maximum of each field by side, as {side: (plies, {field: [p50, p90, p99, max]})}."""
+  summary = {}
+  for side in ['user', 'engine']:
+    plies = [record for record in records if record.get('side') == side]
+    fields = {}
+    for field in FIELDS:
+      values = [record[field] for record in plies if record.get(field) is not None]
+      if values:
+        fields[field] = [percentile(values, p) for p in PERCENTILES] + [max(values)]
+    if fields:
+      summary[side] = (len(plies), fields)
+  return summary
+
+def print_summary(path):
+  summary = summarize(load_trace(path))
+  if not summary:
+    print('{}No plies recorded in {}'.format(Styles.PADDING_SMALL, path))
+    return summary
+  for (side, (plies, fields)) in summary.items():
+    print('\n{}{}{} plies by the {}{}'.format(Styles.PADDING_SMALL, Colors.BOLD, plies, side, Colors.RESET))
+    print('{}{}{:<16}{}{}'.format(
+      Styles.PADDING_SMALL, Colors.GRAY, '',
+      ''.join('{:>12}'.format(name) for name in ['p{}'.format(p) for p in PERCENTILES] + ['max']),
+      Colors.RESET
+    ))
+    for (field, values) in fields.items():
+      print('{}{}{:<16}{}{}'.format(
+        Styles.PADDING_SMALL, Colors.GRAY, field, Colors.RESET,
+        ''.join('{:>12,.1f}'.format(value) for value in values)
+      ))
+  print('')
+  return summary
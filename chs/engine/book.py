@@ -0,0 +1,35 @@
+import random
+
+import chess
+import chess.polyglot
+
+from chs.utils.core import Levels
+
+
+class OpeningBook(object):
+  """
+  Polyglot opening book. python-chess memory maps the file, so a lookup
+  only pages in the few entries around the position's Zobrist hash.
+  """
+  def __init__(self, path, rng=None):
+    self.path = path
+    self.reader = chess.polyglot.open_reader(path)
+    self.random = rng or random.Random()
+
+  def choose(self, board, skill_level):
+    """
+    Picks a book move for board, or None once we're out of book. Full
+    strength always plays the book's top move, lower skill levels flatten
+    the weights so weaker opponents vary their openings more.
+    """
+    entries = list(self.reader.find_all(board))
+    if not entries:
+      return None
+    if skill_level >= Levels.MAX_SKILL:
+      return max(entries, key=lambda entry: entry.weight).move
+    sharpness = (skill_level + 1) / 10
+    weights = [entry.weight ** sharpness for entry in entries]
+    return self.random.choices(entries, weights=weights)[0].move
+
+  def close(self):
+    self.reader.close()
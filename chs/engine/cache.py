@@ -0,0 +1,211 @@
+import collections
+import os
+import sqlite3
+import threading
+import time
+
+import chess.engine
+import chess.polyglot
+
+from chs.utils.core import Levels
+
+
+CacheEntry = collections.namedtuple('CacheEntry', ['score', 'move', 'depth', 'limit'])
+
+def satisfies(entry, limit):
+  """Whether a search made with entry.limit is at least as deep as limit asks for."""
+  if limit.depth is not None and entry.depth is not None and entry.depth >= limit.depth:
+    return True
+  if limit.time is not None and entry.limit.time is not None and entry.limit.time >= limit.time:
+    return True
+  if limit.nodes is not None and entry.limit.nodes is not None and entry.limit.nodes >= limit.nodes:
+    return True
+  return False
+
+def cache_key(board, skill_level):
+  # Weakened skill levels pick different moves, so they can't share entries.
+  return (chess.polyglot.zobrist_hash(board), skill_level)
+
+class AnalysisCache(object):
+  """
+  LRU cache of search results keyed by Zobrist hash, so positions we've
+  already searched (e.g. after taking back a move) don't search again.
+  """
+  def __init__(self, size=4096, store=None):
+    self.size = size
+    self.store = store  # Optional DiskCache behind the in-memory entries.
+    self.entries = collections.OrderedDict()
+    self.lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+
+  def get(self, key, limit):
+    with self.lock:
+      entry = self.entries.get(key)
+      if entry is not None and satisfies(entry, limit):
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+    entry = self.store.get(key, limit) if self.store is not None else None
+    with self.lock:
+      if entry is None:
+        self.misses += 1
+        return None
+      self.hits += 1
+    self._remember(key, entry)
+    return entry
+
+  def put(self, key, entry):
+    self._remember(key, entry)
+    if self.store is not None:
+      self.store.put(key, entry)
+
+  def _remember(self, key, entry):
+    with self.lock:
+      current = self.entries.get(key)
+      # Never replace a deeper search with a shallower one.
+      if current is not None and satisfies(current, entry.limit) and not satisfies(entry, current.limit):
+        self.entries.move_to_end(key)
+        return
+      self.entries[key] = entry
+      self.entries.move_to_end(key)
+      while len(self.entries) > self.size:
+        self.entries.popitem(last=False)
+
+  def __len__(self):
+    return len(self.entries)
+
+  def close(self):
+    if self.store is not None:
+      self.store.close()
+
+def get_cache_dir():
+  """Directory for files chs keeps between sessions, None if it can't be used"""
+  cache_dir = os.environ.get('CHS_CACHE_DIR')
+  if cache_dir is None:
+    if os.name == 'nt':
+      base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+      base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    cache_dir = os.path.join(base, 'chs')
+  if not cache_dir:  # Set to an empty string to turn caching off.
+    return None
+  try:
+    os.makedirs(cache_dir, exist_ok=True)
+  except OSError:
+    return None
+  return cache_dir
+
+def to_signed(n):
+  # SQLite integers are signed 64 bit, Zobrist hashes are unsigned.
+  return n - (1 << 64) if n >= (1 << 63) else n
+
+class DiskCache(object):
+  """
+  Persistent store of search results shared by every chs session on the
+  machine. Rows are keyed by position hash, engine identity and skill
+  level, and the least recently used rows are evicted past max_rows.
+  SQLite's WAL mode and busy timeout keep concurrent processes safe, and
+  any database error just turns into a cache miss.
+  """
+  EVICT_EVERY = 64
+
+  def __init__(self, path, identity, max_rows=200000):
+    self.identity = identity
+    self.max_rows = max_rows
+    self.lock = threading.Lock()
+    self.writes = 0
+    self.db = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+    with self.db:
+      self.db.execute('PRAGMA journal_mode=WAL')
+      self.db.execute(
+        'CREATE TABLE IF NOT EXISTS analysis ('
+        ' hash INTEGER, engine TEXT, skill INTEGER,'
+        ' depth INTEGER, time REAL, limit_depth INTEGER, nodes INTEGER,'
+        ' cp INTEGER, mate INTEGER, move TEXT, used REAL,'
+        ' PRIMARY KEY (hash, engine, skill))'
+      )
+      self.db.execute('CREATE INDEX IF NOT EXISTS analysis_used ON analysis (used)')
+
+  @classmethod
+  def open(cls, identity, cache_dir=None):
+    """Opens the cache under cache_dir or else the user's cache dir, None if that isn't possible"""
+    if not isinstance(identity, str):
+      return None
+    cache_dir = cache_dir or get_cache_dir()
+    if cache_dir is None:
+      return None
+    try:
+      return cls(os.path.join(cache_dir, 'analysis.sqlite3'), identity)
+    except sqlite3.Error:
+      return None
+
+  def get(self, key, limit):
+    (zobrist, skill) = key
+    try:
+      with self.lock:
+        row = self.db.execute(
+          'SELECT depth, time, limit_depth, nodes, cp, mate, move FROM analysis'
+          ' WHERE hash = ? AND engine = ? AND skill = ?',
+          (to_signed(zobrist), self.identity, skill)
+        ).fetchone()
+        if row is None:
+          return None
+        entry = self.to_entry(row, skill)
+        if not satisfies(entry, limit):
+          return None
+        with self.db:
+          self.db.execute(
+            'UPDATE analysis SET used = ? WHERE hash = ? AND engine = ? AND skill = ?',
+            (time.time(), to_signed(zobrist), self.identity, skill)
+          )
+        return entry
+    except sqlite3.Error:
+      return None
+
+  def put(self, key, entry):
+    (zobrist, skill) = key
+    (cp, mate) = (None, None)
+    if entry.score is not None:
+      white = entry.score.white()
+      (cp, mate) = (white.score(), white.mate())
+    # Weak levels' moves are never kept, or the opponent would play the same way every session.
+    move = entry.move.uci() if entry.move is not None and skill == Levels.MAX_SKILL else None
+    try:
+      with self.lock:
+        with self.db:
+          self.db.execute(
+            'INSERT OR REPLACE INTO analysis VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (to_signed(zobrist), self.identity, skill, entry.depth, entry.limit.time,
+             entry.limit.depth, entry.limit.nodes, cp, mate, move, time.time())
+          )
+        self.writes += 1
+        if self.writes % self.EVICT_EVERY == 0:
+          self.evict()
+    except sqlite3.Error:
+      pass
+
+  def evict(self):
+    with self.db:
+      self.db.execute(
+        'DELETE FROM analysis WHERE rowid IN ('
+        ' SELECT rowid FROM analysis ORDER BY used ASC'
+        ' LIMIT max(0, (SELECT COUNT(*) FROM analysis) - ?))',
+        (self.max_rows,)
+      )
+
+  def to_entry(self, row, skill):
+    (depth, search_time, limit_depth, nodes, cp, mate, move) = row
+    if skill != Levels.MAX_SKILL:
+      move = None  # Stored by an older version that kept weak levels' moves.
+    score = None
+    if mate is not None:
+      score = chess.engine.PovScore(chess.engine.Mate(mate), chess.WHITE)
+    elif cp is not None:
+      score = chess.engine.PovScore(chess.engine.Cp(cp), chess.WHITE)
+    limit = chess.engine.Limit(time=search_time, depth=limit_depth, nodes=nodes)
+    return CacheEntry(score, chess.Move.from_uci(move) if move else None, depth, limit)
+
+  def close(self):
+    with self.lock:
+      self.db.close()
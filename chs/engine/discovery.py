@@ -0,0 +1,183 @@
+import collections
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+
+from chs.engine.cache import get_cache_dir
+
+
+BUNDLED_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Words in a binary's name that say which CPU flags it needs, and the
+# /proc/cpuinfo flags (any of them) that provide each.
+REQUIREMENTS = {
+  'avx512': ['avx512f', 'avx512bw'],
+  'vnni': ['avx512_vnni', 'avx_vnni'],
+  'avx2': ['avx2'],
+  'bmi2': ['bmi2'],
+  'modern': ['popcnt'],
+  'popcnt': ['popcnt'],
+  'sse41': ['sse4_1'],
+  'neon': ['neon', 'asimd'],
+  'dotprod': ['asimddp'],
+}
+
+# UCI commands for the probe: the engine's name, then a bench short enough
+# for chs bench to run on every binary.
+PROBE_INPUT = 'uci\nbench 16 1 8\nquit\n'
+PROBE_TIMEOUT = 30
+NPS = re.compile(r'Nodes/second\s*:\s*(\d+)')
+ID_NAME = re.compile(r'^id name (.+)$', re.MULTILINE)
+VERSION = re.compile(r'(\d+)(?:\.(\d+))?')
+
+# A binary's UCI id name, e.g. Stockfish 16, and its bench's nodes per second.
+Probe = collections.namedtuple('Probe', ['name', 'nps'])
+
+def get_cpu_flags(cpuinfo='/proc/cpuinfo'):
+  """The CPU's feature flags, empty if the platform won't say."""
+  try:
+    with open(cpuinfo, 'r') as f:
+      for line in f:
+        (name, _, value) = line.partition(':')
+        # x86 lists "flags", ARM lists "Features".
+        if name.strip() in ('flags', 'Features'):
+          return set(value.split())
+  except OSError:
+    pass
+  return set()
+
+def supports(path, flags):
+  """Whether the CPU has every flag the binary's name says it needs. Unknown flags allow anything."""
+  if not flags:
+    return True
+  words = re.split(r'[^a-z0-9]+', os.path.basename(path).lower())
+  return all(any(flag in flags for flag in REQUIREMENTS[word]) for word in words if word in REQUIREMENTS)
+
+def get_bundled():
+  """Bundled binaries built for this OS and architecture."""
+  system = platform.system()
+  machine = platform.machine().lower()
+  if machine in ('aarch64', 'arm64') or machine.startswith('arm'):
+    arches = ('aarch64', 'arm64', 'arm')
+  else:
+    arches = ('x64', 'x86', 'amd64')
+  systems = {'Windows': 'windows', 'Darwin': 'mac', 'Linux': 'linux'}
+  found = []
+  for name in sorted(os.listdir(BUNDLED_DIR)):
+    if not name.startswith('stockfish') or name.endswith('.py'):
+      continue
+    words = re.split(r'[^a-z0-9]+', name.lower())
+    if systems.get(system) in words and any(arch in words for arch in arches):
+      found.append(os.path.join(BUNDLED_DIR, name))
+  return found
+
+def find_candidates(flags=None):
+  """
+  Every Stockfish binary chs could use, as {path: mtime}: the system one
+  and the bundled ones, less those built for CPU flags this CPU lacks.
+  """
+  flags = get_cpu_flags() if flags is None else flags
+  paths = [shutil.which('stockfish')] + get_bundled()
+  candidates = {}
+  for path in paths:
+    if path is None or not supports(path, flags):
+      continue
+    try:
+      candidates[path] = os.stat(path).st_mtime
+    except OSError:
+      continue
+  return candidates
+
+def get_identity(candidates):
+  """What a cached choice has to match: the binaries, their mtimes and which one is on the PATH."""
+  return {'system': shutil.which('stockfish'), 'candidates': candidates}
+
+def probe(path):
+  """The binary's name and bench speed as a Probe, or None if it doesn't run."""
+  try:
+    result = subprocess.run(
+      [path], input=PROBE_INPUT, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+      timeout=PROBE_TIMEOUT, universal_newlines=True,
+    )
+  except (OSError, subprocess.SubprocessError):
+    return None
+  match = NPS.search(result.stdout)
+  if result.returncode != 0 or match is None:
+    return None
+  name = ID_NAME.search(result.stdout)
+  return Probe(name.group(1).strip() if name else None, int(match.group(1)))
+
+def get_version(name):
+  """
+  Version of a Stockfish id name, e.g. (16, 1) for Stockfish 16.1, or ()
+  if it has none. Development builds are named by date, so they rank newest.
+  """
+  match = VERSION.search(name or '')
+  if match is None:
+    return ()
+  return (int(match.group(1)), int(match.group(2) or 0))
+
+def rank(found):
+  """
+  Sort key for a working binary's Probe. Speed is only compared between
+  builds of one version, as newer versions (e.g. with NNUE evaluation)
+  search fewer nodes per second but play much stronger.
+  """
+  return (get_version(found.name), found.nps)
+
+def get_choice_path():
+  cache_dir = get_cache_dir()
+  return os.path.join(cache_dir, 'engine.json') if cache_dir is not None else None
+
+def load_choice(candidates):
+  """The cached fastest binary, if it was chosen from these same binaries."""
+  path = get_choice_path()
+  if path is None:
+    return None
+  try:
+    with open(path, 'r') as f:
+      choice = json.load(f)
+  except (OSError, ValueError):
+    return None
+  if not isinstance(choice, dict) or choice.get('identity') != get_identity(candidates):
+    return None
+  return choice.get('engine')
+
+def save_choice(candidates, probes, engine):
+  path = get_choice_path()
+  if path is None:
+    return
+  partial = path + '.tmp'
+  try:
+    with open(partial, 'w') as f:
+      json.dump({'identity': get_identity(candidates), 'probes': probes, 'engine': engine}, f)
+    os.replace(partial, path)
+  except OSError:
+    pass
+
+# get_cached_engine's answer for each cache dir, looked up once per process.
+_cached_engines = {}
+
+def get_cached_engine():
+  """The binary chs bench picked, if the binaries haven't changed since."""
+  cache_dir = os.environ.get('CHS_CACHE_DIR')
+  if cache_dir not in _cached_engines:
+    _cached_engines[cache_dir] = load_choice(find_candidates())
+  return _cached_engines[cache_dir]
+
+def discover():
+  """
+  Probes every candidate binary, as {path: Probe or None if it doesn't
+  run}, and caches the newest working Stockfish, its fastest build if
+  there are several. Only chs bench probes, a game never waits for it.
+  """
+  candidates = find_candidates()
+  probes = dict((path, probe(path)) for path in candidates)
+  working = [path for (path, found) in probes.items() if found is not None]
+  if working:
+    save_choice(candidates, probes, max(working, key=lambda path: rank(probes[path])))
+  _cached_engines.clear()
+  return probes
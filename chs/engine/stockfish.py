@@ -1,42 +1,18 @@
 import os
 import platform
 import math
-import asyncio
-import types
+import collections
+import multiprocessing.util
+import dataclasses
 import shutil
 import subprocess
-
-# Fix for Python 3.11+ compatibility with older python-chess versions
-# The asyncio.coroutine decorator was removed in Python 3.11+
-if not hasattr(asyncio, 'coroutine'):
-    def coroutine(func):
-        """Compatibility wrapper for the removed asyncio.coroutine decorator"""
-        # Convert generator function to coroutine function
-        if asyncio.iscoroutinefunction(func):
-            return func
-        else:
-            # For generator functions, create a coroutine wrapper
-            async def wrapper(*args, **kwargs):
-                result = func(*args, **kwargs)
-                if hasattr(result, '__next__'):  # It's a generator
-                    # Convert generator to async generator behavior
-                    try:
-                        value = None
-                        while True:
-                            value = result.send(value)
-                            if hasattr(value, '__await__'):
-                                value = await value
-                    except StopIteration as e:
-                        return e.value if hasattr(e, 'value') else None
-                else:
-                    return result
-            return wrapper
-    asyncio.coroutine = coroutine
+import sys
+import threading
+import time
 
 try:
     import chess.engine
 except ImportError:
-    import sys
     print("Error: Missing required dependency 'python-chess'.", file=sys.stderr)
     print("Please install dependencies with:", file=sys.stderr)
     print("  pip install -r requirements.txt", file=sys.stderr)
@@ -44,6 +20,9 @@ except ImportError:
     print("  pip install python-chess", file=sys.stderr)
     raise ImportError("Missing required dependency 'python-chess'. Please install with: pip install python-chess")
 
+from chs.engine.cache import AnalysisCache, CacheEntry, DiskCache, cache_key, get_cache_dir
+from chs.engine.discovery import get_cached_engine
+from chs.engine.tablebase import Tablebase, get_syzygy_path
 from chs.utils.core import Levels
 
 
@@ -75,6 +54,11 @@ def get_engine_path():
     env_engine = os.environ.get('CHS_STOCKFISH_PATH')
     if env_engine and os.path.exists(env_engine):
         return env_engine
+
+    # The binary chs bench picked, see chs.engine.discovery
+    cached_engine = get_cached_engine()
+    if cached_engine and os.path.exists(cached_engine):
+        return cached_engine
     
     # Check for system stockfish first (better for Termux and other environments)
     system_stockfish = get_system_stockfish()
@@ -121,66 +105,575 @@ def get_engine_path():
     # If nothing works, return the expected path (will fail gracefully later)
     return bundled_path
 
-class Engine(object):
-  def __init__(self, level):
-    engine_path = get_engine_path()
-    try:
-      self.engine = chess.engine.SimpleEngine.popen_uci(engine_path)
-      skill_level = Levels.value(level)
-      
-      # Configure engine with appropriate settings
-      engine_config = {'Skill Level': skill_level}
-      
-      # For mobile/ARM devices, add memory-friendly settings
-      if is_termux() or platform.machine().startswith(('arm', 'aarch')):
-          # Reduce memory usage for mobile devices
-          engine_config.update({
-              'Hash': 16,  # Reduce hash table size (MB)
-              'Threads': 1,  # Use single thread on mobile
-          })
-      
-      self.engine.configure(engine_config)
-      
-    except Exception as e:
-      error_msg = f"Failed to start Stockfish engine at '{engine_path}'"
-      
-      if is_termux():
+def get_engine_error(engine_path):
+    """Build a helpful error message for an engine that failed to start"""
+    error_msg = f"Failed to start Stockfish engine at '{engine_path}'"
+
+    if is_termux():
         error_msg += "\n\nFor Termux, please install Stockfish:"
         error_msg += "\n  pkg update && pkg install stockfish"
         error_msg += "\n\nIf you have installation issues, try:"
         error_msg += "\n  pkg install clang && pkg reinstall stockfish"
         error_msg += "\n\nAlternatively, set custom path:"
         error_msg += "\n  export CHS_STOCKFISH_PATH=/path/to/your/stockfish"
-      elif not get_system_stockfish():
+    elif not get_system_stockfish():
         error_msg += "\n\nPlease install Stockfish:"
         error_msg += "\n  - Ubuntu/Debian: apt install stockfish"
         error_msg += "\n  - Fedora: dnf install stockfish"
-        error_msg += "\n  - Arch: pacman -S stockfish" 
+        error_msg += "\n  - Arch: pacman -S stockfish"
         error_msg += "\n  - macOS: brew install stockfish"
         error_msg += "\n  - Windows: Download from https://stockfishchess.org/download/"
-      
-      raise RuntimeError(error_msg) from e
 
-  def play(self, board, time=1.500):
-    return self.engine.play(board, chess.engine.Limit(time=time))
+    return error_msg
+
+class EngineStartError(RuntimeError):
+    """The engine process couldn't be started, with get_engine_error's advice as the message."""
 
-  def score(self, board, pov=chess.WHITE):
+DEFAULT_HASH = 16  # MB, Stockfish's default
+MAX_THREADS = 32
+MAX_HASH = 1024  # MB
+HASH_PER_THREAD = 64  # MB, more threads fill the table faster.
+
+def is_mobile():
+    """Phones and other ARM Linux boards, where battery and memory matter more than depth"""
+    machine = platform.machine()
+    return is_termux() or (platform.system() == 'Linux' and machine.startswith(('arm', 'aarch')))
+
+def get_cgroup_cpus(root='/sys/fs/cgroup'):
+    """CPUs a cgroup quota (e.g. docker --cpus) allows, or None if there's no quota"""
     try:
-      info = self.engine.analyse(board, chess.engine.Limit(time=0.500))
-      cp = chess.engine.PovScore(info['score'], pov).pov(pov).relative.score()
-      return cp
-    except chess.engine.EngineTerminatedError:
-      return None
+        # cgroup v2, e.g. "150000 100000" or "max 100000"
+        with open(os.path.join(root, 'cpu.max'), 'r') as f:
+            (quota, period) = f.read().split()[:2]
+        if quota == 'max':
+            return None
+        return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        # cgroup v1, where a quota of -1 means none
+        with open(os.path.join(root, 'cpu', 'cpu.cfs_quota_us'), 'r') as f:
+            quota = int(f.read())
+        with open(os.path.join(root, 'cpu', 'cpu.cfs_period_us'), 'r') as f:
+            period = int(f.read())
+        return quota / period if quota > 0 and period > 0 else None
+    except (OSError, ValueError):
+        return None
 
-  def normalize(self, cp):
+def get_cpu_limit(root='/sys/fs/cgroup'):
+    """CPUs this process can use, counting its affinity and any cgroup quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # Not on macOS and Windows
+        cpus = os.cpu_count() or 1
+    quota = get_cgroup_cpus(root)
+    if quota is not None:
+        # A thread beyond the quota only gets the search throttled.
+        cpus = min(cpus, max(1, int(quota)))
+    return cpus
+
+def read_int(path):
+    try:
+        with open(path, 'r') as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return None
+
+def get_available_memory(root='/sys/fs/cgroup', meminfo='/proc/meminfo'):
+    """MB of memory free for the engine, counting any cgroup limit, or None if the platform won't say"""
+    available = None
+    try:
+        with open(meminfo, 'r') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    available = int(line.split()[1]) // 1024
+                    break
+    except (OSError, ValueError, IndexError):
+        pass
+    if available is None:
+        try:
+            available = os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') // (1024 * 1024) // 2
+        except (AttributeError, ValueError, OSError):
+            pass
+    # cgroup v2 then v1. Unlimited is "max" in v2 and a huge number in v1.
+    for (limit_file, usage_file) in [('memory.max', 'memory.current'), ('memory/memory.limit_in_bytes', 'memory/memory.usage_in_bytes')]:
+        limit = read_int(os.path.join(root, limit_file))
+        if limit is None or limit >= 2 ** 60:
+            continue
+        free = (limit - (read_int(os.path.join(root, usage_file)) or 0)) // (1024 * 1024)
+        available = free if available is None else min(available, free)
+        break
+    return available
+
+def get_auto_settings(cpus, memory):
+    """
+    Threads and Hash (MB) for a game given the CPUs and MB of memory
+    available: every CPU but one, which is left for drawing the board and
+    the rest of the system, and a power of two hash of at most an eighth
+    of the memory that grows with the threads.
+    """
+    threads = max(1, min(cpus - 1, MAX_THREADS))
+    return (threads, get_hash_size(threads, memory))
+
+def get_hash_size(threads, memory):
+    """Largest power of two hash (MB) for threads within an eighth of memory MB."""
+    hash_size = DEFAULT_HASH
+    if memory is not None:
+        while hash_size * 2 <= min(memory // 8, HASH_PER_THREAD * threads, MAX_HASH):
+            hash_size *= 2
+    return hash_size
+
+def get_override(name, default):
+    """A positive whole number from the environment variable name, else default"""
+    value = os.environ.get(name)
+    if not value:
+        return default
+    try:
+        number = int(value)
+        if number < 1:
+            raise ValueError(value)
+        return number
+    except ValueError:
+        print("Warning: Ignoring {}={}, it should be a positive number.".format(name, value), file=sys.stderr)
+        return default
+
+def get_engine_config(skill_level):
+    """Engine options chs starts Stockfish with on this device"""
+    # Configure engine with appropriate settings
+    engine_config = {'Skill Level': skill_level}
+
+    if is_mobile():
+        # Reduce memory usage and battery drain for mobile devices
+        (threads, hash_size) = (1, DEFAULT_HASH)
+    else:
+        (threads, hash_size) = get_auto_settings(get_cpu_limit(), get_available_memory())
+    engine_config.update({
+        'Hash': get_override('CHS_HASH', hash_size),
+        'Threads': get_override('CHS_THREADS', threads),
+    })
+
+    return engine_config
+
+def start_worker_engine(level, book=None):
+    """
+    An Engine at level for a multiprocessing pool worker, quit when the
+    worker exits. There's one worker per CPU already, so each engine gets
+    a single thread and the default hash unless asked otherwise.
+    """
+    os.environ.setdefault('CHS_THREADS', '1')
+    os.environ.setdefault('CHS_HASH', str(DEFAULT_HASH))
+    engine = Engine(level, book=book)
+    multiprocessing.util.Finalize(None, engine.done, exitpriority=10)
+    return engine
+
+def fit_config(config, options):
+    """config with Threads and Hash held to what the engine's options allow"""
+    config = dict(config)
+    for name in ['Threads', 'Hash']:
+        if name in config and name in options:
+            option = options[name]
+            if option.min is not None:
+                config[name] = max(option.min, config[name])
+            if option.max is not None:
+                config[name] = min(option.max, config[name])
+    return config
+
+def normalize(cp):
+    """Winning chances from -1 to 1 for a centipawn score"""
     if cp is None:
-      return None
+        return None
     # https://github.com/ornicar/lila/blob/80646821b238d044aed5baf9efb7201cd4793b8b/ui/ceval/src/winningChances.ts#L10
     raw_score = 2 / (1 + math.exp(-0.004 * cp)) - 1
     return round(raw_score, 3)
 
-  def done(self):
+# A move for the side to move and the PovScore of the line it starts.
+Candidate = collections.namedtuple('Candidate', ['move', 'score'])
+
+class SharedEngine(object):
+  """
+  A single UCI process that several Engine handles multiplex over.
+  Requests are serialized with a lock, and each request carries its own
+  options (e.g. Skill Level) so handles never see each other's settings.
+  In the background, the process starts on a thread and the first request
+  waits for it, so the board can be drawn while the engine starts.
+  """
+  def __init__(self, engine_path, config, tablebase=None, background=False):
+    self.engine_path = engine_path
+    self.tablebase = tablebase
+    self.lock = threading.RLock()
+    self.game = object()
+    self.handles = 0
+    self.pondering = None
+    self.running = None
+    self.timings = {}  # Seconds each step of starting took, see --profile-startup.
+    # Totals over every search, and the last one's info, see --trace.
+    self.searches = 0
+    self.search_seconds = 0.0
+    self.nodes = 0
+    self.last_info = {}
+    self._engine = None
+    self._cache = None
+    self._error = None
+    self._started = threading.Event()
+    # Resolved now, while the caller's environment (e.g. CHS_CACHE_DIR) still applies.
+    self.cache_dir = get_cache_dir()
+    # Looked up now, so the thread uses whatever popen_uci is at construction.
+    popen = chess.engine.SimpleEngine.popen_uci
+    if background:
+      threading.Thread(target=self._spawn, args=(popen, config), daemon=True).start()
+    else:
+      self._spawn(popen, config)
+      self.wait()
+
+  def _spawn(self, popen, config):
+    try:
+      started = time.perf_counter()
+      engine = popen(self.engine_path)
+      spawned = time.perf_counter()
+      engine.configure(fit_config(config, engine.options))
+      engine.ping()
+      self.timings.update({'spawn': spawned - started, 'isready': time.perf_counter() - spawned})
+      store = DiskCache.open(engine.id.get('name'), self.cache_dir) if self.cache_dir is not None else None
+      self._cache = AnalysisCache(store=store)
+      self._engine = engine
+    except Exception as e:
+      self._error = e
+    finally:
+      self._started.set()
+
+  def wait(self):
+    """Waits for the process to be ready, raising EngineStartError if it couldn't be started."""
+    self._started.wait()
+    if self._error is not None:
+      raise EngineStartError(get_engine_error(self.engine_path)) from self._error
+
+  @property
+  def engine(self):
+    self.wait()
+    return self._engine
+
+  @property
+  def cache(self):
+    self.wait()  # Keyed by the engine's name.
+    return self._cache
+
+  @cache.setter
+  def cache(self, cache):
+    self.wait()
+    self._cache = cache
+
+  def play(self, board, limit, options, ponder=False, **kwargs):
+    with self.lock:
+      self.pondering = None
+      started = time.perf_counter()
+      result = self.engine.play(
+        board, limit, game=self.game, options=options, ponder=ponder,
+        info=chess.engine.INFO_BASIC | chess.engine.INFO_SCORE, **kwargs
+      )
+      self.searched(result.info, time.perf_counter() - started)
+      if ponder and result.ponder is not None:
+        # The engine keeps searching the predicted reply in the background
+        # until the next request, which converts it with a ponderhit when
+        # the position matches and stops it otherwise.
+        after = board.copy(stack=False)
+        after.push(result.move)
+        self.pondering = (after.fen(), result.info.get('score'), result.ponder, options.get('Skill Level'))
+      return result
+
+  def analyse(self, board, limit, options, cancelled=None, multipv=None, on_score=None, **kwargs):
+    """
+    The search's last info, or with multipv, a list of the last info for
+    each line. on_score is called with the best line's score each time the
+    search reports one, so it can be shown before the search is done.
+    """
+    with self.lock:
+      self.pondering = None
+      started = time.perf_counter()
+      analysis = self.engine.analysis(board, limit, multipv=multipv, game=self.game, options=options, **kwargs)
+      self.running = (cancelled, analysis)
+      try:
+        # Checked after publishing the analysis so a concurrent stop() can't miss it.
+        if cancelled is not None and cancelled.is_set():
+          analysis.stop()
+        for info in analysis:
+          if on_score is not None and info.get('multipv', 1) == 1 and 'score' in info:
+            on_score(info['score'])
+        analysis.wait()
+        info = analysis.info
+        self.searched(info, time.perf_counter() - started)
+        return analysis.multipv if multipv else info
+      finally:
+        self.running = None
+
+  def stats(self):
+    """Searches, seconds, nodes, cache hits and misses so far, without waiting for the engine to start."""
+    cache = self._cache
+    return (
+      self.searches, self.search_seconds, self.nodes,
+      cache.hits if cache is not None else 0, cache.misses if cache is not None else 0,
+    )
+
+  def searched(self, info, seconds):
+    self.searches += 1
+    self.search_seconds += seconds
+    self.nodes += info.get('nodes', 0)
+    self.last_info = info
+
+  def stop(self, cancelled):
+    """Stops the running analysis if it was started with this cancelled event."""
+    running = self.running
+    if running is not None and running[0] is cancelled:
+      running[1].stop()
+
+  def ponders_on(self, board):
+    """Whether the engine is pondering from board, at any strength."""
+    with self.lock:
+      return self.pondering is not None and self.pondering[0] == board.fen()
+
+  def ponder_score(self, board):
+    """Score of the last played search, if the engine is pondering from board."""
+    with self.lock:
+      if self.pondering is None or self.pondering[0] != board.fen():
+        return None
+      return self.pondering[1]
+
+  def ponder_candidate(self, board):
+    """
+    The reply the engine is pondering on as a Candidate, if it's pondering
+    from board at full strength. A weakened search's reply isn't the best move.
+    """
+    with self.lock:
+      if self.pondering is None or self.pondering[0] != board.fen() or self.pondering[1] is None:
+        return None
+      if self.pondering[3] != Levels.MAX_SKILL:
+        return None
+      return Candidate(self.pondering[2], self.pondering[1])
+
+  def new_game(self):
+    """
+    Starts a new game on the running process: the next search sends
+    ucinewgame, and whatever it was pondering is forgotten.
+    """
+    with self.lock:
+      self.game = object()
+      self.pondering = None
+
+  def attach(self):
+    with self.lock:
+      self.handles += 1
+
+  def detach(self):
+    with self.lock:
+      self.handles -= 1
+      if self.handles > 0:
+        return None
+      self._started.wait()
+      if self._error is not None:
+        return None
+      self.cache.close()
+      if self.tablebase is not None:
+        self.tablebase.close()
+      try:
+        return self.engine.quit()
+      except chess.engine.EngineTerminatedError:
+        return None
+
+class Evaluation(object):
+  """
+  Analyses a position on a worker thread and hands its count best
+  Candidates to callback, unless the evaluation is cancelled first. The
+  best line's score is handed to on_score as the search deepens. While a
+  weakened engine ponders on the position, just its last score is.
+  """
+  def __init__(self, engine, board, callback, count=1, on_score=None):
+    self.engine = engine
+    self.board = board.copy()
+    self.callback = callback
+    self.count = count
+    self.on_score = on_score
+    self.cancelled = threading.Event()
+    self.thread = threading.Thread(target=self._run, daemon=True)
+    self.thread.start()
+
+  def _run(self):
+    shared = self.engine.shared
+    if shared.ponders_on(self.board) and shared.ponder_candidate(self.board) is None:
+      # A search would stop the weakened engine pondering on your time, so
+      # the bar shows the score of its last move until you ask for a hint.
+      score = shared.ponder_score(self.board)
+      if score is not None and self.on_score is not None:
+        self.on_score(score)
+      candidates = []
+    else:
+      try:
+        candidates = self.engine.candidates(self.board, self.count, cancelled=self.cancelled, on_score=self.on_score)
+      except EngineStartError:
+        candidates = []  # The client says why before asking for a move.
+    if not self.cancelled.is_set():
+      self.callback(candidates)
+
+  def cancel(self):
+    self.cancelled.set()
+    self.engine.shared.stop(self.cancelled)
+
+class Engine(object):
+  def __init__(self, level, shared=None, book=None, background=False):
+    self.profile = Levels.profile(level)
+    self.skill_level = self.profile.skill
+    self.book = book  # Optional OpeningBook consulted before searching.
+    if shared is None:
+      shared = self._start(self.skill_level, background)
+    self.shared = shared
+    self.shared.attach()
+
+  def _start(self, skill_level, background=False):
+    started = time.perf_counter()
+    engine_path = get_engine_path()
+    path_time = time.perf_counter() - started
+    engine_config = get_engine_config(skill_level)
+
+    # Let the engine's search use the tablebases we probe ourselves
+    tablebase = Tablebase.open(get_syzygy_path())
+    if tablebase is not None:
+      engine_config['SyzygyPath'] = tablebase.path
+
+    shared = SharedEngine(engine_path, engine_config, tablebase, background)
+    shared.timings['path'] = path_time
+    return shared
+
+  @property
+  def engine(self):
+    return self.shared.engine
+
+  def share(self, level):
+    """Returns a handle at another level backed by this engine's process."""
+    return Engine(level, self.shared, self.book)
+
+  def new_game(self):
+    return self.shared.new_game()
+
+  def options(self):
+    return {'Skill Level': self.skill_level}
+
+  @property
+  def cache(self):
+    return self.shared.cache
+
+  def limit(self, limit=None):
+    """
+    This level's search budget, or limit (e.g. clocks) held to the level's
+    node and depth caps so weak levels still answer quickly.
+    """
+    if limit is None:
+      return chess.engine.Limit(time=self.profile.time, depth=self.profile.depth, nodes=self.profile.nodes)
+    return dataclasses.replace(
+      limit,
+      depth=limit.depth or self.profile.depth,
+      nodes=limit.nodes or self.profile.nodes,
+    )
+
+  def play(self, board, time=None, ponder=False, limit=None):
+    """Best move for board, within this level's budget unless given another limit or a time in seconds."""
+    if self.book is not None:
+      move = self.book.choose(board, self.skill_level)
+      if move is not None:
+        return chess.engine.PlayResult(move, None)
+    if self.shared.tablebase is not None:
+      move = self.shared.tablebase.choose(board)
+      if move is not None:
+        return chess.engine.PlayResult(move, None)
+    if limit is None and time is not None:
+      limit = chess.engine.Limit(time=time)
+    else:
+      limit = self.limit(limit)
+    key = cache_key(board, self.skill_level)
+    # A weakened engine picks among its moves at random, replaying one would make it predictable.
+    full_strength = self.skill_level == Levels.MAX_SKILL
+    if full_strength:
+      entry = self.cache.get(key, limit)
+      if entry is not None and entry.move is not None:
+        return chess.engine.PlayResult(entry.move, None, {'score': entry.score, 'depth': entry.depth})
+    result = self.shared.play(board, limit, self.options(), ponder=ponder)
+    if limit.white_clock is None and limit.black_clock is None:
+      # A search on the clock isn't comparable to a fixed one, don't let it stand in for one.
+      move = result.move if full_strength else None
+      self.cache.put(key, CacheEntry(result.info.get('score'), move, result.info.get('depth'), limit))
+    return result
+
+  def score(self, board, pov=chess.WHITE, cancelled=None):
+    # Don't interrupt a ponder search, it already evaluated this position.
+    ponder_score = self.shared.ponder_score(board)
+    if ponder_score is not None:
+      return ponder_score.pov(board.turn).score()
+    if self.shared.tablebase is not None:
+      cp = self.shared.tablebase.score(board)
+      if cp is not None:
+        return cp
     try:
-      return self.engine.quit()
+      entry = self.analyse(board, chess.engine.Limit(time=0.500), cancelled)
     except chess.engine.EngineTerminatedError:
       return None
+    if entry is None:
+      return None
+    return entry.score.pov(board.turn).score()
+
+  def analyse(self, board, limit, cancelled=None):
+    """
+    Searches board for its score and, at full strength, best move, as a
+    CacheEntry. None if the search was stopped before it found a score.
+    """
+    key = cache_key(board, self.skill_level)
+    entry = self.cache.get(key, limit)
+    if entry is not None and entry.score is not None:
+      return entry
+    info = self.shared.analyse(board, limit, self.options(), cancelled)
+    if 'score' not in info:  # Stopped before the first info line.
+      return None
+    # A weakened engine doesn't necessarily play its principal variation.
+    move = info['pv'][0] if info.get('pv') and self.skill_level == Levels.MAX_SKILL else None
+    entry = CacheEntry(info['score'], move, info.get('depth'), limit)
+    if cancelled is None or not cancelled.is_set():
+      self.cache.put(key, entry)
+    return entry
+
+  def candidates(self, board, count=1, limit=None, cancelled=None, on_score=None):
+    """
+    The count best moves for board's side to move with their scores, best
+    first, from one MultiPV search within this level's budget. While the
+    engine ponders on board, just the reply it predicted. Empty if the
+    search was stopped before it scored a move.
+    """
+    candidate = self.shared.ponder_candidate(board)
+    if candidate is not None and candidate.move is not None:
+      return [candidate]
+    if self.shared.tablebase is not None:
+      move = self.shared.tablebase.choose(board)
+      cp = self.shared.tablebase.score(board)
+      if move is not None and cp is not None:
+        return [Candidate(move, chess.engine.PovScore(chess.engine.Cp(cp), board.turn))]
+    limit = self.limit(limit)
+    key = cache_key(board, self.skill_level)
+    if count == 1:
+      entry = self.cache.get(key, limit)
+      if entry is not None and entry.move is not None and entry.score is not None:
+        return [Candidate(entry.move, entry.score)]
+    try:
+      lines = self.shared.analyse(board, limit, self.options(), cancelled, multipv=count, on_score=on_score)
+    except chess.engine.EngineTerminatedError:
+      return []
+    candidates = [Candidate(info['pv'][0], info['score']) for info in lines if info.get('pv') and 'score' in info]
+    if candidates and (cancelled is None or not cancelled.is_set()):
+      # A weakened engine doesn't necessarily play its principal variation.
+      move = candidates[0].move if self.skill_level == Levels.MAX_SKILL else None
+      self.cache.put(key, CacheEntry(candidates[0].score, move, lines[0].get('depth'), limit))
+    return candidates
+
+  def evaluate(self, board, callback, count=1, on_score=None):
+    """Analyses board's count best moves in the background, see Evaluation."""
+    return Evaluation(self, board, callback, count, on_score)
+
+  def normalize(self, cp):
+    return normalize(cp)
+
+  def done(self):
+    return self.shared.detach()
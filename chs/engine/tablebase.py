@@ -0,0 +1,86 @@
+import os
+
+import chess
+import chess.syzygy
+
+
+# Centipawns reported for a tablebase win, like the engine's own TB scores.
+TABLEBASE_WIN = 20000
+
+def get_syzygy_path():
+  """Directory of Syzygy tables set by CHS_SYZYGY_PATH, if it exists"""
+  path = os.environ.get('CHS_SYZYGY_PATH')
+  if path and os.path.isdir(path):
+    return path
+  return None
+
+class Tablebase(object):
+  """
+  Local Syzygy tablebases. Positions with few enough pieces get their
+  exact result and best move by probing instead of searching.
+  """
+  def __init__(self, path):
+    self.path = path
+    self.tablebase = chess.syzygy.open_tablebase(path)
+    names = [name for name in self.tablebase.wdl if name in self.tablebase.dtz]
+    # Table names look like KRvKP, one letter per piece.
+    self.max_pieces = max([len(name) - 1 for name in names], default=0)
+
+  @classmethod
+  def open(cls, path):
+    if path is None:
+      return None
+    try:
+      tablebase = cls(path)
+    except OSError:
+      return None
+    return tablebase if tablebase.max_pieces > 0 else None
+
+  def covers(self, board):
+    return (
+      chess.popcount(board.occupied) <= self.max_pieces and
+      not board.castling_rights
+    )
+
+  def score(self, board):
+    """Centipawns for the side to move, None if the position can't be probed"""
+    if not self.covers(board):
+      return None
+    wdl = self.tablebase.get_wdl(board)
+    if wdl is None:
+      return None
+    if wdl == 2:
+      return TABLEBASE_WIN
+    if wdl == -2:
+      return -TABLEBASE_WIN
+    return 0  # Draws, and wins or losses spoiled by the 50 move rule.
+
+  def choose(self, board):
+    """
+    Best move by minmaxing DTZ, which keeps a win in hand (or holds a
+    draw, or resists the longest) while making progress. None if any
+    position can't be probed.
+    """
+    if not self.covers(board):
+      return None
+    board = board.copy(stack=False)
+    ranked = []
+    for move in list(board.legal_moves):
+      board.push(move)
+      try:
+        if board.is_checkmate():
+          return move
+        wdl = self.tablebase.get_wdl(board)
+        dtz = self.tablebase.get_dtz(board)
+      finally:
+        board.pop()
+      if wdl is None or dtz is None:
+        return None
+      # Results are from the opponent's side, so the lowest is our best.
+      ranked.append(((wdl, -dtz), move))
+    if not ranked:
+      return None
+    return min(ranked, key=lambda rank: rank[0])[1]
+
+  def close(self):
+    self.tablebase.close()
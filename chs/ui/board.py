@@ -1,23 +1,15 @@
 import chess
 import pwd
 import os
+import threading
+import time
 
+from chs.client.clock import format_clock
 from chs.client.ending import GameOver
+from chs.ui.renderer import Renderer
 from chs.utils.core import Colors, Styles
 
 
-def disjoin(a, b):
-  result = [a.lower() for a in list(a)]
-  for c in b:
-    try:
-      result.remove(c.lower())
-    except ValueError:
-      pass
-  return ''.join(result)
-
-def flatten(l):
-  return [item for sublist in l for item in sublist]
-
 def safe_pop(l):
   try:
     return l.pop()
@@ -27,106 +19,273 @@ def safe_pop(l):
 def round_to_nearest(x, base=25):
   return base * round(x / base)
 
+def format_score(score):
+  """A Score as pawns, e.g. +0.35, or moves to mate, e.g. #3 or #-2."""
+  if score.is_mate():
+    return '#{}'.format(score.mate())
+  return '{:+.2f}'.format(score.score() / 100)
+
+class Material(object):
+  """
+  Captured pieces and the material balance, from a popcount of each of
+  python-chess's piece bitboards, so it's constant time per position.
+  """
+  # Types in the order captured pieces are listed.
+  ORDER = [chess.PAWN, chess.BISHOP, chess.KNIGHT, chess.ROOK, chess.QUEEN, chess.KING]
+  STARTING = {chess.PAWN: 8, chess.BISHOP: 2, chess.KNIGHT: 2, chess.ROOK: 2, chess.QUEEN: 1, chess.KING: 1}
+  VALUES = {chess.PAWN: 1, chess.BISHOP: 3, chess.KNIGHT: 3, chess.ROOK: 5, chess.QUEEN: 9, chess.KING: 0}
+  GLYPHS = {chess.PAWN: '♙ ', chess.BISHOP: '♝ ', chess.KNIGHT: '♞ ', chess.ROOK: '♜ ', chess.QUEEN: '♛ ', chess.KING: '♚ '}
+
+  def __init__(self, board):
+    # Promotions can leave more pieces than we started with, that's not a capture.
+    self.captured = dict(
+      (color, [max(0, self.STARTING[t] - chess.popcount(board.pieces_mask(t, color))) for t in self.ORDER])
+      for color in chess.COLORS
+    )
+
+  def advantage(self, color):
+    """How many of each type color has captured beyond what it has lost."""
+    taken = self.captured[not color]
+    lost = self.captured[color]
+    return [max(0, a - b) for (a, b) in zip(taken, lost)]
+
+  def text(self, color):
+    return ''.join(self.GLYPHS[t] * n for (t, n) in zip(self.ORDER, self.advantage(color)))
+
+  def score(self, color):
+    def value(counts):
+      return sum(self.VALUES[t] * n for (t, n) in zip(self.ORDER, counts))
+    return value(self.advantage(color)) - value(self.advantage(not color))
+
+# Square highlights, a hint takes precedence over the last move.
+NO_HIGHLIGHT = 0
+LAST_MOVE = 1
+HINT = 2
+
+def build_tiles():
+  """
+  Every square's segment, indexed by (piece symbol or '.' if empty, is
+  dark, highlight, king in check), so drawing a square is a single lookup.
+  """
+  glyphs = {
+    'R': '♜ ', 'N': '♞ ', 'B': '♗ ', 'Q': '♕ ', 'K': '♔ ', 'P': '♙ ',
+    'r': '♜ ', 'n': '♞ ', 'b': '♝ ', 'q': '♛ ', 'k': '♚ ', 'p': '♙ ',
+  }
+  backgrounds = {
+    (False, NO_HIGHLIGHT): Colors.Backgrounds.LIGHT,
+    (True, NO_HIGHLIGHT): Colors.Backgrounds.DARK,
+    (False, LAST_MOVE): Colors.Backgrounds.GREEN_LIGHT,
+    (True, LAST_MOVE): Colors.Backgrounds.GREEN_DARK,
+    (False, HINT): Colors.Backgrounds.PURPLE_LIGHT,
+    (True, HINT): Colors.Backgrounds.PURPLE_DARK,
+  }
+  tiles = {}
+  for ((is_dark, highlight), background) in backgrounds.items():
+    for is_check in [False, True]:
+      tiles[('.', is_dark, highlight, is_check)] = background + '  '
+      for (symbol, glyph) in glyphs.items():
+        color = Colors.LIGHT if symbol.isupper() else Colors.DARK
+        if is_check and symbol in 'Kk':
+          color = Colors.Backgrounds.RED
+        tiles[(symbol, is_dark, highlight, is_check)] = background + color + glyph + Colors.RESET
+  return tiles
+
+TILES = build_tiles()
+
+DARK_SQUARES = [(chess.square_rank(square) + chess.square_file(square)) % 2 == 0 for square in chess.SQUARES]
+
+# Expands a FEN's piece placement into 64 characters, a8 first and h1 last.
+EXPAND_PLACEMENT = str.maketrans(dict([('/', '')] + [(str(n), '.' * n) for n in range(1, 9)]))
+
+def placement_index(square):
+  return (7 - chess.square_rank(square)) * 8 + chess.square_file(square)
+
+# Squares (and their placement index) in the order they're drawn, rank by
+# rank, for each side.
+SQUARES_AS_WHITE = [
+  (chess.square(f, r), placement_index(chess.square(f, r)))
+  for r in range(7, -1, -1) for f in range(8)
+]
+SQUARES_AS_BLACK = SQUARES_AS_WHITE[::-1]
+
 class Board(object):
-  def __init__(self, level, play_as):
+  def __init__(self, level, play_as, clock=None, candidates=0):
     self._play_as = play_as
     self._level = level
+    self._clock = clock
+    self._candidates = candidates  # How many of the engine's best moves to show.
     self._score = 0
     self._cp = 0
+    self._evaluation = None
+    self._analysis = None  # (fen, candidates) of the last finished evaluation.
+    self._generation = 0
+    self._frame = None
+    self._lock = threading.Lock()
+    self._renderer = Renderer()
+    # Time spent drawing frames so far, see --trace.
+    self.render_seconds = 0.0
+    self.frames = 0
+    if clock is not None:
+      threading.Thread(target=self._tick, daemon=True).start()
 
   FILES = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']
 
   def generate(self, fen, board, engine, game_over=None):
-    if board.turn:
-      # Print board before generating the score
-      board_loading = self._generate(fen, board, game_over, True)
-      print(board_loading)
-      print('\n{}{}{}┏━━━━━━━━━━━━━━━━━━━━━━━┓ \n{}┗{}{}{}waiting{}'.format(
-        Styles.PADDING_SMALL, Colors.WHITE, Colors.BOLD,\
-        Styles.PADDING_SMALL, Styles.PADDING_SMALL, Colors.RESET, Colors.GRAY, Colors.RESET)
+    self.cancel_evaluation()
+    if board.turn == self._play_as and game_over is None and self.analysis(fen) is not None:
+      # Already analysed, e.g. redrawing with a hint
+      self._draw(fen, board, game_over)
+    elif board.turn == self._play_as and game_over is None:
+      # Draw board right away and fill in the score in place once it's ready
+      self._draw(fen, board, game_over, True)
+      generation = self._generation
+      self._evaluation = engine.evaluate(
+        board,
+        lambda candidates: self._evaluated(generation, candidates, fen, board, engine),
+        max(1, self._candidates),
+        lambda score: self._scored(generation, score, fen, board, engine),
       )
-      # Analyze the score and print the board again when we're done
-      new_cp = engine.score(board)
-      new_score = engine.normalize(new_cp)
-      self._score = new_score if new_score is not None else self._score
-      self._cp = new_cp if new_cp is not None else self._cp
-      board_loaded = self._generate(fen, board, game_over)
-      print(board_loaded)
+    elif board.turn and game_over is not None:
+      # Nobody is waiting any more, so just analyze the score before drawing
+      self._update_score(engine, engine.score(board))
+      self._draw(fen, board, game_over)
     else:
-      # Print board without generating the score
-      board_loading = self._generate(fen, board, game_over)
-      print(board_loading)
+      # Draw board without generating the score
+      self._draw(fen, board, game_over)
+
+  def analysis(self, fen, wait=False):
+    """
+    The Candidates found for fen, best first, or None if it hasn't been
+    analysed. With wait, first waits for an analysis that's still running.
+    """
+    evaluation = self._evaluation
+    if wait and evaluation is not None:
+      evaluation.thread.join()
+    analysis = self._analysis
+    if analysis is None or analysis[0] != fen:
+      return None
+    return analysis[1]
+
+  def analysed(self, fen, candidates, engine):
+    """Keeps candidates found for fen by a search of their own, e.g. for a hint."""
+    with self._lock:
+      if candidates:
+        self._analysis = (fen, candidates)
+        self._update_score(engine, candidates[0].score.white().score())
+
+  def cancel_evaluation(self):
+    """Stops any pending score, waiting for a redraw that's already underway."""
+    with self._lock:
+      self._generation += 1
+      if self._evaluation is not None:
+        self._evaluation.cancel()
+        self._evaluation = None
+
+  def _draw(self, fen, board, game_over, loading=False):
+    with self._lock:
+      # Remembered so the clocks can be redrawn as they tick.
+      self._frame = (self._generation, fen, board, game_over, loading)
+      self._render(fen, board, game_over, loading)
+
+  def _evaluated(self, generation, candidates, fen, board, engine):
+    with self._lock:
+      if generation != self._generation:
+        return
+      if candidates:
+        self._analysis = (fen, candidates)
+      self._update_score(engine, candidates[0].score.white().score() if candidates else None)
+      self._frame = (generation, fen, board, None, False)
+      # Only the score changes, and the user may be typing below the board.
+      self._render(fen, board, None, keep_cursor=True)
+
+  def _scored(self, generation, score, fen, board, engine):
+    """Fills in the bar as the search deepens, long before its candidates are ready."""
+    with self._lock:
+      cp = score.white().score()
+      if generation != self._generation or cp is None or cp == self._cp:
+        return
+      self._update_score(engine, cp)
+      self._frame = (generation, fen, board, None, True)
+      self._render(fen, board, None, True, keep_cursor=True)
+
+  def _tick(self):
+    """Redraws the running clock each time its face changes, until the game is over."""
+    while True:
+      time.sleep(self._clock.until_change())
+      with self._lock:
+        if self._frame is None:
+          continue
+        (generation, fen, board, game_over, loading) = self._frame
+        if game_over is not None:
+          return
+        if generation != self._generation:
+          continue  # The board is changing, a new frame is on its way.
+        self._render(fen, board, game_over, loading, keep_cursor=True)
+
+  def _render(self, fen, board, game_over, loading=False, keep_cursor=False):
+    started = time.perf_counter()
+    self._renderer.render(self._generate(fen, board, game_over, loading), keep_cursor=keep_cursor)
+    self.render_seconds += time.perf_counter() - started
+    self.frames += 1
+
+  def _update_score(self, engine, cp):
+    new_score = engine.normalize(cp)
+    self._score = new_score if new_score is not None else self._score
+    self._cp = cp if cp is not None else self._cp
 
   def _generate(self, fen, board, game_over, loading=False):
-    self.clear()
-    is_check = board.is_check()
-    loading_text = '   {}↻{}\n'.format(Colors.GRAY, Colors.RESET) if loading else '\n'
+    """Returns the frame as rows of segments, see Renderer."""
+    loading_text = '   {}↻{}'.format(Colors.GRAY, Colors.RESET) if loading else ''
 
     # Label who's turn it is to move
-    turn = fen.split(' ')[1]
-    ui_board = self.get_title_from_move(turn)
-    ui_board += '{}\n'.format(loading_text)
-
-    position_changes = None
-    try:
-      san = board.peek()
-      uci = board.uci(san)
-      starting_position = uci[0:2]
-      ending_position = uci[2:4]
-      position_changes = (starting_position, ending_position)
-    except IndexError:
-      position_changes = None
-
-    hint_positions = None
-    try:
-      uci = board.help_engine_hint
-      starting_position = uci[0:2]
-      ending_position = uci[2:4]
-      hint_positions = (starting_position, ending_position)
-    except TypeError:
-      hint_positions = None
-
-    # Draw the board and pieces
-    fen_positions = fen.split(' ')[0]
-
-    # If user is black, reverse the positions so we draw black first
-    positions = self.white_or_black(fen_positions, fen_positions[::-1])
-    ranks = positions.split('/')
-    rank_i = self.white_or_black(8, 1)
-    rank_i_meta = 8
-
-    def get_piece_composed(piece):
-      if turn == 'b':
-        return self.get_piece_colored(piece, is_check, False)
-      else:
-        return self.get_piece_colored(piece, False, is_check)
-
-    for rank in ranks:
-      file_i = self.white_or_black(1, 8)
-      file_i_meta = 1
-      pieces = flatten(map(get_piece_composed, list(rank)))
-      ui_board += '{}{}{}{} '.format(Styles.PADDING_MEDIUM, Colors.RESET, Colors.GRAY, str(rank_i))
-      # Add each piece + tile
-      for piece in pieces:
-        color = self.get_tile_color_from_position(rank_i, file_i, position_changes, hint_positions)
-        ui_board += '{}{}'.format(color, piece)
-        file_i = self.white_or_black(file_i + 1, file_i - 1)
-        file_i_meta = file_i_meta + 1
+    turn = 'w' if board.turn else 'b'
+    ui_board = [[], [], [self.get_title_from_move(turn), loading_text], []]
+
+    # One pass over the 64 squares, everything else is a table lookup
+    placement = fen.split(' ', 1)[0].translate(EXPAND_PLACEMENT)
+    highlights = [NO_HIGHLIGHT] * 64
+    if board.move_stack:
+      move = board.peek()
+      highlights[move.from_square] = highlights[move.to_square] = LAST_MOVE
+    if board.help_engine_hint is not None:
+      highlights[chess.parse_square(board.help_engine_hint[0:2])] = HINT
+      highlights[chess.parse_square(board.help_engine_hint[2:4])] = HINT
+    checked_king = board.king(board.turn) if board.is_check() else None
+    material = Material(board)
+
+    # If user is black, draw the board from black's side
+    squares = self.white_or_black(SQUARES_AS_WHITE, SQUARES_AS_BLACK)
+    for rank_i_meta in range(8, 0, -1):
+      first = (8 - rank_i_meta) * 8
+      row = ['{}{}{}{} '.format(Styles.PADDING_MEDIUM, Colors.RESET, Colors.GRAY, chess.square_rank(squares[first][0]) + 1)]
+      for (square, index) in squares[first:first + 8]:
+        row.append(TILES[(placement[index], DARK_SQUARES[square], highlights[square], square == checked_king)])
       # Finish the rank
-      ui_board += '{}  {}{}\n'.format(Colors.RESET, self.get_bar_section(rank_i_meta), self.get_meta_section(board, fen, rank_i_meta, game_over))
-      rank_i = self.white_or_black(rank_i - 1, rank_i + 1)
-      rank_i_meta = rank_i_meta - 1
+      row.append('{}  {}'.format(Colors.RESET, self.get_bar_section(rank_i_meta)))
+      row.append(self.get_meta_section(board, fen, rank_i_meta, game_over, material))
+      ui_board.append(row)
 
     # Add files label - If user is black, reverse the file numbering since board is flipped
-    ui_board += ' {}{}'.format(Styles.PADDING_MEDIUM, Colors.GRAY)
     files_ui = self.white_or_black(self.FILES, self.FILES[::-1])
-    for f in files_ui:
-      ui_board += ' {}'.format(f)
+    files_text = ' {}{}{}'.format(Styles.PADDING_MEDIUM, Colors.GRAY, ''.join(' ' + f for f in files_ui))
     # Extra meta text
-    ui_board += '{}{}\n{}'.format(' ' * 6, self.get_meta_section(board, fen, 0, game_over), Colors.RESET)
+    ui_board.append([files_text, '{}{}'.format(' ' * 6, self.get_meta_section(board, fen, 0, game_over, material))])
+    if self._candidates:
+      ui_board.append([])
+      ui_board.append([self.get_candidates_section(fen, board)])
+    ui_board.append([])
     return ui_board
 
-  def get_meta_section(self, board, fen, rank, game_over):
+  def get_candidates_section(self, fen, board):
+    """The engine's best moves for the position the user is thinking about."""
+    candidates = self.analysis(fen) or []
+    moves = ''.join(
+      '{}{} {}{}   '.format(Colors.LIGHT, board.san(candidate.move), Colors.GRAY, format_score(candidate.score.white()))
+      for candidate in candidates[:self._candidates]
+    )
+    return ' {}{}Best  {}{}'.format(Styles.PADDING_MEDIUM, Colors.DULL_GRAY, moves, Colors.RESET)
+
+  def get_meta_section(self, board, fen, rank, game_over, material=None):
     padding = '    '
     padding_alt = '   '
     just_played = game_over or (
@@ -134,25 +293,15 @@ class Board(object):
       if len(board.san_move_stack_white) > len(board.san_move_stack_black)
       else chess.BLACK
     )
-    if rank == 0:
-      positions = fen.split(' ')[0]
-      ranks = positions.split('/')
-      # Calculate advantage pieces
-      (captured_white, captured_black) = self._get_captured_pieces(positions)
-      (white_advantage, black_advantage) = self._diff_pieces(captured_white, captured_black)
-      advantage_text = ''.join(map(
-        self.get_piece,
-        list(self.white_or_black(white_advantage, black_advantage))
-      ))
-      # Calculate advantage score
-      diff_score = self.white_or_black(
-        self._score_pieces(white_advantage) - self._score_pieces(black_advantage),
-        self._score_pieces(black_advantage) - self._score_pieces(white_advantage)
-      )
+    if rank == 0 or rank == 7:
+      # Your captures below the board, the engine's above it
+      color = self._play_as if rank == 0 else not self._play_as
+      material = material or Material(board)
+      diff_score = material.score(color)
       score_text = '+{}'.format(diff_score) if diff_score > 0 else ''
-      return '{}{}{}{}'.format(padding, Colors.DULL_GRAY, advantage_text, score_text)
+      return '{}{}{}{}'.format(padding, Colors.DULL_GRAY, material.text(color), score_text)
     if rank == 1:
-      return '  {}'.format(self.get_user())
+      return '  {}{}'.format(self.get_user(), self.get_clock(self._play_as))
     if rank == 2:
       if isinstance(just_played, GameOver):
         text = '{}{}'.format(Colors.ORANGE, self.string_of_game_over(game_over))
@@ -187,25 +336,8 @@ class Board(object):
       return '{}{}┃ {}{}{}┃'.format(padding_alt, Colors.DULL_GRAY, move_number_text, text, Colors.DULL_GRAY)
     if rank == 6:
       return '{}{}┏━━━━━━━━━━━━━━━━━━━┓'.format(padding_alt, Colors.DULL_GRAY)
-    if rank == 7:
-      positions = fen.split(' ')[0]
-      ranks = positions.split('/')
-      # Calculate advantage pieces
-      (captured_white, captured_black) = self._get_captured_pieces(positions)
-      (white_advantage, black_advantage) = self._diff_pieces(captured_white, captured_black)
-      advantage_text = ''.join(map(
-        self.get_piece,
-        list(self.white_or_black(black_advantage, white_advantage))
-      ))
-      # Calculate advantage score
-      diff_score = self.white_or_black(
-        self._score_pieces(black_advantage) - self._score_pieces(white_advantage),
-        self._score_pieces(white_advantage) - self._score_pieces(black_advantage)
-      )
-      score_text = '+{}'.format(diff_score) if diff_score > 0 else ''
-      return '{}{}{}{}'.format(padding, Colors.DULL_GRAY, advantage_text, score_text)
     if rank == 8:
-      return '  {}'.format(self.get_user(True))
+      return '  {}{}'.format(self.get_user(True), self.get_clock(not self._play_as))
     return ''
 
   def get_user(self, is_computer=False):
@@ -213,6 +345,16 @@ class Board(object):
     name = 'stockfish {}'.format(self._level) if is_computer else pwd.getpwuid(os.getuid()).pw_name
     return '{}● {}{}{}{}'.format(Colors.DULL_GREEN, title, Colors.LIGHT, name, Colors.RESET)
 
+  def get_clock(self, color):
+    if self._clock is None:
+      return ''
+    left = self._clock.time_left(color)
+    if self._clock.is_running(color):
+      face = Colors.RED if left < 10 else Colors.LIGHT
+    else:
+      face = Colors.GRAY
+    return '  {}{}{}'.format(face, format_clock(left), Colors.RESET)
+
   def get_bar_section(self, rank):
     percentage = ''
     tick = ' '
@@ -242,135 +384,9 @@ class Board(object):
     colors = '{}'.format(\
       Colors.Backgrounds.BLACK + Colors.LIGHT if turn == 'b' else\
       Colors.Backgrounds.WHITE + Colors.DARK)
-    return '\n\n {}{}  {}  {}'\
+    return ' {}{}  {}  {}'\
       .format(Styles.PADDING_MEDIUM, colors, player, Colors.RESET)
 
-  def _diff_pieces(self, a, b):
-    white = disjoin(b, a)
-    black = disjoin(a, b)
-    return (white, black)
-
-  def _score_pieces(self, pieces):
-    score = 0
-    scores = {
-      'r': 5,
-      'n': 3,
-      'b': 3,
-      'q': 9,
-      'k': 0,
-      'p': 1
-    }
-    for piece in pieces:
-      score += scores.get(piece)
-    return score
-
-  def _get_captured_pieces(self, positions):
-    # White
-    w_pawns = 8 - positions.count('P')
-    w_rooks = 2 - positions.count('R')
-    w_bishops = 2 - positions.count('B')
-    w_knights = 2 - positions.count('N')
-    w_queens = 1 - positions.count('Q')
-    w_kings = 1 - positions.count('K')
-    w_pieces = (
-      ('P' * w_pawns if w_pawns > 0 else '') +
-      ('B' * w_bishops if w_bishops > 0 else '') +
-      ('N' * w_knights if w_knights > 0 else '') +
-      ('R' * w_rooks if w_rooks > 0 else '') +
-      ('Q' * w_queens if w_queens > 0 else '') +
-      ('K' * w_kings if w_kings > 0 else '')
-    )
-    # Black
-    b_pawns = 8 - positions.count('p')
-    b_rooks = 2 - positions.count('r')
-    b_bishops = 2 - positions.count('b')
-    b_knights = 2 - positions.count('n')
-    b_queens = 1 - positions.count('q')
-    b_kings = 1 - positions.count('k')
-    b_pieces = (
-      ('p' * b_pawns if b_pawns > 0 else '') +
-      ('b' * b_bishops if b_bishops > 0 else '') +
-      ('n' * b_knights if b_knights > 0 else '') +
-      ('r' * b_rooks if b_rooks > 0 else '') +
-      ('q' * b_queens if b_queens > 0 else '') +
-      ('k' * b_kings if b_kings > 0 else '')
-    )
-    return (
-      w_pieces,
-      b_pieces
-    )
-
-  def get_tile_color_from_position(self, r, f, pos_delta, hint_delta):
-    square_coordinates = self.get_coordinates_from_rank_file(r, f)
-    highlight_dark = None
-    highlight_light = None
-    if pos_delta is not None:
-      if square_coordinates in [pos_delta[0], pos_delta[1]]:
-        highlight_light = Colors.Backgrounds.GREEN_LIGHT
-        highlight_dark = Colors.Backgrounds.GREEN_DARK
-    if hint_delta is not None:
-      if square_coordinates in [hint_delta[0], hint_delta[1]]:
-        highlight_light = Colors.Backgrounds.PURPLE_LIGHT
-        highlight_dark = Colors.Backgrounds.PURPLE_DARK
-    if r % 2 == 0:
-      if f % 2 == 0:
-        return highlight_dark or Colors.Backgrounds.DARK
-      return highlight_light or Colors.Backgrounds.LIGHT
-    if f % 2 == 0:
-      return highlight_light or Colors.Backgrounds.LIGHT
-    return highlight_dark or Colors.Backgrounds.DARK
-
-  ### TODO maybe make get_piece_thin?
-  def get_piece(self, letter):
-    pieces = {
-      'R': '♜ ',
-      'N': '♞ ',
-      'B': '♗ ',
-      'Q': '♕ ',
-      'K': '♔ ',
-      'P': '♙ ',
-      'r': '♜ ',
-      'n': '♞ ',
-      'b': '♝ ',
-      'q': '♛ ',
-      'k': '♚ ',
-      'p': '♙ ',
-    }
-    return pieces.get(letter)
-
-  def get_piece_colored(self, letter, is_black_check, is_white_check):
-    black_king_color = Colors.Backgrounds.RED if is_black_check else Colors.DARK
-    white_king_color = Colors.Backgrounds.RED if is_white_check else Colors.LIGHT
-    pieces = {
-      # White
-      'R': [Colors.LIGHT + '♜ ' + Colors.RESET],
-      'N': [Colors.LIGHT + '♞ ' + Colors.RESET],
-      'B': [Colors.LIGHT + '♗ ' + Colors.RESET],
-      'Q': [Colors.LIGHT + '♕ ' + Colors.RESET],
-      'K': [white_king_color + '♔ ' + Colors.RESET],
-      'P': [Colors.LIGHT + '♙ ' + Colors.RESET],
-      # Black
-      'r': [Colors.DARK + '♜ ' + Colors.RESET],
-      'n': [Colors.DARK + '♞ ' + Colors.RESET],
-      'b': [Colors.DARK + '♝ ' + Colors.RESET],
-      'q': [Colors.DARK + '♛ ' + Colors.RESET],
-      'k': [black_king_color + '♚ ' + Colors.RESET],
-      'p': [Colors.DARK + '♙ ' + Colors.RESET],
-      '1': ['  '],
-      '2': ['  ', '  '],
-      '3': ['  ', '  ', '  '],
-      '4': ['  ', '  ', '  ', '  '],
-      '5': ['  ', '  ', '  ', '  ', '  '],
-      '6': ['  ', '  ', '  ', '  ', '  ', '  '],
-      '7': ['  ', '  ', '  ', '  ', '  ', '  ', '  '],
-      '8': ['  ', '  ', '  ', '  ', '  ', '  ', '  ', '  ']
-    }
-    return pieces.get(letter)
-
-  def get_coordinates_from_rank_file(self, r, f):
-    file = self.FILES[f - 1]
-    return '{}{}'.format(file, r)
-
   def string_of_game_over(self, game_over):
     if game_over is GameOver.BLACK_WINS:
       return 'Black wins by checkmate 0-1'
@@ -378,6 +394,10 @@ class Board(object):
       return 'White wins by checkmate 1-0'
     if game_over is GameOver.DRAW:
       return 'Draw ½ ½'
+    if game_over is GameOver.WHITE_WINS_ON_TIME:
+      return 'White wins on time 1-0'
+    if game_over is GameOver.BLACK_WINS_ON_TIME:
+      return 'Black wins on time 0-1'
     if game_over is GameOver.RESIGN:
       return self.white_or_black('White resigns 0-1', 'Black resigns 1-0')
     return 'Game over'
@@ -387,9 +407,3 @@ class Board(object):
 
   def white_or_black(self, a, b):
     return a if self.is_user_white() else b
-
-  def clear(self):
-    if os.name == 'nt': # For windows
-      os.system('cls')
-    else: # For mac and linux
-      os.system('clear')
@@ -0,0 +1,78 @@
+import functools
+import os
+import re
+import sys
+
+from chs.utils.core import Colors
+
+
+ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;]*[A-Za-z]')
+
+@functools.lru_cache(maxsize=1024)
+def visible_width(segment):
+  return len(ANSI_ESCAPE.sub('', segment))
+
+def move_to(row, column):
+  return '\x1b[{};{}H'.format(row + 1, column + 1)
+
+class Renderer(object):
+  """
+  Draws frames at the top of the terminal. A frame is a list of rows, and
+  each row a list of segments (e.g. one per square) that set their own
+  colors. Only segments that differ from the previous frame are written,
+  using cursor addressing, in a single write per frame.
+  """
+  def __init__(self, stream=None):
+    self.stream = stream  # Defaults to whatever sys.stdout is when drawing.
+    self.previous = None
+    if os.name == 'nt':
+      os.system('')  # Turns on escape sequence handling in the Windows console.
+
+  def reset(self):
+    """Forget the screen contents, so the next frame is drawn in full."""
+    self.previous = None
+
+  def render(self, rows, keep_cursor=False):
+    """
+    Draws rows. With keep_cursor the cursor goes back to where it was (e.g.
+    the user is typing below the frame), otherwise it's left under the
+    frame with the rest of the screen cleared.
+    """
+    out = []
+    previous = self.previous
+    if previous is None:
+      out.append('\x1b[H\x1b[2J')
+      previous = []
+    for (y, row) in enumerate(rows):
+      old = previous[y] if y < len(previous) else []
+      if row != old:
+        self._render_row(out, y, row, old)
+    for y in range(len(rows), len(previous)):
+      out.append(move_to(y, 0) + '\x1b[K')
+    if keep_cursor:
+      out.insert(0, '\x1b7')
+      out.append('\x1b8')
+    else:
+      out.append('{}{}\x1b[J'.format(move_to(len(rows), 0), Colors.RESET))
+    self.previous = rows
+    stream = self.stream or sys.stdout
+    stream.write(''.join(out))
+    stream.flush()
+
+  def _render_row(self, out, y, row, old):
+    x = 0
+    i = 0
+    while i < len(row) and i < len(old) and row[i] == old[i]:
+      x += visible_width(row[i])
+      i += 1
+    same_layout = len(row) == len(old) and all(
+      visible_width(a) == visible_width(b) for (a, b) in zip(row[i:], old[i:])
+    )
+    if same_layout:
+      # Segments line up with the old ones, so just overwrite those that changed.
+      for (segment, old_segment) in zip(row[i:], old[i:]):
+        if segment != old_segment:
+          out.append('{}{}{}'.format(move_to(y, x), Colors.RESET, segment))
+        x += visible_width(segment)
+    else:
+      out.append('{}{}{}\x1b[K'.format(move_to(y, x), Colors.RESET, ''.join(row[i:])))
@@ -1,3 +1,37 @@
+import collections
+import json
+import os
+import sys
+
+
+# Stockfish's Skill Level, and caps on the nodes, depth and seconds each
+# search may use (None for no cap). The search stops at whichever comes first.
+LevelProfile = collections.namedtuple('LevelProfile', ['skill', 'nodes', 'depth', 'time'])
+
+def get_config_path():
+  """Where chs reads its config file, CHS_CONFIG overrides the default"""
+  config_path = os.environ.get('CHS_CONFIG')
+  if config_path:
+    return config_path
+  if os.name == 'nt':
+    base = os.environ.get('APPDATA') or os.path.expanduser('~')
+  else:
+    base = os.environ.get('XDG_CONFIG_HOME') or os.path.join(os.path.expanduser('~'), '.config')
+  return os.path.join(base, 'chs', 'config.json')
+
+def load_config(path=None):
+  """The config file as a dict, empty if there isn't one or it can't be read"""
+  path = path or get_config_path()
+  try:
+    with open(path, 'r') as config_file:
+      config = json.load(config_file)
+  except FileNotFoundError:
+    return {}
+  except (OSError, ValueError):
+    print("Warning: Could not read config file '{}', using defaults.".format(path), file=sys.stderr)
+    return {}
+  return config if isinstance(config, dict) else {}
+
 class Colors:
   RESET  = '\x1b[49;0m'
   DARK   = '\x1b[38;5;232;1m'
@@ -38,11 +72,67 @@ class Levels:
   SEVEN = 7
   EIGHT = 8
 
+  MAX_SKILL = 20  # Skill Level of a full strength engine
+
+  # Low levels answer almost at once, the top level searches as long as it used to.
+  PROFILES = [
+    LevelProfile(skill=1, nodes=2000, depth=5, time=0.05),
+    LevelProfile(skill=4, nodes=10000, depth=5, time=0.1),
+    LevelProfile(skill=7, nodes=30000, depth=6, time=0.2),
+    LevelProfile(skill=10, nodes=100000, depth=8, time=0.3),
+    LevelProfile(skill=12, nodes=300000, depth=10, time=0.5),
+    LevelProfile(skill=14, nodes=800000, depth=12, time=0.8),
+    LevelProfile(skill=17, nodes=2000000, depth=16, time=1.2),
+    LevelProfile(skill=20, nodes=None, depth=None, time=1.5),
+  ]
+
+  _profiles = None  # PROFILES with the config file applied, loaded once.
+
   @staticmethod
   def level_of_int(n):
     return max(1, min(n, 8))
 
   @staticmethod
   def value(l):
-    lvls = [1, 4, 7, 10, 12, 14, 17, 20]
-    return lvls[l - 1]
+    return Levels.profile(l).skill
+
+  @staticmethod
+  def profile(l):
+    if Levels._profiles is None:
+      Levels._profiles = Levels.load_profiles(load_config())
+    return Levels._profiles[l - 1]
+
+  @staticmethod
+  def load_profiles(config):
+    """
+    PROFILES with overrides from the config's "levels" section, keyed by
+    level, e.g. {"levels": {"1": {"time": 0.1}, "8": {"depth": 30}}}.
+    Overrides that don't make sense are ignored with a warning.
+    """
+    profiles = list(Levels.PROFILES)
+    overrides = config.get('levels', {})
+    if not isinstance(overrides, dict):
+      overrides = {}
+    for (level, fields) in overrides.items():
+      try:
+        i = int(level) - 1
+        if not 0 <= i < len(profiles) or not isinstance(fields, dict):
+          raise ValueError
+        profile = profiles[i]._replace(**dict((k, v) for (k, v) in fields.items() if k in LevelProfile._fields))
+        Levels.check_profile(profile)
+        profiles[i] = profile
+      except (TypeError, ValueError):
+        print("Warning: Ignoring config for level '{}'.".format(level), file=sys.stderr)
+    return profiles
+
+  @staticmethod
+  def check_profile(profile):
+    if not isinstance(profile.skill, int) or not 0 <= profile.skill <= Levels.MAX_SKILL:
+      raise ValueError
+    for cap in [profile.nodes, profile.depth]:
+      if cap is not None and (not isinstance(cap, int) or cap <= 0):
+        raise ValueError
+    if profile.time is not None and (not isinstance(profile.time, (int, float)) or profile.time <= 0):
+      raise ValueError
+    if profile.nodes is None and profile.depth is None and profile.time is None:
+      raise ValueError  # The search would never end.
@@ -21,7 +21,7 @@ setup(
   keywords = ['chess', 'terminal', 'stockfish'],
   packages = find_packages(),
   install_requires=[
-    'python-chess',
+    'python-chess>=1.9.0',
     'editdistance-s',
   ],
   entry_points={
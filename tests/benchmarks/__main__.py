@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Runs the benchmark suite and saves the results as JSON. Pass a previous
+run's file to --compare to fail on regressions between versions:
+
+  python -m tests.benchmarks --output=before.json
+  python -m tests.benchmarks --output=after.json --compare=before.json
+
+Flags:
+  --output=[PATH]     Where to write the results (default benchmarks.json)
+  --compare=[PATH]    Results to check against, exits 1 on a regression
+  --threshold=[N]     How much slower counts as a regression (default 0.2)
+  --latency=[SEC]     How long each fake engine search takes (default 0.01)
+  --engine=[PATH]     Benchmark against a real UCI engine instead
+  --quick             Fewer iterations, for a smoke test
+"""
+
+import json
+import platform
+import sys
+import time
+
+import chess
+
+from chs.__main__ import get_version
+from tests.benchmarks import suite
+
+
+def get_flag(args, name, default=None):
+  flag = [arg for arg in args if arg.startswith('--{}='.format(name))]
+  return flag[0].split('=', 1)[1] if flag else default
+
+def main(args):
+  output = get_flag(args, 'output', 'benchmarks.json')
+  baseline = get_flag(args, 'compare')
+  threshold = float(get_flag(args, 'threshold', '0.2'))
+  results = suite.run(
+    quick='--quick' in args,
+    latency=float(get_flag(args, 'latency', '0.01')),
+    engine_path=get_flag(args, 'engine'),
+  )
+  report = {
+    'version': get_version(),
+    'python': platform.python_version(),
+    'python-chess': chess.__version__,
+    'platform': platform.platform(),
+    'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+    'results': results,
+  }
+  with open(output, 'w') as f:
+    json.dump(report, f, indent=2, sort_keys=True)
+  for (name, value) in sorted(results.items()):
+    print('{:<32} {:>12.3f}'.format(name, value))
+  print('\nSaved to {}'.format(output))
+
+  if baseline is None:
+    return 0
+  with open(baseline) as f:
+    previous = json.load(f)['results']
+  regressions = suite.compare(previous, results, threshold)
+  for (name, before, after) in regressions:
+    print('Regression: {} {:.3f} -> {:.3f} ({:+.0%})'.format(name, before, after, after / before - 1))
+  if not regressions:
+    print('No regressions against {}'.format(baseline))
+  return 1 if regressions else 0
+
+if __name__ == '__main__':
+  sys.exit(main(sys.argv[1:]))
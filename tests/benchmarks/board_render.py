@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for building a board frame with Board._generate.
+Run it on two revisions to compare them:
+
+  python -m tests.benchmarks.board_render
+"""
+
+import timeit
+
+import chess
+
+from chs.ui.board import Board
+
+
+# Opening, middlegame with a hint shown, and an endgame in check.
+POSITIONS = [
+  ([], None),
+  (['e4', 'e5', 'Nf3', 'Nc6', 'Bb5', 'a6', 'Ba4', 'Nf6', 'O-O', 'Be7'], 'f1e1'),
+  (['e4', 'f5', 'exf5', 'g5', 'Qh5'], None),
+]
+
+def make_board(moves, hint):
+  board = chess.Board()
+  board.san_move_stack_white = []
+  board.san_move_stack_black = []
+  for move in moves:
+    stack = board.san_move_stack_white if board.turn else board.san_move_stack_black
+    stack.append(move)
+    board.push_san(move)
+  board.help_engine_hint = hint
+  return board
+
+def bench(number=2000):
+  results = {}
+  for play_as in [chess.WHITE, chess.BLACK]:
+    ui = Board(1, play_as)
+    boards = [make_board(moves, hint) for (moves, hint) in POSITIONS]
+    fens = [board.fen() for board in boards]
+    def frames():
+      for (fen, board) in zip(fens, boards):
+        ui._generate(fen, board, None)
+    seconds = min(timeit.repeat(frames, number=number, repeat=3))
+    results['white' if play_as else 'black'] = seconds / (number * len(boards)) * 1e6
+  return results
+
+if __name__ == '__main__':
+  for (side, usec) in bench().items():
+    print('Board._generate as {}: {:.1f} us/frame'.format(side, usec))
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+A scripted stand-in for Stockfish that speaks just enough UCI for chs.
+Every search takes the same fixed time and answers the same position with
+the same move, so benchmarks measure chs rather than the engine.
+
+  FAKE_UCI_LATENCY  Seconds each search takes (default 0.01)
+  FAKE_UCI_STARTUP  Seconds before answering uci (default 0)
+  FAKE_UCI_NPS      Nodes per second it claims to search (default 1000000)
+"""
+
+import os
+import sys
+import time
+
+import chess
+
+
+NAME = 'chs fake uci'
+
+OPTIONS = [
+  'option name Hash type spin default 16 min 1 max 33554432',
+  'option name Threads type spin default 1 min 1 max 512',
+  'option name Skill Level type spin default 20 min 0 max 20',
+  'option name MultiPV type spin default 1 min 1 max 500',
+  'option name Ponder type check default false',
+  'option name SyzygyPath type string default <empty>',
+]
+
+VALUES = {chess.PAWN: 100, chess.KNIGHT: 300, chess.BISHOP: 300, chess.ROOK: 500, chess.QUEEN: 900}
+
+def send(line):
+  sys.stdout.write(line + '\n')
+  sys.stdout.flush()
+
+def choose(board):
+  """The same reply for the same position, rotating through the legal moves by ply."""
+  moves = sorted(move.uci() for move in board.legal_moves)
+  if not moves:
+    return None
+  return chess.Move.from_uci(moves[board.ply() % len(moves)])
+
+def evaluate(board):
+  """Material balance from the side to move's point of view."""
+  return sum(
+    value * (len(board.pieces(piece_type, board.turn)) - len(board.pieces(piece_type, not board.turn)))
+    for (piece_type, value) in VALUES.items()
+  )
+
+def parse_position(tokens):
+  if tokens[1] == 'fen':
+    board = chess.Board(' '.join(tokens[2:8]))
+    rest = tokens[8:]
+  else:
+    board = chess.Board()
+    rest = tokens[2:]
+  for uci in rest[1:] if rest[:1] == ['moves'] else []:
+    board.push_uci(uci)
+  return board
+
+def search(board, latency, nps):
+  move = choose(board)
+  if move is None:
+    score = 'mate 0' if board.is_checkmate() else 'cp 0'
+    send('info depth 0 score {}'.format(score))
+    send('bestmove (none)')
+    return
+  nodes = max(1, int(latency * nps))
+  send('info depth 1 seldepth 1 multipv 1 score cp {} nodes {} nps {} time {} pv {}'.format(
+    evaluate(board), nodes, nps, int(latency * 1000), move.uci()
+  ))
+  after = board.copy(stack=False)
+  after.push(move)
+  reply = choose(after)
+  if reply is None:
+    send('bestmove {}'.format(move.uci()))
+  else:
+    send('bestmove {} ponder {}'.format(move.uci(), reply.uci()))
+
+def main():
+  latency = float(os.environ.get('FAKE_UCI_LATENCY', '0.01'))
+  startup = float(os.environ.get('FAKE_UCI_STARTUP', '0'))
+  nps = int(os.environ.get('FAKE_UCI_NPS', '1000000'))
+  board = chess.Board()
+  waiting = None  # Position of an infinite or ponder search, answered on stop or ponderhit.
+
+  for line in sys.stdin:
+    tokens = line.split()
+    if not tokens:
+      continue
+    command = tokens[0]
+    if command == 'uci':
+      time.sleep(startup)
+      send('id name {}'.format(NAME))
+      send('id author chs')
+      for option in OPTIONS:
+        send(option)
+      send('uciok')
+    elif command == 'isready':
+      send('readyok')
+    elif command == 'position':
+      board = parse_position(tokens)
+    elif command == 'go':
+      if 'infinite' in tokens or 'ponder' in tokens:
+        waiting = board
+      else:
+        time.sleep(latency)
+        search(board, latency, nps)
+    elif command == 'ponderhit' and waiting is not None:
+      time.sleep(latency)
+      search(waiting, latency, nps)
+      waiting = None
+    elif command == 'stop' and waiting is not None:
+      search(waiting, latency, nps)
+      waiting = None
+    elif command == 'quit':
+      break
+
+if __name__ == '__main__':
+  main()
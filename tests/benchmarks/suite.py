@@ -0,0 +1,168 @@
+"""
+Times the hot paths of chs against the fake UCI engine in fake_uci.py,
+so the numbers don't depend on how strong or fast Stockfish is.
+"""
+
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+from unittest import mock
+
+import chess
+
+from chs.client.runner import Client
+from chs.engine.parser import FenParser
+from chs.engine.stockfish import Engine, get_engine_path
+from chs.utils.core import Levels
+from tests.benchmarks import board_render
+
+
+FAKE_UCI = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_uci.py')
+
+# Typos of moves that are legal in the middlegame position, and some that aren't close to anything.
+TYPOS = ['Bb3', 'Nxe4', 'Re2', 'c3', 'd4', 'Qe1', 'O-O-O', 'Kh2', 'zz9', 'hint!']
+
+def write_fake_engine(directory):
+  """
+  A launcher for fake_uci.py with this interpreter, since chs expects an
+  engine to be a single executable path.
+  """
+  path = os.path.join(directory, 'fake-uci')
+  with open(path, 'w') as launcher:
+    launcher.write('#!/bin/sh\nexec "{}" "{}" "$@"\n'.format(sys.executable, FAKE_UCI))
+  os.chmod(path, 0o755)
+  return path
+
+@contextlib.contextmanager
+def fake_engine(latency=0.01, startup=0.0, engine_path=None):
+  """
+  Points chs at the fake engine (or engine_path) with a throwaway analysis
+  cache and no tablebases, books or pondering state leaking in from the user.
+  """
+  with tempfile.TemporaryDirectory() as directory:
+    environment = {
+      'CHS_STOCKFISH_PATH': engine_path or write_fake_engine(directory),
+      'CHS_CACHE_DIR': os.path.join(directory, 'cache'),
+      'FAKE_UCI_LATENCY': str(latency),
+      'FAKE_UCI_STARTUP': str(startup),
+    }
+    with mock.patch.dict(os.environ, environment):
+      os.environ.pop('CHS_SYZYGY_PATH', None)
+      os.environ.pop('CHS_BOOK_PATH', None)
+      yield environment['CHS_STOCKFISH_PATH']
+
+def per_call(function, number, repeat=3):
+  """Best of repeat runs, in microseconds per call."""
+  return min(timeit.repeat(function, number=number, repeat=repeat)) / number * 1e6
+
+def bench_fen_parser(number=20000):
+  fens = [board_render.make_board(moves, hint).fen() for (moves, hint) in board_render.POSITIONS]
+  def parse():
+    for fen in fens:
+      FenParser(fen).get_to_move(fen)
+  return {'fen_parser_us': per_call(parse, number) / len(fens)}
+
+def bench_engine_path(number=2000):
+  with fake_engine() as engine_path:
+    override = per_call(get_engine_path, number)
+    with mock.patch.dict(os.environ):
+      os.environ.pop('CHS_STOCKFISH_PATH')
+      search = per_call(get_engine_path, number)
+  return {'engine_path_override_us': override, 'engine_path_search_us': search}
+
+def bench_closest_move(client, number=200):
+  client.board = board_render.make_board(board_render.POSITIONS[1][0], None)
+  def suggest():
+    for typo in TYPOS:
+      client.closest_move(typo)
+  return {'closest_move_us': per_call(suggest, number) / len(TYPOS)}
+
+def bench_startup(repeat=5):
+  """Wall time from nothing to a ready engine, and back."""
+  starts = []
+  stops = []
+  for _ in range(repeat):
+    started = time.perf_counter()
+    engine = Engine(Levels.ONE)
+    starts.append(time.perf_counter() - started)
+    started = time.perf_counter()
+    engine.done()
+    stops.append(time.perf_counter() - started)
+  return {'engine_start_ms': statistics.median(starts) * 1e3, 'engine_quit_ms': statistics.median(stops) * 1e3}
+
+def scripted_input(client, plies):
+  """
+  Stands in for input(): plays a fixed reply for each position, then
+  resigns by running out of input after plies half-moves.
+  """
+  def drawn():
+    frame = client.ui_board._frame
+    return frame is not None and frame[1] == client.fen()
+  def answer(prompt=''):
+    # Asked during the engine's search too, for a premove; answers like a
+    # user would, once the reply is on the board rather than as a premove.
+    while (client.board.turn != client.play_as or not drawn()) and not client.board.is_game_over():
+      time.sleep(0.001)
+    if client.board.ply() >= plies or client.board.is_game_over():
+      raise EOFError
+    moves = sorted(client.board.san(move) for move in client.board.legal_moves)
+    return moves[client.board.ply() % len(moves)]
+  return answer
+
+def play_game(level, play_as, plies):
+  """
+  Plays a scripted game through Client.run and returns how long it took
+  and how many plies were played. Every game starts with an empty analysis
+  cache, otherwise repeats of the same game never reach the engine.
+  """
+  with tempfile.TemporaryDirectory() as cache_dir, mock.patch.dict(os.environ, {'CHS_CACHE_DIR': cache_dir}):
+    with contextlib.redirect_stdout(io.StringIO()):
+      client = Client(level, play_as)
+      with mock.patch('builtins.input', scripted_input(client, plies)):
+        started = time.perf_counter()
+        client.run()
+        seconds = time.perf_counter() - started
+  return (seconds, client.board.ply())
+
+def bench_games(games=3, plies=40):
+  results = {}
+  for (name, play_as) in [('white', chess.WHITE), ('black', chess.BLACK)]:
+    played = [play_game(Levels.ONE, play_as, plies) for _ in range(games)]
+    results['game_as_{}_s'.format(name)] = statistics.median(seconds for (seconds, _) in played)
+    results['game_as_{}_ms_per_ply'.format(name)] = statistics.median(
+      seconds / max(1, ply) * 1e3 for (seconds, ply) in played
+    )
+  return results
+
+def run(quick=False, latency=0.01, engine_path=None):
+  """Runs every benchmark and returns their results by name, lower is better for all of them."""
+  scale = 10 if quick else 1
+  results = {}
+  for (side, usec) in board_render.bench(2000 // scale).items():
+    results['board_render_{}_us'.format(side)] = usec
+  results.update(bench_fen_parser(20000 // scale))
+  results.update(bench_engine_path(2000 // scale))
+  with fake_engine(latency, engine_path=engine_path):
+    with contextlib.redirect_stdout(io.StringIO()):
+      client = Client(Levels.ONE, chess.WHITE)
+    try:
+      results.update(bench_closest_move(client, 200 // scale))
+    finally:
+      client.engine.done()
+      client.hint_engine.done()
+    results.update(bench_startup(2 if quick else 5))
+    results.update(bench_games(1 if quick else 3, 8 if quick else 40))
+  return results
+
+def compare(old, new, threshold=0.2):
+  """Benchmarks in both result sets that got slower by more than threshold, as (name, old, new)."""
+  return [
+    (name, old[name], new[name])
+    for name in sorted(set(old) & set(new))
+    if old[name] > 0 and new[name] > old[name] * (1 + threshold)
+  ]
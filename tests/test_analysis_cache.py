@@ -0,0 +1,184 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+import chess
+import chess.engine
+
+from chs.engine.cache import AnalysisCache, CacheEntry, DiskCache, cache_key
+from chs.engine.stockfish import Engine
+from chs.utils.core import Levels
+
+
+def entry(time=None, depth=None, move=None):
+    score = chess.engine.PovScore(chess.engine.Cp(25), chess.WHITE)
+    return CacheEntry(score, move, depth, chess.engine.Limit(time=time))
+
+
+class TestAnalysisCache(unittest.TestCase):
+    """Tests for the Zobrist keyed LRU analysis cache"""
+
+    def test_deeper_entry_satisfies_shallower_limit(self):
+        """Test that a cached search satisfies requests for less time or depth"""
+        cache = AnalysisCache()
+        cache.put('key', entry(time=1.5, depth=18))
+        self.assertIsNotNone(cache.get('key', chess.engine.Limit(time=0.5)))
+        self.assertIsNotNone(cache.get('key', chess.engine.Limit(depth=12)))
+        self.assertIsNone(cache.get('key', chess.engine.Limit(time=3.0)))
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+    def test_shallower_entry_does_not_replace_deeper(self):
+        """Test that storing a shorter search keeps the deeper one"""
+        cache = AnalysisCache()
+        cache.put('key', entry(time=1.5, depth=18))
+        cache.put('key', entry(time=0.5, depth=12))
+        self.assertEqual(cache.get('key', chess.engine.Limit(time=1.5)).depth, 18)
+
+    def test_least_recently_used_evicted(self):
+        """Test that the cache keeps at most size entries"""
+        cache = AnalysisCache(size=2)
+        cache.put('a', entry(time=1.0))
+        cache.put('b', entry(time=1.0))
+        cache.get('a', chess.engine.Limit(time=1.0))
+        cache.put('c', entry(time=1.0))
+        self.assertEqual(len(cache), 2)
+        self.assertIsNotNone(cache.get('a', chess.engine.Limit(time=1.0)))
+        self.assertIsNone(cache.get('b', chess.engine.Limit(time=1.0)))
+
+    def test_key_uses_zobrist_hash_and_skill(self):
+        """Test that transpositions share a key but skill levels don't"""
+        a = chess.Board()
+        for move in ['Nf3', 'Nf6', 'Nc3']:
+            a.push_san(move)
+        b = chess.Board()
+        for move in ['Nc3', 'Nf6', 'Nf3']:
+            b.push_san(move)
+        self.assertEqual(cache_key(a, 1), cache_key(b, 1))
+        self.assertNotEqual(cache_key(a, 1), cache_key(a, 20))
+
+
+class TestDiskCache(unittest.TestCase):
+    """Tests for the analysis cache persisted between sessions"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'analysis.sqlite3')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_entries_survive_reopening(self):
+        """Test that a new session reads what an earlier one stored"""
+        store = DiskCache(self.path, 'Stockfish 16')
+        key = cache_key(chess.Board(), 20)
+        store.put(key, entry(time=1.0, depth=16, move=chess.Move.from_uci('e2e4')))
+        store.close()
+
+        store = DiskCache(self.path, 'Stockfish 16')
+        cached = store.get(key, chess.engine.Limit(time=0.5))
+        self.assertEqual(cached.move, chess.Move.from_uci('e2e4'))
+        self.assertEqual(cached.depth, 16)
+        self.assertEqual(cached.score.white().score(), 25)
+        self.assertIsNone(store.get(key, chess.engine.Limit(time=2.0)))
+        store.close()
+
+    def test_weak_level_moves_not_stored(self):
+        """Test that only the score of a weakened engine's search is kept"""
+        store = DiskCache(self.path, 'Stockfish 16')
+        key = cache_key(chess.Board(), 1)
+        store.put(key, entry(time=1.0, move=chess.Move.from_uci('e2e4')))
+        self.assertIsNone(store.db.execute('SELECT move FROM analysis').fetchone()[0])
+        cached = store.get(key, chess.engine.Limit(time=1.0))
+        self.assertIsNone(cached.move)
+        self.assertEqual(cached.score.white().score(), 25)
+
+    def test_engines_do_not_share_entries(self):
+        """Test that results from another engine are never used"""
+        key = cache_key(chess.Board(), 20)
+        DiskCache(self.path, 'Stockfish 10').put(key, entry(time=1.0))
+        self.assertIsNone(DiskCache(self.path, 'Stockfish 16').get(key, chess.engine.Limit(time=1.0)))
+
+    def test_concurrent_sessions(self):
+        """Test that two open sessions see each other's writes"""
+        first = DiskCache(self.path, 'Stockfish 16')
+        second = DiskCache(self.path, 'Stockfish 16')
+        key = cache_key(chess.Board(), 20)
+        first.put(key, entry(time=1.0))
+        self.assertIsNotNone(second.get(key, chess.engine.Limit(time=1.0)))
+
+    def test_size_cap_evicts_least_recently_used(self):
+        """Test that the store is trimmed back to max_rows"""
+        store = DiskCache(self.path, 'Stockfish 16', max_rows=10)
+        keys = [(zobrist, 20) for zobrist in range(DiskCache.EVICT_EVERY)]
+        for key in keys:
+            store.put(key, entry(time=1.0))
+        count = store.db.execute('SELECT COUNT(*) FROM analysis').fetchone()[0]
+        self.assertLessEqual(count, 10)
+        self.assertIsNotNone(store.get(keys[-1], chess.engine.Limit(time=1.0)))
+
+    def test_memory_cache_falls_back_to_store(self):
+        """Test that the in-memory cache consults the store on a miss"""
+        key = cache_key(chess.Board(), 20)
+        DiskCache(self.path, 'Stockfish 16').put(key, entry(time=1.0))
+        cache = AnalysisCache(store=DiskCache(self.path, 'Stockfish 16'))
+        self.assertIsNotNone(cache.get(key, chess.engine.Limit(time=1.0)))
+        self.assertEqual(cache.hits, 1)
+
+    def test_disabled_with_empty_cache_dir(self):
+        """Test that CHS_CACHE_DIR='' turns the store off"""
+        with patch.dict(os.environ, {'CHS_CACHE_DIR': ''}):
+            self.assertIsNone(DiskCache.open('Stockfish 16'))
+
+
+class TestEngineCache(unittest.TestCase):
+    """Tests for Engine requests being served from the cache"""
+
+    def setUp(self):
+        patcher = patch('chess.engine.SimpleEngine.popen_uci')
+        self.mock_popen = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_engine = MagicMock()
+        self.mock_engine.play.return_value = chess.engine.PlayResult(
+            chess.Move.from_uci('e2e4'), None,
+            {'score': chess.engine.PovScore(chess.engine.Cp(30), chess.WHITE), 'depth': 15}
+        )
+        self.mock_popen.return_value = self.mock_engine
+
+    def test_play_after_takeback_uses_cache(self):
+        """Test that searching a position seen again after back is free"""
+        engine = Engine(Levels.EIGHT)
+        board = chess.Board()
+        engine.play(board)
+        board.push_san('e4')
+        board.push_san('e5')
+        board.pop()
+        board.pop()
+        result = engine.play(board)
+
+        self.assertEqual(result.move, chess.Move.from_uci('e2e4'))
+        self.mock_engine.play.assert_called_once()
+        self.assertEqual(engine.cache.hits, 1)
+
+    def test_weak_level_moves_not_replayed(self):
+        """Test that a weakened engine searches again rather than repeating a cached move"""
+        engine = Engine(Levels.ONE)
+        board = chess.Board()
+        engine.play(board)
+        engine.play(board)
+
+        self.assertEqual(self.mock_engine.play.call_count, 2)
+        self.assertIsNone(engine.cache.get(cache_key(board, engine.skill_level), engine.limit()).move)
+
+    def test_score_uses_longer_play_search(self):
+        """Test that a move search also answers the shorter score request"""
+        engine = Engine(Levels.EIGHT)
+        board = chess.Board()
+        engine.play(board)
+        self.assertEqual(engine.score(board), 30)
+        self.mock_engine.analysis.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import chess
+import chess.engine
+import chess.pgn
+
+from chs.client.analyze import Analysis, annotate
+from tests.benchmarks import suite
+
+
+GAMES = [
+    '[Event "One"]\n\n1. e4 e5 2. Qh5 Nc6 3. Bc4 Nf6 4. Qxf7# 1-0\n\n',
+    '[Event "Two"]\n\n1. d4 d5 2. c4 { A comment } e6 3. Nc3 Nf6 1/2-1/2\n\n',
+    '[Event "Three"]\n\n1. f3 e5 2. g4 Qh4# 0-1\n\n',
+    '[Event "Four"]\n\n1. e4 c5 2. Nf3 d6 3. d4 cxd4 4. Nxd4 Nf6 5. Nc3 a6 *\n\n',
+]
+
+def cp(n):
+    return chess.engine.PovScore(chess.engine.Cp(n), chess.WHITE)
+
+
+class TestAnnotate(unittest.TestCase):
+    """Tests for judging moves from the scores around them"""
+
+    def test_marks_blunder_with_best_move(self):
+        """Test that a move throwing away a winning position is a blunder"""
+        game = chess.pgn.read_game(io.StringIO('1. e4 e5 2. Qh5 *'))
+        results = [(cp(20), 'e2e4'), (cp(30), 'e7e5'), (cp(30), 'g1f3'), (cp(-400), None)]
+        annotate(game, results)
+        (e4, e5, qh5) = list(game.mainline())
+        self.assertEqual(e4.nags, set())
+        self.assertIn(chess.pgn.NAG_BLUNDER, qh5.nags)
+        self.assertIn('Blunder. Best was Nf3.', qh5.comment)
+        self.assertEqual(qh5.eval(), cp(-400))
+
+    def test_engine_choice_is_not_a_mistake(self):
+        """Test that playing the engine's best move is never marked"""
+        game = chess.pgn.read_game(io.StringIO('1. e4 *'))
+        annotate(game, [(cp(200), 'e2e4'), (cp(-200), None)])
+        self.assertEqual(game.next().nags, set())
+
+    def test_win_chances_after_mate(self):
+        """Test that checkmate counts as a certain win without an eval"""
+        game = chess.pgn.read_game(io.StringIO(GAMES[2]))
+        results = [(cp(0), None), (cp(-50), None), (cp(-40), None), (cp(-600), 'd8h4'), (None, None)]
+        annotate(game, results)
+        mate = game.end()
+        self.assertIn('White 0%', mate.comment)
+        self.assertIsNone(mate.eval())
+
+
+class TestAnalysis(unittest.TestCase):
+    """Tests for analysing a PGN file on a pool of engines"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.input = os.path.join(self.directory.name, 'games.pgn')
+        with open(self.input, 'w') as f:
+            f.write(''.join(GAMES))
+        environment = suite.fake_engine(latency=0.001)
+        environment.__enter__()
+        self.addCleanup(environment.__exit__, None, None, None)
+
+    def analyse(self):
+        analysis = Analysis(self.input, workers=2, time_limit=0.01)
+        with contextlib.redirect_stdout(io.StringIO()):
+            finished = analysis.run()
+        return (analysis, finished)
+
+    def read_output(self, analysis):
+        with open(analysis.output) as f:
+            return f.read()
+
+    def test_games_written_in_order(self):
+        """Test that every game is annotated and written in the original order"""
+        (analysis, finished) = self.analyse()
+        self.assertTrue(finished)
+        self.assertEqual(analysis.output, os.path.join(self.directory.name, 'games.analyzed.pgn'))
+        with open(analysis.output) as f:
+            games = iter(lambda: chess.pgn.read_game(f), None)
+            events = [game.headers['Event'] for game in games]
+        self.assertEqual(events, ['One', 'Two', 'Three', 'Four'])
+        self.assertIn('A comment', self.read_output(analysis))
+        self.assertFalse(os.path.exists(analysis.progress_path))
+
+    def test_resumes_after_interruption(self):
+        """Test that an interrupted analysis picks up after the last complete game"""
+        (complete, _) = self.analyse()
+        expected = self.read_output(complete)
+        os.remove(complete.output)
+
+        finish = Analysis.finish
+        def interrupt(analysis, *args):
+            if analysis.games == 2:
+                raise KeyboardInterrupt
+            return finish(analysis, *args)
+        with patch.object(Analysis, 'finish', interrupt):
+            (interrupted, finished) = self.analyse()
+        self.assertFalse(finished)
+        self.assertTrue(os.path.exists(interrupted.progress_path))
+        # A half written game at the end has to go.
+        with open(interrupted.output, 'a') as f:
+            f.write('[Event "Thr')
+
+        (resumed, finished) = self.analyse()
+        self.assertTrue(finished)
+        self.assertEqual(resumed.games, 4)
+        self.assertEqual(self.read_output(resumed), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,31 +1,30 @@
 #!/usr/bin/env python3
 """
-Test for asyncio.coroutine compatibility fix.
-This test ensures that the monkey patch for asyncio.coroutine works correctly
-with Python 3.11+ where the decorator was removed.
+Test for asyncio compatibility.
+python-chess 1.x is written with async def throughout, so chs runs on
+Python 3.11+, where asyncio.coroutine was removed, without patching asyncio.
 """
 
+import asyncio
 import unittest
 import sys
 
 
 class TestAsyncioCoroutineFix(unittest.TestCase):
     
-    def test_asyncio_coroutine_import(self):
-        """Test that asyncio.coroutine is available after our compatibility fix."""
+    def test_asyncio_not_patched(self):
+        """Test that importing the engine leaves asyncio as the standard library has it."""
+        had_coroutine = hasattr(asyncio, 'coroutine')
         try:
-            # Import our stockfish module which contains the compatibility fix
             from chs.engine import stockfish
-            import asyncio
-            
-            # Verify that asyncio.coroutine is now available
-            self.assertTrue(hasattr(asyncio, 'coroutine'), 
-                           "asyncio.coroutine should be available after compatibility fix")
         except ImportError as e:
             if "python-chess" in str(e):
                 self.skipTest("python-chess not available")
             else:
                 raise
+        self.assertEqual(hasattr(asyncio, 'coroutine'), had_coroutine)
+        if sys.version_info >= (3, 11):
+            self.assertFalse(hasattr(asyncio, 'coroutine'))
         
     def test_chess_engine_import(self):
         """Test that chess.engine can be imported without AttributeError."""
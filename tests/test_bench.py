@@ -0,0 +1,45 @@
+import contextlib
+import io
+import unittest
+from unittest.mock import patch
+
+from chs.client.bench import Bench, get_settings, recommend
+from chs.engine.stockfish import get_auto_settings
+from tests.benchmarks import suite
+
+
+class TestBench(unittest.TestCase):
+    """Tests for the chs bench command"""
+
+    def test_settings_for_cpus(self):
+        """Test that thread counts double up to the number of CPUs"""
+        threads = [t for (t, _) in get_settings(6, None)]
+        self.assertEqual(threads, [1, 2, 4, 6])
+        self.assertEqual(get_settings(1, None), [(1, 16)])
+
+    def test_hash_sized_like_a_game(self):
+        """Test that each thread count is tried with the hash a game would give it, not the smallest"""
+        self.assertEqual(get_settings(4, 8000), [(1, 64), (2, 128), (4, 256)])
+        self.assertEqual(get_settings(2, 256), [(1, 32), (2, 32)])
+        (threads, hash_size) = get_auto_settings(3, 8000)
+        self.assertIn((threads, hash_size), get_settings(3, 8000))
+
+    def test_recommends_fewest_fast_threads(self):
+        """Test that a setting within 10% of the fastest wins if it uses fewer threads"""
+        speeds = {(1, 64): 500, (2, 128): 950, (4, 256): 1000}
+        self.assertEqual(recommend(speeds), (2, 128))
+
+    def test_runs_against_engine(self):
+        """Test a full bench run reports every measurement"""
+        output = io.StringIO()
+        with suite.fake_engine(latency=0.001), contextlib.redirect_stdout(output):
+            with patch('chs.client.bench.get_cpu_limit', return_value=2), patch('chs.client.bench.get_available_memory', return_value=256):
+                Bench(search_time=0.01, repeat=1).run()
+        text = output.getvalue()
+        for label in ['Startup', 'Score latency', 'Render', 'Recommended']:
+            self.assertIn(label, text)
+        self.assertIn('Threads 2', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
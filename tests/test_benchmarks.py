@@ -0,0 +1,81 @@
+import os
+import threading
+import unittest
+
+import chess
+import chess.engine
+
+from tests.benchmarks import suite
+
+
+class TestFakeEngine(unittest.TestCase):
+    """Tests for the scripted UCI engine the benchmarks run against"""
+
+    def setUp(self):
+        self.environment = suite.fake_engine(latency=0.001)
+        self.engine_path = self.environment.__enter__()
+        self.engine = chess.engine.SimpleEngine.popen_uci(self.engine_path)
+
+    def tearDown(self):
+        self.engine.quit()
+        self.environment.__exit__(None, None, None)
+
+    def test_plays_deterministic_moves(self):
+        """Test that the same position always gets the same reply"""
+        board = chess.Board()
+        board.push_san('e4')
+        first = self.engine.play(board, chess.engine.Limit(time=1))
+        second = self.engine.play(board, chess.engine.Limit(time=1))
+        self.assertEqual(first.move, second.move)
+        self.assertIn(first.move, board.legal_moves)
+
+    def test_reports_material_score(self):
+        """Test that analysis scores the material balance for the side to move"""
+        board = chess.Board('4k3/8/8/8/8/8/8/Q3K3 b - - 0 1')
+        info = self.engine.analyse(board, chess.engine.Limit(time=1), options={'Skill Level': 1})
+        self.assertEqual(info['score'].relative.score(), -900)
+
+    def test_infinite_analysis_stops(self):
+        """Test that an infinite analysis answers as soon as it's stopped"""
+        with self.engine.analysis(chess.Board()) as analysis:
+            threading.Timer(0.05, analysis.stop).start()
+            analysis.wait()
+        self.assertIn('score', analysis.info)
+
+    def test_checkmate_has_no_move(self):
+        """Test that a mated position ends the search without a move"""
+        board = chess.Board()
+        for move in ['f3', 'e5', 'g4', 'Qh4']:
+            board.push_san(move)
+        info = self.engine.analyse(board, chess.engine.Limit(time=1))
+        self.assertTrue(info['score'].is_mate())
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    """Tests for the benchmark suite itself"""
+
+    def test_scripted_game_reaches_ply_limit(self):
+        """Test that a scripted game plays through the client until its input runs out"""
+        with suite.fake_engine(latency=0.001):
+            (seconds, plies) = suite.play_game(1, chess.WHITE, 6)
+        self.assertEqual(plies, 6)
+        self.assertGreater(seconds, 0)
+
+    def test_fake_engine_leaves_environment(self):
+        """Test that the engine and cache overrides are undone afterwards"""
+        before = os.environ.get('CHS_STOCKFISH_PATH')
+        with suite.fake_engine() as engine_path:
+            self.assertEqual(os.environ['CHS_STOCKFISH_PATH'], engine_path)
+            self.assertTrue(os.access(engine_path, os.X_OK))
+        self.assertEqual(os.environ.get('CHS_STOCKFISH_PATH'), before)
+        self.assertFalse(os.path.exists(engine_path))
+
+    def test_compare_flags_regressions(self):
+        """Test that only results slower than the threshold are regressions"""
+        old = {'a_us': 100.0, 'b_us': 100.0, 'c_us': 100.0, 'gone_us': 1.0}
+        new = {'a_us': 119.0, 'b_us': 130.0, 'c_us': 50.0, 'new_us': 1.0}
+        self.assertEqual(suite.compare(old, new, 0.2), [('b_us', 100.0, 130.0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
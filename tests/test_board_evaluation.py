@@ -0,0 +1,131 @@
+import threading
+import unittest
+from unittest.mock import patch, MagicMock
+
+import chess
+
+from chs.engine.stockfish import Candidate, Engine, Evaluation
+from chs.ui.board import Board
+
+
+class TestBoardEvaluation(unittest.TestCase):
+    """Tests for scoring the board in the background while the user types"""
+
+    def setUp(self):
+        self.board = chess.Board()
+        self.board.san_move_stack_white = []
+        self.board.san_move_stack_black = []
+        self.board.help_engine_hint = None
+        self.ui = Board(1, chess.WHITE)
+        self.release = threading.Event()
+        self.engine = MagicMock()
+        self.engine.normalize.side_effect = lambda cp: Engine.normalize(None, cp)
+        self.engine.evaluate.side_effect = (
+            lambda board, callback, count, on_score: Evaluation(self.engine, board, callback, count, on_score)
+        )
+        self.engine.shared.stop.side_effect = lambda cancelled: self.release.set()
+        self.best = [
+            Candidate(chess.Move.from_uci('e2e4'), chess.engine.PovScore(chess.engine.Cp(120), chess.WHITE)),
+            Candidate(chess.Move.from_uci('d2d4'), chess.engine.PovScore(chess.engine.Cp(90), chess.WHITE)),
+        ]
+
+        def slow_candidates(board, count=1, cancelled=None, on_score=None):
+            self.release.wait(5)
+            return self.best[:count]
+        self.engine.candidates.side_effect = slow_candidates
+
+    @patch('sys.stdout')
+    def test_generate_does_not_wait_for_score(self, mock_stdout):
+        """Test that the board is printed before the score is ready"""
+        self.ui.generate(self.board.fen(), self.board, self.engine)
+        self.assertEqual(self.ui._cp, 0)
+        mock_stdout.write.assert_called_once()
+
+        self.release.set()
+        self.ui._evaluation.thread.join(5)
+        self.assertEqual(self.ui._cp, 120)
+        self.assertEqual(mock_stdout.write.call_count, 2)
+        # The score is drawn in place, leaving the cursor where the user types
+        redraw = mock_stdout.write.call_args[0][0]
+        self.assertTrue(redraw.startswith('\x1b7'))
+        self.assertTrue(redraw.endswith('\x1b8'))
+
+    @patch('sys.stdout')
+    def test_score_shown_while_searching(self, mock_stdout):
+        """Test that the bar is filled in from the search's progress, before its candidates"""
+        scored = threading.Event()
+        def streaming_candidates(board, count=1, cancelled=None, on_score=None):
+            on_score(chess.engine.PovScore(chess.engine.Cp(-35), chess.BLACK))
+            scored.set()
+            self.release.wait(5)
+            return []
+        self.engine.candidates.side_effect = streaming_candidates
+        self.ui.generate(self.board.fen(), self.board, self.engine)
+        scored.wait(5)
+
+        self.assertEqual(self.ui._cp, 35)
+        self.assertEqual(mock_stdout.write.call_count, 2)
+        self.assertIsNone(self.ui.analysis(self.board.fen()))
+        self.ui.cancel_evaluation()
+
+    @patch('sys.stdout')
+    def test_cancel_discards_pending_score(self, mock_stdout):
+        """Test that entering a move cancels the pending score"""
+        self.ui.generate(self.board.fen(), self.board, self.engine)
+        evaluation = self.ui._evaluation
+        self.ui.cancel_evaluation()
+        evaluation.thread.join(5)
+
+        self.assertTrue(evaluation.cancelled.is_set())
+        self.assertEqual(self.ui._cp, 0)
+        mock_stdout.write.assert_called_once()
+
+    @patch('sys.stdout')
+    def test_analysis_kept_for_position(self, mock_stdout):
+        """Test that the finished analysis answers for its position without searching again"""
+        fen = self.board.fen()
+        self.ui.generate(fen, self.board, self.engine)
+        self.release.set()
+        self.assertEqual(self.ui.analysis(fen, wait=True), self.best[:1])
+
+        self.ui.generate(fen, self.board, self.engine)
+        self.assertEqual(self.engine.candidates.call_count, 1)
+        self.board.push_san('e4')
+        self.assertIsNone(self.ui.analysis(self.board.fen()))
+
+    @patch('sys.stdout')
+    def test_black_score_from_white_side(self, mock_stdout):
+        """Test that the bar shows White's score when the user plays black"""
+        ui = Board(1, chess.BLACK)
+        self.board.push_san('e4')
+        self.best = [Candidate(chess.Move.from_uci('e7e5'), chess.engine.PovScore(chess.engine.Cp(-40), chess.WHITE))]
+        self.release.set()
+        ui.generate(self.board.fen(), self.board, self.engine)
+        ui.analysis(self.board.fen(), wait=True)
+        self.assertEqual(ui._cp, -40)
+
+    @patch('sys.stdout')
+    def test_engine_turn_does_not_score(self, mock_stdout):
+        """Test that the engine's turn is drawn at once, without a search of its own before it moves"""
+        ui = Board(1, chess.BLACK)
+        ui.generate(self.board.fen(), self.board, self.engine)
+        self.engine.score.assert_not_called()
+        self.engine.evaluate.assert_not_called()
+        mock_stdout.write.assert_called_once()
+
+    @patch('sys.stdout')
+    def test_candidates_shown(self, mock_stdout):
+        """Test that the best moves and their scores are drawn when asked for"""
+        ui = Board(1, chess.WHITE, candidates=2)
+        self.release.set()
+        ui.generate(self.board.fen(), self.board, self.engine)
+        self.assertEqual(ui.analysis(self.board.fen(), wait=True), self.best)
+        text = ui.get_candidates_section(self.board.fen(), self.board)
+        self.assertIn('e4', text)
+        self.assertIn('+1.20', text)
+        self.assertIn('d4', text)
+        self.assertIn('+0.90', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import random
+import unittest
+
+import chess
+
+from chs.ui.board import Material
+
+
+class TestBoardMaterial(unittest.TestCase):
+    """Tests for the popcount based captured pieces tracking"""
+
+    def test_scores_balance(self):
+        """Test that scores mirror each other and no piece type counts for both sides over random games"""
+        rng = random.Random(7)
+        for _ in range(20):
+            board = chess.Board()
+            while not board.is_game_over() and board.ply() < 200:
+                board.push(rng.choice(list(board.legal_moves)))
+                material = Material(board)
+                self.assertEqual(material.score(chess.WHITE), -material.score(chess.BLACK))
+                for (ours, theirs) in zip(material.advantage(chess.WHITE), material.advantage(chess.BLACK)):
+                    self.assertEqual(min(ours, theirs), 0)
+
+    def test_promotion_is_not_a_capture(self):
+        """Test that an extra queen from a promotion doesn't count as captured"""
+        board = chess.Board('4k3/8/8/8/8/8/8/QQ2K3 w - - 0 1')
+        material = Material(board)
+        self.assertEqual(material.captured[chess.WHITE][Material.ORDER.index(chess.QUEEN)], 0)
+        self.assertEqual(material.text(chess.BLACK), '')
+
+    def test_pawn_traded_for_knight(self):
+        """Test the balance after winning a knight for a pawn"""
+        board = chess.Board('r1bqkbnr/pppppppp/8/8/8/8/PPPPPP1P/RNBQKBNR b KQkq - 0 1')
+        material = Material(board)
+        self.assertEqual(material.text(chess.WHITE), '♞ ')
+        self.assertEqual(material.score(chess.WHITE), 2)
+        self.assertEqual(material.score(chess.BLACK), -2)
+
+
+if __name__ == '__main__':
+    unittest.main()
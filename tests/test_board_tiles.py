@@ -0,0 +1,47 @@
+import unittest
+
+import chess
+
+from chs.ui.board import Board, TILES, HINT, LAST_MOVE, NO_HIGHLIGHT
+from chs.utils.core import Colors
+
+
+class TestBoardTiles(unittest.TestCase):
+    """Tests for drawing squares from the precomputed tile table"""
+
+    def make_board(self, moves, hint=None):
+        board = chess.Board()
+        board.san_move_stack_white = []
+        board.san_move_stack_black = []
+        for move in moves:
+            board.push_san(move)
+        board.help_engine_hint = hint
+        return board
+
+    def square_at(self, rows, rank_row, file_column):
+        # Rows 4-11 are the ranks, segment 0 is the rank label.
+        return rows[4 + rank_row][1 + file_column]
+
+    def test_table_covers_every_state(self):
+        """Test that every piece, colour, highlight and check state has a tile"""
+        self.assertEqual(len(TILES), 13 * 2 * 3 * 2)
+        self.assertTrue(TILES[('.', True, NO_HIGHLIGHT, False)].startswith(Colors.Backgrounds.DARK))
+
+    def test_last_move_and_hint_highlights(self):
+        """Test that the last move is green and a hint purple"""
+        board = self.make_board(['e4'], hint='g8f6')
+        rows = Board(1, chess.WHITE)._generate(board.fen(), board, None)
+        self.assertEqual(self.square_at(rows, 4, 4), TILES[('P', False, LAST_MOVE, False)])
+        self.assertEqual(self.square_at(rows, 0, 6), TILES[('n', False, HINT, False)])
+
+    def test_king_in_check_from_blacks_side(self):
+        """Test that the checked king is marked when the board is flipped"""
+        board = self.make_board(['f3', 'e5', 'g4', 'Qh4'])
+        rows = Board(1, chess.BLACK)._generate(board.fen(), board, None)
+        # Flipped, so e1 is on the top row, fourth from the left.
+        self.assertEqual(self.square_at(rows, 0, 3), TILES[('K', True, NO_HIGHLIGHT, True)])
+        self.assertIn(Colors.Backgrounds.RED, self.square_at(rows, 0, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import contextlib
+import io
+import time
+import unittest
+from unittest.mock import patch
+
+import chess
+
+from chs.client.clock import Clock, TimeControl, format_clock, parse_time_control
+from chs.client.runner import BlackWinsOnTimeException, Client, DrawException
+from chs.ui.board import Board
+from tests.benchmarks import suite
+
+
+class FakeTime(object):
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestClock(unittest.TestCase):
+    """Tests for chess clocks and time controls"""
+
+    def setUp(self):
+        self.time = FakeTime()
+        self.clock = Clock(TimeControl(60, 2), now=self.time)
+
+    def test_parse_time_control(self):
+        """Test that minutes and increments are read from a time control"""
+        self.assertEqual(parse_time_control('5+3'), TimeControl(300, 3))
+        self.assertEqual(parse_time_control('10'), TimeControl(600, 0))
+        self.assertEqual(parse_time_control('0.5+1'), TimeControl(30, 1))
+        for text in ['', '0+1', '5+-1', 'fast']:
+            with self.assertRaises(ValueError):
+                parse_time_control(text)
+
+    def test_format_clock(self):
+        """Test clock faces, with tenths when time is short"""
+        self.assertEqual(format_clock(300), '5:00')
+        self.assertEqual(format_clock(61.9), '1:01')
+        self.assertEqual(format_clock(9.99), '0:09.9')
+        self.assertEqual(format_clock(-1), '0:00.0')
+        self.assertEqual(format_clock(3725), '1:02:05')
+
+    def test_increment_after_move(self):
+        """Test that time spent is taken off and the increment added after a move"""
+        self.clock.start(chess.WHITE)
+        self.time.now += 10
+        self.assertEqual(self.clock.time_left(chess.WHITE), 50)
+        self.clock.start(chess.BLACK)
+        self.assertEqual(self.clock.time_left(chess.WHITE), 52)
+        self.time.now += 5
+        self.assertEqual(self.clock.time_left(chess.BLACK), 55)
+
+    def test_start_is_idempotent(self):
+        """Test that restarting the running clock doesn't reset the time spent"""
+        self.clock.start(chess.WHITE)
+        self.time.now += 10
+        self.clock.start(chess.WHITE)
+        self.time.now += 10
+        self.assertEqual(self.clock.time_left(chess.WHITE), 40)
+
+    def test_flag_has_no_increment(self):
+        """Test that running out of time isn't undone by the increment"""
+        self.clock.start(chess.BLACK)
+        self.time.now += 61
+        self.clock.stop()
+        self.assertTrue(self.clock.flagged(chess.BLACK))
+        self.assertFalse(self.clock.flagged(chess.WHITE))
+
+    def test_engine_limit(self):
+        """Test that the engine is given both clocks and the increment"""
+        self.clock.start(chess.WHITE)
+        self.time.now += 15
+        limit = self.clock.limit()
+        self.assertEqual((limit.white_clock, limit.black_clock), (45, 60))
+        self.assertEqual((limit.white_inc, limit.black_inc), (2, 2))
+        self.assertIsNone(limit.time)
+
+    def test_clock_shown_next_to_players(self):
+        """Test that each player's clock is drawn beside their name"""
+        self.clock.start(chess.WHITE)
+        self.time.now += 30.5
+        ui = Board(1, chess.BLACK, self.clock)
+        board = chess.Board()
+        board.san_move_stack_white = []
+        board.san_move_stack_black = []
+        self.assertIn('1:00', ui.get_meta_section(board, board.fen(), 1, None))
+        self.assertIn('0:29', ui.get_meta_section(board, board.fen(), 8, None))
+
+
+class TestClientClock(unittest.TestCase):
+    """Tests for losing on time"""
+
+    @contextlib.contextmanager
+    def make_client(self, fen=None):
+        """A Client on the fake engine, started and shut down while the fake environment is in place."""
+        with suite.fake_engine(latency=0.001):
+            with contextlib.redirect_stdout(io.StringIO()):
+                client = Client(1, chess.WHITE, time_control=TimeControl(60, 0))
+            try:
+                client.engine.shared.wait()
+                if fen is not None:
+                    client.board.set_fen(fen)
+                yield client
+            finally:
+                client.engine.done()
+                client.hint_engine.done()
+
+    def test_flag_loses(self):
+        """Test that running out of time loses the game"""
+        with self.make_client() as client:
+            client.clock.remaining[chess.WHITE] = 0
+            with self.assertRaises(BlackWinsOnTimeException):
+                client.check_game_over()
+
+    def test_flag_falls_while_typing(self):
+        """Test that the game is lost on time while the prompt is open, and the late move isn't played"""
+        def slow_input(prompt=''):
+            time.sleep(0.5)
+            return 'e4'
+        with self.make_client() as client:
+            client.clock.remaining[chess.WHITE] = 0.1
+            started = time.perf_counter()
+            with patch('builtins.input', slow_input), contextlib.redirect_stdout(io.StringIO()):
+                with self.assertRaises(BlackWinsOnTimeException):
+                    client.make_turn()
+            self.assertLess(time.perf_counter() - started, 0.4)
+            self.assertEqual(client.board.move_stack, [])
+
+    def test_flag_against_lone_king_draws(self):
+        """Test that a flag is a draw when the opponent can't mate"""
+        with self.make_client('4k3/8/8/8/8/8/PPPP4/4K3 w - - 0 1') as client:
+            client.clock.remaining[chess.WHITE] = 0
+            with self.assertRaises(DrawException):
+                client.check_game_over()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import contextlib
+import io
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from chs.engine import discovery
+from chs.engine.stockfish import get_engine_path
+from tests.benchmarks import suite
+
+
+class TestDiscovery(unittest.TestCase):
+    """Tests for picking the fastest Stockfish binary this CPU can run"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        patcher = patch.dict(os.environ, {'CHS_CACHE_DIR': os.path.join(self.root, 'cache')})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        os.environ.pop('CHS_STOCKFISH_PATH', None)
+        discovery._cached_engines.clear()
+        self.addCleanup(discovery._cached_engines.clear)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def write(self, name, text, executable=False):
+        path = os.path.join(self.root, name)
+        with open(path, 'w') as f:
+            f.write(text)
+        if executable:
+            os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+        return path
+
+    def fake_binary(self, name, nps, version='Stockfish 16'):
+        return self.write(name, '#!/bin/sh\necho "id name {}"\necho "Nodes/second    : {}"\n'.format(version, nps), executable=True)
+
+    def test_cpu_flags(self):
+        """Test that x86 flags and ARM features are both read"""
+        x86 = self.write('x86', 'processor\t: 0\nflags\t\t: fpu sse4_1 popcnt avx2 bmi2\n')
+        self.assertEqual(discovery.get_cpu_flags(x86), {'fpu', 'sse4_1', 'popcnt', 'avx2', 'bmi2'})
+        arm = self.write('arm', 'processor\t: 0\nFeatures\t: fp asimd asimddp\n')
+        self.assertIn('asimddp', discovery.get_cpu_flags(arm))
+        self.assertEqual(discovery.get_cpu_flags(os.path.join(self.root, 'missing')), set())
+
+    def test_supports(self):
+        """Test that binaries built for missing flags are skipped, and unknown CPUs allow all"""
+        flags = {'sse4_1', 'popcnt', 'avx2'}
+        self.assertTrue(discovery.supports('stockfish_14_x64_avx2', flags))
+        self.assertFalse(discovery.supports('stockfish_14_x64_bmi2', flags))
+        self.assertTrue(discovery.supports('stockfish_10_x64_linux', flags))
+        self.assertTrue(discovery.supports('stockfish_14_x64_bmi2', set()))
+
+    def test_probe(self):
+        """Test that the engine's name and bench nodes per second are read, and failures give None"""
+        self.assertEqual(discovery.probe(self.fake_binary('fast', 123456)), discovery.Probe('Stockfish 16', 123456))
+        self.assertIsNone(discovery.probe(self.write('broken', '#!/bin/sh\nexit 1\n', executable=True)))
+        self.assertIsNone(discovery.probe(os.path.join(self.root, 'missing')))
+
+    def test_version(self):
+        """Test that versions are read from id names, development builds ranking newest"""
+        self.assertEqual(discovery.get_version('Stockfish 10 64'), (10, 0))
+        self.assertEqual(discovery.get_version('Stockfish 16.1'), (16, 1))
+        self.assertGreater(discovery.get_version('Stockfish dev-20240101-abcdef'), (17, 0))
+        self.assertEqual(discovery.get_version(None), ())
+
+    def test_fastest_cached_until_binary_changes(self):
+        """Test that the fastest build is used until a binary changes"""
+        slow = self.fake_binary('stockfish_slow', 1000)
+        fast = self.fake_binary('stockfish_fast', 5000)
+        with patch('chs.engine.discovery.get_bundled', return_value=[slow, fast]), \
+                patch('shutil.which', return_value=None):
+            probes = discovery.discover()
+            self.assertEqual(dict((path, found.nps) for (path, found) in probes.items()), {slow: 1000, fast: 5000})
+            self.assertEqual(get_engine_path(), fast)
+            os.utime(slow, (0, 0))
+            self.assertIsNone(discovery.load_choice(discovery.find_candidates()))
+            discovery.discover()
+            self.assertEqual(get_engine_path(), fast)
+
+    def test_newest_version_wins(self):
+        """Test that an old version's higher nodes per second don't beat a newer version"""
+        old = self.fake_binary('stockfish_10_x64_linux', 9000000, 'Stockfish 10 64')
+        new = self.fake_binary('stockfish', 1000000, 'Stockfish 16')
+        with patch('chs.engine.discovery.get_bundled', return_value=[old]), \
+                patch('shutil.which', return_value=new):
+            discovery.discover()
+            self.assertEqual(get_engine_path(), new)
+
+    def test_overrides_win(self):
+        """Test that CHS_STOCKFISH_PATH and a new system binary win over the cached choice"""
+        fast = self.fake_binary('stockfish_fast', 5000)
+        system = self.fake_binary('stockfish', 1000)
+        with patch('chs.engine.discovery.get_bundled', return_value=[fast]):
+            with patch('shutil.which', return_value=None):
+                discovery.discover()
+                with patch.dict(os.environ, {'CHS_STOCKFISH_PATH': system}):
+                    self.assertEqual(get_engine_path(), system)
+            with patch('shutil.which', return_value=system):
+                self.assertIsNone(discovery.load_choice(discovery.find_candidates()))
+
+    def test_cached_engine_looked_up_once(self):
+        """Test that the binaries are only looked at once per process, until the next discovery"""
+        with patch('chs.engine.discovery.find_candidates', return_value={}) as find:
+            discovery.get_cached_engine()
+            discovery.get_cached_engine()
+            self.assertEqual(find.call_count, 1)
+            discovery.discover()
+            discovery.get_cached_engine()
+            self.assertEqual(find.call_count, 3)
+
+    def test_game_start_does_not_probe(self):
+        """Test that starting a game never waits for binaries to be benchmarked"""
+        from chs.__main__ import main
+        candidates = {self.fake_binary('stockfish', 1000): 0, self.fake_binary('stockfish_10', 9000): 0}
+        with patch('chs.engine.discovery.find_candidates', return_value=candidates), \
+                patch('chs.engine.discovery.probe') as probe, patch('sys.argv', ['chs', '--profile-startup']), \
+                suite.fake_engine(latency=0.001) as engine_path, contextlib.redirect_stdout(io.StringIO()):
+            os.environ.pop('CHS_STOCKFISH_PATH')
+            with patch('chs.engine.stockfish.get_engine_path', return_value=engine_path):
+                main()
+        probe.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
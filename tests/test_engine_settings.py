@@ -0,0 +1,95 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import chess.engine
+
+from chs.engine.stockfish import (
+    fit_config, get_auto_settings, get_available_memory, get_cgroup_cpus, get_cpu_limit, get_engine_config
+)
+
+
+class TestEngineSettings(unittest.TestCase):
+    """Tests for sizing the engine's Threads and Hash to the machine"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def write(self, name, text):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def test_cgroup_v2_quota(self):
+        """Test that a cgroup v2 cpu.max quota is read as CPUs"""
+        self.write('cpu.max', '150000 100000\n')
+        self.assertEqual(get_cgroup_cpus(self.root), 1.5)
+        self.write('cpu.max', 'max 100000\n')
+        self.assertIsNone(get_cgroup_cpus(self.root))
+
+    def test_cgroup_v1_quota(self):
+        """Test that a cgroup v1 CFS quota is read as CPUs, and -1 as none"""
+        self.write('cpu/cpu.cfs_quota_us', '400000\n')
+        self.write('cpu/cpu.cfs_period_us', '100000\n')
+        self.assertEqual(get_cgroup_cpus(self.root), 4)
+        self.write('cpu/cpu.cfs_quota_us', '-1\n')
+        self.assertIsNone(get_cgroup_cpus(self.root))
+
+    def test_cpu_limit_held_to_quota(self):
+        """Test that a fractional quota rounds down, but never below one CPU"""
+        self.write('cpu.max', '250000 100000\n')
+        with patch('os.sched_getaffinity', return_value=set(range(16)), create=True):
+            self.assertEqual(get_cpu_limit(self.root), 2)
+        self.write('cpu.max', '50000 100000\n')
+        with patch('os.sched_getaffinity', return_value=set(range(16)), create=True):
+            self.assertEqual(get_cpu_limit(self.root), 1)
+
+    def test_available_memory(self):
+        """Test that free memory comes from MemAvailable, held to a cgroup limit"""
+        meminfo = self.write('meminfo', 'MemTotal: 16384000 kB\nMemAvailable: 8192000 kB\n')
+        self.assertEqual(get_available_memory(self.root, meminfo), 8000)
+        self.write('memory.max', str(3 * 1024 ** 3))
+        self.write('memory.current', str(1024 ** 3))
+        self.assertEqual(get_available_memory(self.root, meminfo), 2048)
+        self.write('memory.max', 'max')
+        self.assertEqual(get_available_memory(self.root, meminfo), 8000)
+
+    def test_auto_settings(self):
+        """Test that a core is kept free and hash grows with threads and memory"""
+        self.assertEqual(get_auto_settings(1, None), (1, 16))
+        self.assertEqual(get_auto_settings(2, 8000), (1, 64))
+        self.assertEqual(get_auto_settings(8, 8000), (7, 256))
+        self.assertEqual(get_auto_settings(64, 64000), (32, 1024))
+        self.assertEqual(get_auto_settings(64, 200), (32, 16))
+
+    @patch('chs.engine.stockfish.is_mobile', return_value=False)
+    def test_overrides(self, mock_mobile):
+        """Test that CHS_THREADS and CHS_HASH win over the automatic sizing"""
+        with patch('chs.engine.stockfish.get_cpu_limit', return_value=8), \
+                patch('chs.engine.stockfish.get_available_memory', return_value=8000):
+            with patch.dict(os.environ, {'CHS_THREADS': '3', 'CHS_HASH': '128'}):
+                config = get_engine_config(20)
+            self.assertEqual((config['Threads'], config['Hash']), (3, 128))
+            with patch.dict(os.environ, {'CHS_THREADS': 'lots', 'CHS_HASH': ''}), patch('sys.stderr'):
+                config = get_engine_config(20)
+            self.assertEqual((config['Threads'], config['Hash']), (7, 256))
+
+    def test_config_fits_engine_options(self):
+        """Test that Threads and Hash are held to the engine's limits"""
+        options = {
+            'Threads': chess.engine.Option('Threads', 'spin', 1, 1, 4, None),
+            'Hash': chess.engine.Option('Hash', 'spin', 16, 1, 128, None),
+        }
+        config = fit_config({'Skill Level': 20, 'Threads': 32, 'Hash': 1024}, options)
+        self.assertEqual(config, {'Skill Level': 20, 'Threads': 4, 'Hash': 128})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -210,11 +210,13 @@ class TestTermuxIntegration(unittest.TestCase):
                 
                 # Test that low difficulty levels work well on ARM
                 client = Client(Levels.ONE, chess.WHITE)
+                client.engine.shared.wait()  # The engine starts in the background.
                 
-                # Verify engines are configured (main engine and hint engine)
-                self.assertEqual(mock_engine.configure.call_count, 2)
+                # Verify a single shared process is configured for both engines
+                self.assertEqual(mock_engine.configure.call_count, 1)
+                mock_popen.assert_called_once()
                 
-                # Check the first configure call (main engine with level 1)
+                # Check the configure call (main engine with level 1)
                 first_call_args = mock_engine.configure.call_args_list[0][0][0]
                 
                 # Check that Hash and Threads are set for mobile optimization
@@ -243,8 +245,8 @@ class TestTermuxIntegration(unittest.TestCase):
                 client.engine.done()
                 client.hint_engine.done()
                 
-                # Verify engines were properly closed
-                self.assertEqual(mock_engine.quit.call_count, 2)
+                # Verify the shared process is quit once, after the last handle
+                self.assertEqual(mock_engine.quit.call_count, 1)
 
 
 if __name__ == '__main__':
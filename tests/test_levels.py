@@ -0,0 +1,108 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+import chess
+import chess.engine
+
+from chs.engine.stockfish import Engine
+from chs.utils.core import LevelProfile, Levels, load_config
+
+
+class TestLevelProfiles(unittest.TestCase):
+    """Tests for per level search budgets and their config overrides"""
+
+    def setUp(self):
+        patcher = patch.object(Levels, '_profiles', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_budgets_grow_with_level(self):
+        """Test that higher levels are stronger and search for longer"""
+        profiles = Levels.load_profiles({})
+        self.assertEqual([p.skill for p in profiles], [1, 4, 7, 10, 12, 14, 17, 20])
+        times = [p.time for p in profiles]
+        self.assertEqual(times, sorted(times))
+        self.assertLess(profiles[0].time, 0.1)
+
+    def test_config_overrides_fields(self):
+        """Test that a config file can change some fields of some levels"""
+        profiles = Levels.load_profiles({'levels': {'1': {'time': 0.2, 'nodes': None}, '8': {'depth': 30}}})
+        self.assertEqual(profiles[0], LevelProfile(skill=1, nodes=None, depth=5, time=0.2))
+        self.assertEqual(profiles[7].depth, 30)
+        self.assertEqual(profiles[1], Levels.PROFILES[1])
+
+    def test_bad_overrides_are_ignored(self):
+        """Test that overrides that don't make sense keep the default"""
+        config = {'levels': {
+            '0': {'skill': 3},
+            '2': {'skill': 25},
+            '3': {'time': -1},
+            '4': {'nodes': None, 'depth': None, 'time': None},
+            'five': {'skill': 1},
+        }}
+        with patch('sys.stderr'):
+            self.assertEqual(Levels.load_profiles(config), Levels.PROFILES)
+
+    def test_config_file(self):
+        """Test that the config file is read from CHS_CONFIG"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'config.json')
+            with open(path, 'w') as f:
+                json.dump({'levels': {'8': {'time': 3}}}, f)
+            with patch.dict(os.environ, {'CHS_CONFIG': path}):
+                self.assertEqual(Levels.profile(Levels.EIGHT).time, 3)
+                self.assertEqual(Levels.value(Levels.EIGHT), 20)
+
+    def test_missing_or_broken_config(self):
+        """Test that a missing or unreadable config file means the defaults"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'config.json')
+            self.assertEqual(load_config(path), {})
+            with open(path, 'w') as f:
+                f.write('{not json')
+            with patch('sys.stderr'):
+                self.assertEqual(load_config(path), {})
+
+
+class TestEngineBudget(unittest.TestCase):
+    """Tests for Engine searching within its level's budget"""
+
+    def setUp(self):
+        patcher = patch('chess.engine.SimpleEngine.popen_uci')
+        self.mock_popen = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_engine = MagicMock()
+        self.mock_engine.play.return_value = chess.engine.PlayResult(chess.Move.from_uci('e2e4'), None)
+        self.mock_popen.return_value = self.mock_engine
+        self.engine = Engine(Levels.ONE)
+        self.addCleanup(self.engine.done)
+
+    def searched_limit(self):
+        return self.mock_engine.play.call_args[0][1]
+
+    def test_plays_within_level_budget(self):
+        """Test that a weak level searches with its small caps"""
+        self.engine.play(chess.Board())
+        profile = Levels.profile(Levels.ONE)
+        self.assertEqual(self.searched_limit(), chess.engine.Limit(time=profile.time, depth=profile.depth, nodes=profile.nodes))
+
+    def test_clock_limit_keeps_level_caps(self):
+        """Test that playing on the clock is still held to the level's node and depth caps"""
+        clock = chess.engine.Limit(white_clock=300, black_clock=300, white_inc=3, black_inc=3)
+        self.engine.play(chess.Board(), limit=clock)
+        limit = self.searched_limit()
+        self.assertEqual((limit.white_clock, limit.white_inc), (300, 3))
+        self.assertEqual(limit.nodes, Levels.profile(Levels.ONE).nodes)
+        self.assertIsNone(limit.time)
+
+    def test_explicit_time(self):
+        """Test that an explicit search time replaces the level's budget"""
+        self.engine.play(chess.Board(), 2.0)
+        self.assertEqual(self.searched_limit(), chess.engine.Limit(time=2.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
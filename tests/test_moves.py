@@ -0,0 +1,135 @@
+import concurrent.futures
+import contextlib
+import io
+import unittest
+from unittest.mock import patch, MagicMock
+
+import chess
+
+from chs.client.moves import MoveIndex
+from chs.client.runner import Client
+from chs.utils.core import Levels
+from tests.benchmarks import suite
+
+
+class TestMoveIndex(unittest.TestCase):
+    """Tests for completing and correcting moves from the position's index"""
+
+    def setUp(self):
+        self.board = chess.Board()
+        for move in ['e4', 'e5', 'Nf3', 'Nc6', 'Bc4', 'Nf6']:
+            self.board.push_san(move)
+        self.index = MoveIndex(self.board)
+
+    def test_get_san_and_uci(self):
+        """Test that moves are found by SAN or UCI"""
+        self.assertEqual(self.index.get('O-O'), chess.Move.from_uci('e1g1'))
+        self.assertEqual(self.index.get('e1g1'), chess.Move.from_uci('e1g1'))
+        self.assertIsNone(self.index.get('Ke2e4'))
+
+    def test_complete_prefix(self):
+        """Test that completions are the moves and commands starting with the prefix"""
+        self.assertEqual(self.index.complete('Ng'), ['Ng1', 'Ng5'])
+        self.assertEqual(self.index.complete('O'), ['O-O'])
+        self.assertEqual(self.index.complete('h', ['hint', 'back']), ['h3', 'h4', 'hint'])
+
+    def test_suggestions_ranked(self):
+        """Test that the closest moves come first, then those the input starts"""
+        self.assertEqual(self.index.suggest('Nf5'), ['Ng5'])
+        self.assertEqual(self.index.suggest('c4'), ['a4', 'b4', 'c3'])
+        self.assertEqual(self.index.suggest('Bx'), ['Bxf7+'])
+        self.assertEqual(self.index.suggest('Bxf7'), ['Bxf7+'])
+        self.assertEqual(self.index.suggest('Ng'), ['Ng1', 'Ng5'])
+        self.assertEqual(self.index.suggest('zz9'), [])
+
+    def test_suggestions_limited(self):
+        """Test that at most limit suggestions are made"""
+        self.assertEqual(len(self.index.suggest('a', limit=2)), 2)
+
+
+class TestMoveInput(unittest.TestCase):
+    """Tests for reading the user's move"""
+
+    def setUp(self):
+        patcher = patch('chess.engine.SimpleEngine.popen_uci')
+        patcher.start().return_value = MagicMock()
+        self.addCleanup(patcher.stop)
+        with patch.dict('os.environ', {'CHS_CACHE_DIR': ''}):
+            self.client = Client(Levels.ONE, chess.WHITE)
+        self.addCleanup(self.client.hint_engine.done)
+        self.addCleanup(self.client.engine.done)
+        self.client.ui_board.generate = MagicMock()
+
+    @patch('sys.stdout')
+    def test_typos_loop_without_recursion(self, mock_stdout):
+        """Test that invalid input asks again in the same call"""
+        answers = iter(['e5', 'zz9', 'back'] * 50 + ['e4'])
+        with patch('builtins.input', lambda prompt='': next(answers)), \
+                patch.object(self.client, 'make_turn', wraps=self.client.make_turn) as make_turn:
+            make_turn()
+        self.assertEqual(make_turn.call_count, 1)
+        self.assertEqual(self.client.ui_board.generate.call_count, 151)
+        self.assertEqual(self.client.board.move_stack, [chess.Move.from_uci('e2e4')])
+        self.assertEqual(self.client.board.san_move_stack_white, ['e4'])
+
+    def test_index_cached_per_position(self):
+        """Test that the index is only rebuilt when the position changes"""
+        index = self.client.move_index()
+        self.assertIs(self.client.move_index(), index)
+        self.client.board.push_san('e4')
+        self.assertIsNot(self.client.move_index(), index)
+
+    def test_completer(self):
+        """Test the readline completer protocol"""
+        self.assertEqual(self.client.complete('N', 0), 'Na3')
+        self.assertEqual(self.client.complete('N', 3), 'Nh3')
+        self.assertIsNone(self.client.complete('N', 4))
+        self.assertEqual(self.client.complete('hi', 0), 'hint')
+
+    def premove_turn(self, premove):
+        """Runs make_turn as if premove was typed while the engine searched."""
+        self.client._line = concurrent.futures.Future()
+        self.client._line.set_result(premove)
+        self.client.make_turn()
+
+    def test_premove_played_at_once(self):
+        """Test that a legal premove is played without drawing or asking"""
+        with patch('builtins.input') as mock_input:
+            self.premove_turn('e4')
+        mock_input.assert_not_called()
+        self.client.ui_board.generate.assert_not_called()
+        self.assertEqual(self.client.board.move_stack, [chess.Move.from_uci('e2e4')])
+        self.assertIsNone(self.client._line)
+
+    def test_illegal_premove_dropped(self):
+        """Test that a premove made illegal by the reply is dropped with a message, then the move is asked for"""
+        output = io.StringIO()
+        with patch('builtins.input', return_value='d4'), contextlib.redirect_stdout(output):
+            self.premove_turn('e5')
+        self.assertIn('Premove e5 is illegal', output.getvalue())
+        self.client.ui_board.generate.assert_called_once()
+        self.assertEqual(self.client.board.move_stack, [chess.Move.from_uci('d2d4')])
+
+
+class TestPremove(unittest.TestCase):
+    """Tests for typing a move while the engine searches"""
+
+    def test_typed_during_search(self):
+        """Test that the line read during the engine's search becomes the next move"""
+        prompts = []
+        def answer(prompt=''):
+            prompts.append(prompt)
+            if len(prompts) > 1:
+                raise EOFError
+            return 'e5'
+        with suite.fake_engine(latency=0.05), contextlib.redirect_stdout(io.StringIO()):
+            client = Client(Levels.ONE, chess.BLACK)
+            with patch('builtins.input', answer):
+                client.run()
+        self.assertEqual(client.board.move_stack[1], chess.Move.from_uci('e7e5'))
+        self.assertEqual(len(client.board.move_stack), 3)
+        self.assertTrue(all('thinking' in prompt for prompt in prompts))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import random
+import shutil
+import struct
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+import chess
+import chess.polyglot
+
+from chs.__main__ import get_book_from_args
+from chs.engine.book import OpeningBook
+from chs.engine.stockfish import Engine
+from chs.utils.core import Levels
+
+
+def write_book(path, entries):
+    """Writes a Polyglot book from (board, uci, weight) tuples"""
+    rows = []
+    for (board, uci, weight) in entries:
+        move = chess.Move.from_uci(uci)
+        raw = (
+            chess.square_file(move.to_square) |
+            chess.square_rank(move.to_square) << 3 |
+            chess.square_file(move.from_square) << 6 |
+            chess.square_rank(move.from_square) << 9
+        )
+        rows.append((chess.polyglot.zobrist_hash(board), raw, weight))
+    with open(path, 'wb') as f:
+        for (key, raw, weight) in sorted(rows):
+            f.write(struct.pack('>QHHI', key, raw, weight, 0))
+
+
+class TestOpeningBook(unittest.TestCase):
+    """Tests for playing opening moves from a Polyglot book"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'book.bin')
+        board = chess.Board()
+        write_book(self.path, [(board, 'e2e4', 100), (board, 'd2d4', 1)])
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_full_strength_plays_top_move(self):
+        """Test that the strongest level always plays the heaviest move"""
+        book = OpeningBook(self.path)
+        for _ in range(20):
+            self.assertEqual(book.choose(chess.Board(), 20), chess.Move.from_uci('e2e4'))
+        book.close()
+
+    def test_low_levels_vary(self):
+        """Test that weak levels sometimes play lighter moves"""
+        book = OpeningBook(self.path, random.Random(1))
+        moves = set(book.choose(chess.Board(), 1) for _ in range(50))
+        self.assertEqual(moves, {chess.Move.from_uci('e2e4'), chess.Move.from_uci('d2d4')})
+        book.close()
+
+    def test_out_of_book(self):
+        """Test that positions not in the book return no move"""
+        book = OpeningBook(self.path)
+        board = chess.Board()
+        board.push_san('e4')
+        self.assertIsNone(book.choose(board, 20))
+        book.close()
+
+    def test_book_from_args(self):
+        """Test that --book=PATH opens the book, and a bare --book is ignored rather than crashing"""
+        with patch.dict(os.environ, {'CHS_BOOK_PATH': ''}):
+            book = get_book_from_args(['chs', '--book={}'.format(self.path)])
+            self.assertIsInstance(book, OpeningBook)
+            book.close()
+            self.assertIsNone(get_book_from_args(['chs', '--book']))
+            self.assertIsNone(get_book_from_args(['chs', '--bookish=x']))
+
+    @patch('chess.engine.SimpleEngine.popen_uci')
+    def test_engine_skips_search_in_book(self, mock_popen):
+        """Test that Engine.play uses the book before searching"""
+        mock_engine = MagicMock()
+        mock_popen.return_value = mock_engine
+        book = OpeningBook(self.path)
+        engine = Engine(Levels.EIGHT, book=book)
+
+        result = engine.play(chess.Board())
+        self.assertEqual(result.move, chess.Move.from_uci('e2e4'))
+        mock_engine.play.assert_not_called()
+
+        board = chess.Board()
+        board.push_san('e4')
+        engine.play(board)
+        mock_engine.play.assert_called_once()
+        book.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
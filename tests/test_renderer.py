@@ -0,0 +1,83 @@
+import io
+import unittest
+
+from chs.ui.renderer import Renderer, visible_width
+
+
+class TestRenderer(unittest.TestCase):
+    """Tests for drawing only what changed between frames"""
+
+    def setUp(self):
+        self.stream = io.StringIO()
+        self.renderer = Renderer(self.stream)
+
+    def frame(self):
+        output = self.stream.getvalue()
+        self.stream.seek(0)
+        self.stream.truncate()
+        return output
+
+    def test_visible_width_ignores_escapes(self):
+        """Test that color codes don't count towards a segment's width"""
+        self.assertEqual(visible_width('\x1b[48;5;172;1m\x1b[38;5;231;1m♜ \x1b[49;0m'), 2)
+
+    def test_first_frame_clears_screen(self):
+        """Test that the first frame is drawn in full"""
+        self.renderer.render([['a', 'b'], ['c']])
+        output = self.frame()
+        self.assertTrue(output.startswith('\x1b[H\x1b[2J'))
+        self.assertIn('ab', output)
+        self.assertIn('c', output)
+
+    def test_unchanged_frame_writes_no_segments(self):
+        """Test that redrawing the same frame only repositions the cursor"""
+        self.renderer.render([['a', 'b'], ['c']])
+        self.frame()
+        self.renderer.render([['a', 'b'], ['c']])
+        self.assertEqual(self.frame(), '\x1b[3;1H\x1b[49;0m\x1b[J')
+
+    def test_changed_cell_written_alone(self):
+        """Test that one changed square is written at its own column"""
+        self.renderer.render([['xx', '11', '22', '33']])
+        self.frame()
+        self.renderer.render([['xx', '11', '99', '33']])
+        output = self.frame()
+        self.assertIn('\x1b[1;5H\x1b[49;0m99', output)
+        self.assertNotIn('11', output)
+        self.assertNotIn('33', output)
+
+    def test_width_change_rewrites_rest_of_row(self):
+        """Test that a longer meta text rewrites the row from there on"""
+        self.renderer.render([['xx', 'cp:5', '|']])
+        self.frame()
+        self.renderer.render([['xx', 'cp:120', '|']])
+        self.assertIn('\x1b[1;3H\x1b[49;0mcp:120|\x1b[K', self.frame())
+
+    def test_keep_cursor(self):
+        """Test that in-place updates put the cursor back"""
+        self.renderer.render([['a']])
+        self.frame()
+        self.renderer.render([['b']], keep_cursor=True)
+        output = self.frame()
+        self.assertTrue(output.startswith('\x1b7'))
+        self.assertTrue(output.endswith('\x1b8'))
+
+    def test_single_write_per_frame(self):
+        """Test that a frame goes out in one write"""
+        writes = []
+
+        class Stream(object):
+            def write(self, text):
+                writes.append(text)
+
+            def flush(self):
+                pass
+
+        renderer = Renderer(Stream())
+        renderer.render([['a', 'b'], ['c'], ['d']])
+        renderer.render([['a', 'x'], ['c']])
+        self.assertEqual(len(writes), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import contextlib
+import io
+import math
+import os
+import tempfile
+import unittest
+
+import chess.pgn
+
+from chs.client.selfplay import SelfPlay, elo_difference, estimate_elo
+from tests.benchmarks import suite
+
+
+class TestSelfPlay(unittest.TestCase):
+    """Tests for headless engine against engine games"""
+
+    def test_elo_difference(self):
+        """Test the Elo gap implied by an expected score"""
+        self.assertEqual(elo_difference(0.5), 0)
+        self.assertAlmostEqual(elo_difference(0.75), 190.8, places=1)
+        self.assertAlmostEqual(elo_difference(0.25), -190.8, places=1)
+        self.assertEqual(elo_difference(1), math.inf)
+
+    def test_estimate_has_interval(self):
+        """Test that the estimate comes with an interval around it"""
+        (elo, low, high) = estimate_elo([1, 1, 0.5, 0, 1, 0.5, 1, 0])
+        self.assertLess(low, elo)
+        self.assertLess(elo, high)
+
+    def test_games_must_be_positive(self):
+        """Test that --games below one is rejected rather than dividing by zero in the report"""
+        from chs.__main__ import get_selfplay_from_args
+        for games in ['0', '-3']:
+            with self.assertRaises(ValueError):
+                get_selfplay_from_args(['chs', 'selfplay', '--games={}'.format(games)])
+        self.assertEqual(get_selfplay_from_args(['chs', 'selfplay', '--games=1']).games, 1)
+
+    def test_plays_games_on_pool(self):
+        """Test that every game is played, tallied and saved as PGN with alternating colors"""
+        with tempfile.TemporaryDirectory() as directory, suite.fake_engine(latency=0.001):
+            output = os.path.join(directory, 'games.pgn')
+            selfplay = SelfPlay((1, 2), games=4, workers=2, output=output, max_plies=12)
+            with contextlib.redirect_stdout(io.StringIO()):
+                (wins, draws, losses, _) = selfplay.run()
+            self.assertEqual(wins + draws + losses, 4)
+            games = []
+            with open(output) as pgn:
+                while True:
+                    game = chess.pgn.read_game(pgn)
+                    if game is None:
+                        break
+                    games.append(game)
+        self.assertEqual(sorted(int(g.headers['Round']) for g in games), [1, 2, 3, 4])
+        whites = [g.headers['White'] for g in sorted(games, key=lambda g: int(g.headers['Round']))]
+        self.assertEqual(whites, ['chs level 1', 'chs level 2', 'chs level 1', 'chs level 2'])
+        self.assertTrue(all(len(list(g.mainline_moves())) <= 12 for g in games))
+
+
+if __name__ == '__main__':
+    unittest.main()
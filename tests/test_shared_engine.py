@@ -0,0 +1,306 @@
+import contextlib
+import io
+import os
+import threading
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+
+import chess
+
+from chs.client.runner import Client
+from chs.engine.stockfish import Candidate, Engine
+from chs.utils.core import Levels
+from tests.benchmarks import suite
+
+
+class TestSharedEngine(unittest.TestCase):
+    """Tests for serving several Engine handles from one UCI process"""
+
+    def setUp(self):
+        patcher = patch('chess.engine.SimpleEngine.popen_uci')
+        self.mock_popen = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_engine = MagicMock()
+        self.mock_popen.return_value = self.mock_engine
+
+    def test_share_reuses_process(self):
+        """Test that a shared handle does not spawn another process"""
+        engine = Engine(Levels.ONE)
+        hint_engine = engine.share(Levels.EIGHT)
+        self.mock_popen.assert_called_once()
+        self.assertIs(engine.engine, hint_engine.engine)
+
+    def test_skill_level_sent_per_request(self):
+        """Test that each handle passes its own Skill Level with every request"""
+        engine = Engine(Levels.ONE)
+        hint_engine = engine.share(Levels.EIGHT)
+        board = chess.Board()
+
+        engine.play(board)
+        self.assertEqual(self.mock_engine.play.call_args[1]['options'], {'Skill Level': 1})
+        hint_engine.play(board, 1.000)
+        self.assertEqual(self.mock_engine.play.call_args[1]['options'], {'Skill Level': 20})
+
+    def test_requests_use_same_game(self):
+        """Test that handles do not trigger ucinewgame on each other's requests"""
+        engine = Engine(Levels.ONE)
+        hint_engine = engine.share(Levels.EIGHT)
+        board = chess.Board()
+
+        engine.play(board)
+        hint_engine.play(board)
+        games = [c[1]['game'] for c in self.mock_engine.play.call_args_list]
+        self.assertIs(games[0], games[1])
+
+    def test_new_game_sends_ucinewgame(self):
+        """Test that a new game changes the game, so the next search sends ucinewgame"""
+        engine = Engine(Levels.ONE)
+        board = chess.Board()
+
+        engine.play(board)
+        engine.shared.pondering = (board.fen(), None, None, 20)
+        engine.new_game()
+        board.push_san('e4')
+        engine.play(board)
+        games = [c[1]['game'] for c in self.mock_engine.play.call_args_list]
+        self.assertIsNot(games[0], games[1])
+        self.assertIsNone(engine.shared.pondering)
+
+    def test_quit_after_last_handle(self):
+        """Test that the process is only quit once every handle is done"""
+        engine = Engine(Levels.ONE)
+        hint_engine = engine.share(Levels.EIGHT)
+
+        engine.done()
+        self.mock_engine.quit.assert_not_called()
+        hint_engine.done()
+        self.mock_engine.quit.assert_called_once()
+
+    def test_concurrent_requests_are_serialized(self):
+        """Test that concurrent requests never overlap on the process"""
+        active = []
+        overlaps = []
+
+        def slow_play(*args, **kwargs):
+            active.append(1)
+            if len(active) > 1:
+                overlaps.append(1)
+            time.sleep(0.01)
+            active.pop()
+            return chess.engine.PlayResult(chess.Move.from_uci('e2e4'), None)
+
+        self.mock_engine.play.side_effect = slow_play
+        engine = Engine(Levels.ONE)
+        hint_engine = engine.share(Levels.EIGHT)
+        board = chess.Board()
+        threads = [
+            threading.Thread(target=handle.play, args=(board,))
+            for handle in [engine, hint_engine] * 4
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.mock_engine.play.call_count, 8)
+        self.assertEqual(overlaps, [])
+
+    def test_score_served_while_pondering(self):
+        """Test that scoring the pondered position does not interrupt the search"""
+        board = chess.Board()
+        self.mock_engine.play.return_value = chess.engine.PlayResult(
+            chess.Move.from_uci('e2e4'),
+            chess.Move.from_uci('e7e5'),
+            {'score': chess.engine.PovScore(chess.engine.Cp(30), chess.WHITE)}
+        )
+        engine = Engine(Levels.ONE)
+        engine.play(board, ponder=True)
+        self.assertTrue(self.mock_engine.play.call_args[1]['ponder'])
+
+        board.push_uci('e2e4')
+        self.assertEqual(engine.score(board), -30)
+        self.mock_engine.analyse.assert_not_called()
+
+    def test_ponder_cleared_by_other_requests(self):
+        """Test that another request ends the ponder state"""
+        board = chess.Board()
+        self.mock_engine.play.return_value = chess.engine.PlayResult(
+            chess.Move.from_uci('e2e4'),
+            chess.Move.from_uci('e7e5'),
+            {'score': chess.engine.PovScore(chess.engine.Cp(30), chess.WHITE)}
+        )
+        engine = Engine(Levels.ONE)
+        hint_engine = engine.share(Levels.EIGHT)
+        engine.play(board, ponder=True)
+        board.push_uci('e2e4')
+        hint_engine.play(board)
+        self.assertIsNone(engine.shared.ponder_score(board))
+
+    def test_candidates_from_one_multipv_search(self):
+        """Test that the best moves come from a single MultiPV search"""
+        board = chess.Board()
+        lines = [
+            {'multipv': 1, 'score': chess.engine.PovScore(chess.engine.Cp(30), chess.WHITE), 'pv': [chess.Move.from_uci('e2e4')]},
+            {'multipv': 2, 'score': chess.engine.PovScore(chess.engine.Cp(25), chess.WHITE), 'pv': [chess.Move.from_uci('d2d4')]},
+        ]
+        self.mock_engine.analysis.return_value.multipv = lines
+        engine = Engine(Levels.EIGHT)
+        candidates = engine.candidates(board, 2)
+
+        self.mock_engine.analysis.assert_called_once()
+        self.assertEqual(self.mock_engine.analysis.call_args[1]['multipv'], 2)
+        self.assertEqual([c.move.uci() for c in candidates], ['e2e4', 'd2d4'])
+        # The best line stands in for a later search of the same position.
+        self.assertEqual(engine.play(board).move, chess.Move.from_uci('e2e4'))
+        self.mock_engine.play.assert_not_called()
+
+    def test_candidates_while_pondering(self):
+        """Test that a full strength predicted reply answers without interrupting the ponder search"""
+        board = chess.Board()
+        self.mock_engine.play.return_value = chess.engine.PlayResult(
+            chess.Move.from_uci('e2e4'),
+            chess.Move.from_uci('e7e5'),
+            {'score': chess.engine.PovScore(chess.engine.Cp(30), chess.WHITE)}
+        )
+        engine = Engine(Levels.EIGHT)
+        engine.play(board, ponder=True)
+        board.push_uci('e2e4')
+        (candidate,) = engine.candidates(board, 3)
+        self.assertEqual(candidate, Candidate(chess.Move.from_uci('e7e5'), self.mock_engine.play.return_value.info['score']))
+        self.mock_engine.analysis.assert_not_called()
+
+    def test_weak_ponder_move_not_a_candidate(self):
+        """Test that a weakened opponent's predicted reply isn't offered as the best move"""
+        board = chess.Board()
+        self.mock_engine.play.return_value = chess.engine.PlayResult(
+            chess.Move.from_uci('e2e4'),
+            chess.Move.from_uci('f7f6'),
+            {'score': chess.engine.PovScore(chess.engine.Cp(30), chess.WHITE)}
+        )
+        engine = Engine(Levels.ONE)
+        engine.play(board, ponder=True)
+        board.push_uci('e2e4')
+        self.assertIsNone(engine.shared.ponder_candidate(board))
+        engine.share(Levels.EIGHT).candidates(board, 3)
+        self.mock_engine.analysis.assert_called_once()
+
+    @patch('sys.stdout')
+    def test_weak_ponder_kept_until_hint(self, mock_stdout):
+        """Test that the eval bar shows a weakened engine's ponder score without stopping it, and a hint searches"""
+        self.mock_engine.play.return_value = chess.engine.PlayResult(
+            chess.Move.from_uci('e2e4'),
+            chess.Move.from_uci('e7e5'),
+            {'score': chess.engine.PovScore(chess.engine.Cp(30), chess.WHITE)}
+        )
+        self.mock_engine.analysis.return_value.multipv = [
+            {'multipv': 1, 'score': chess.engine.PovScore(chess.engine.Cp(-25), chess.WHITE), 'pv': [chess.Move.from_uci('c7c5')]},
+        ]
+        with patch.dict('os.environ', {'CHS_CACHE_DIR': ''}):
+            client = Client(Levels.SIX, chess.BLACK, ponder=True)
+        self.addCleanup(client.hint_engine.done)
+        self.addCleanup(client.engine.done)
+        client.board.push(client.engine.play(client.board, ponder=True).move)
+
+        scores = []
+        client.hint_engine.evaluate(client.board, lambda candidates: scores.append(candidates), 1, scores.append).thread.join()
+        self.assertEqual(scores, [self.mock_engine.play.return_value.info['score'], []])
+        self.mock_engine.analysis.assert_not_called()
+        self.assertTrue(client.engine.shared.ponders_on(client.board))
+
+        self.assertEqual(client.hint(), chess.Move.from_uci('c7c5'))
+        self.mock_engine.analysis.assert_called_once()
+        self.assertEqual(client.ui_board.analysis(client.fen())[0].move, chess.Move.from_uci('c7c5'))
+
+    @patch('sys.stdout')
+    def test_hint_reuses_analysis(self, mock_stdout):
+        """Test that a hint is the eval bar's best move, without searching again"""
+        self.mock_engine.analysis.return_value.multipv = [
+            {'multipv': 1, 'score': chess.engine.PovScore(chess.engine.Cp(30), chess.WHITE), 'pv': [chess.Move.from_uci('g1f3')]},
+        ]
+        with patch.dict('os.environ', {'CHS_CACHE_DIR': ''}):
+            client = Client(Levels.ONE, chess.WHITE)
+        self.addCleanup(client.hint_engine.done)
+        self.addCleanup(client.engine.done)
+        client.ui_board.generate(client.fen(), client.board, client.hint_engine)
+
+        self.assertEqual(client.hint(), chess.Move.from_uci('g1f3'))
+        self.mock_engine.analysis.assert_called_once()
+        self.mock_engine.play.assert_not_called()
+
+
+class TestBackgroundStart(unittest.TestCase):
+    """Tests for starting the engine while the board is drawn"""
+
+    def test_client_ready_before_engine(self):
+        """Test that the client doesn't wait for the engine to start"""
+        with suite.fake_engine(latency=0.001, startup=0.5):
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                client = Client(Levels.ONE, chess.WHITE)
+            self.assertLess(time.perf_counter() - started, 0.4)
+            self.addCleanup(client.hint_engine.done)
+            self.addCleanup(client.engine.done)
+
+            self.assertIsNotNone(client.engine.play(client.board).move)
+            timings = client.engine.shared.timings
+            self.assertGreaterEqual(timings['spawn'], 0.5)
+            self.assertIn('path', timings)
+            self.assertIn('isready', timings)
+
+    def test_games_share_one_process(self):
+        """Test that games in a row reuse the engine until the user stops"""
+        answers = iter(['', 'q'])
+        def answer(prompt=''):
+            # Resigns every game at once, then answers the play again prompt.
+            if 'Your move' in prompt or 'thinking' in prompt:
+                raise EOFError
+            return next(answers)
+        with suite.fake_engine(latency=0.001), contextlib.redirect_stdout(io.StringIO()):
+            with patch('chess.engine.SimpleEngine.popen_uci', wraps=chess.engine.SimpleEngine.popen_uci) as popen:
+                client = Client(Levels.ONE, chess.BLACK, games=5)
+                games = []
+                def play():
+                    games.append(client.engine.shared.game)
+                    Client.play(client)
+                with patch.object(client, 'play', side_effect=play), patch('builtins.input', answer):
+                    client.run()
+        self.assertEqual(len(games), 2)
+        self.assertIsNot(games[0], games[1])
+        self.assertEqual(client.board.ply(), 1)
+        popen.assert_called_once()
+
+    def test_cache_dir_read_at_construction(self):
+        """Test that the analysis cache opens where CHS_CACHE_DIR pointed when the engine was made"""
+        with suite.fake_engine(latency=0.001, startup=0.3):
+            cache_dir = os.environ['CHS_CACHE_DIR']
+            engine = Engine(Levels.ONE, background=True)
+            with patch.dict(os.environ, {'CHS_CACHE_DIR': os.path.join(cache_dir, 'elsewhere')}):
+                engine.shared.wait()
+            path = engine.cache.store.db.execute('PRAGMA database_list').fetchone()[2]
+            self.assertEqual(path, os.path.join(cache_dir, 'analysis.sqlite3'))
+            engine.done()
+
+    def test_failed_start_reported_before_prompt(self):
+        """Test that a game whose engine can't start says why instead of asking for a move"""
+        output = io.StringIO()
+        with patch('chess.engine.SimpleEngine.popen_uci', side_effect=OSError('Exec format error')), \
+                patch.dict('os.environ', {'CHS_CACHE_DIR': ''}), patch('builtins.input') as mock_input, \
+                contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(output):
+            client = Client(Levels.ONE, chess.WHITE)
+            client.run()
+        mock_input.assert_not_called()
+        self.assertIn('Failed to start Stockfish', output.getvalue())
+        self.assertNotIn('Traceback', output.getvalue())
+
+    def test_failed_start_raises_on_use(self):
+        """Test that an engine that can't start fails the first request"""
+        with patch('chess.engine.SimpleEngine.popen_uci', side_effect=FileNotFoundError):
+            engine = Engine(Levels.ONE, background=True)
+        with self.assertRaises(RuntimeError):
+            engine.play(chess.Board())
+        self.assertIsNone(engine.done())
+
+
+if __name__ == '__main__':
+    unittest.main()
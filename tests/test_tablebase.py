@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+import chess
+
+from chs.engine.stockfish import Engine
+from chs.engine.tablebase import Tablebase, TABLEBASE_WIN
+from chs.utils.core import Levels
+
+
+class FakeTablebase(object):
+    """Stands in for chess.syzygy.Tablebase with scripted results"""
+
+    def __init__(self, wdl=-2, dtz=None):
+        self.wdl = {'KQvK': None, 'KRvK': None}
+        self.dtz = {'KQvK': None, 'KRvK': None}
+        self.result = wdl
+        self.dtz_of = dtz or (lambda board: -len(list(board.legal_moves)))
+
+    def get_wdl(self, board, default=None):
+        return self.result
+
+    def get_dtz(self, board, default=None):
+        return self.dtz_of(board)
+
+    def close(self):
+        pass
+
+
+class TestTablebase(unittest.TestCase):
+    """Tests for probing Syzygy tablebases instead of searching"""
+
+    def setUp(self):
+        patcher = patch('chess.syzygy.open_tablebase')
+        self.mock_open = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.fake = FakeTablebase()
+        self.mock_open.return_value = self.fake
+
+    def test_max_pieces_from_table_names(self):
+        """Test that the largest table decides which positions are covered"""
+        tablebase = Tablebase('/syzygy')
+        self.assertEqual(tablebase.max_pieces, 3)
+        self.assertTrue(tablebase.covers(chess.Board('8/8/8/8/8/8/1K6/k6Q w - - 0 1')))
+        self.assertFalse(tablebase.covers(chess.Board()))
+
+    def test_score_from_wdl(self):
+        """Test that WDL maps to winning, losing and drawn scores"""
+        board = chess.Board('8/8/8/8/8/8/1K6/k6Q w - - 0 1')
+        tablebase = Tablebase('/syzygy')
+        for (wdl, cp) in [(2, TABLEBASE_WIN), (1, 0), (0, 0), (-2, -TABLEBASE_WIN)]:
+            with self.subTest(wdl=wdl):
+                self.fake.result = wdl
+                self.assertEqual(tablebase.score(board), cp)
+
+    def test_choose_prefers_mate(self):
+        """Test that a mating move is played straight away"""
+        board = chess.Board('k7/8/1K6/8/8/8/8/7Q w - - 0 1')
+        tablebase = Tablebase('/syzygy')
+        move = tablebase.choose(board)
+        board.push(move)
+        self.assertTrue(board.is_checkmate())
+
+    def test_choose_minimizes_opponent_dtz(self):
+        """Test that the winning side makes the most progress by DTZ"""
+        board = chess.Board('8/8/8/8/8/2k5/8/K6Q w - - 0 1')
+        target = chess.Move.from_uci('h1h3')
+        self.fake.dtz_of = lambda after: -1 if after.peek() == target else -9
+        tablebase = Tablebase('/syzygy')
+        self.assertEqual(tablebase.choose(board), target)
+
+    def test_missing_table_falls_back(self):
+        """Test that a position we can't probe is left to the engine"""
+        board = chess.Board('8/8/8/8/8/2k5/8/K6Q w - - 0 1')
+        self.fake.result = None
+        self.assertIsNone(Tablebase('/syzygy').choose(board))
+
+    @patch('chess.engine.SimpleEngine.popen_uci')
+    def test_engine_probes_before_searching(self, mock_popen):
+        """Test that the engine uses the tablebase and passes SyzygyPath"""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, True)
+        mock_engine = MagicMock()
+        mock_popen.return_value = mock_engine
+        with patch.dict(os.environ, {'CHS_SYZYGY_PATH': temp_dir}):
+            engine = Engine(Levels.ONE)
+        self.assertEqual(mock_engine.configure.call_args[0][0]['SyzygyPath'], temp_dir)
+
+        board = chess.Board('k7/8/1K6/8/8/8/8/7Q w - - 0 1')
+        engine.play(board)
+        self.assertEqual(engine.score(board), -TABLEBASE_WIN)
+        mock_engine.play.assert_not_called()
+        mock_engine.analysis.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
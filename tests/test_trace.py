@@ -0,0 +1,77 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import chess
+
+from chs.client.runner import Client
+from chs.client.trace import Trace, load_trace, percentile, print_summary, summarize
+from chs.utils.core import Levels
+from tests.benchmarks import suite
+
+
+class TestTraceSummary(unittest.TestCase):
+    """Tests for summarizing per-ply traces"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'trace.jsonl')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_percentile_nearest_rank(self):
+        """Test that percentiles pick an actual value by nearest rank"""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 90), 90)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 99), 7)
+
+    def test_summary_by_side(self):
+        """Test that each side's fields are summarized separately, skipping missing ones"""
+        records = [{'side': 'engine', 'search_ms': ms, 'nodes': None} for ms in [10, 20, 30, 40]]
+        records.append({'side': 'user', 'input_ms': 5000, 'render_ms': 1.5})
+        summary = summarize(records)
+        self.assertEqual(summary['engine'], (4, {'search_ms': [20, 40, 40, 40]}))
+        self.assertEqual(summary['user'][1]['input_ms'], [5000, 5000, 5000, 5000])
+
+    def test_cut_off_lines_skipped(self):
+        """Test that a line cut off by a crash doesn't stop the summary"""
+        trace = Trace(self.path)
+        trace.record(side='engine', search_ms=12.5)
+        trace.close()
+        with open(self.path, 'a') as f:
+            f.write('{"side": "eng')
+        self.assertEqual(load_trace(self.path), [{'side': 'engine', 'search_ms': 12.5}])
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            print_summary(self.path)
+        self.assertIn('search_ms', out.getvalue())
+
+    def test_game_writes_line_per_ply(self):
+        """Test that a traced game records every ply with its timings"""
+        with suite.fake_engine(latency=0.001):
+            with contextlib.redirect_stdout(io.StringIO()):
+                client = Client(Levels.ONE, chess.WHITE, trace=Trace(self.path))
+                with mock.patch('builtins.input', suite.scripted_input(client, 6)):
+                    client.run()
+        records = load_trace(self.path)
+        self.assertEqual([r['ply'] for r in records], list(range(1, 7)))
+        self.assertEqual([r['side'] for r in records], ['user', 'engine'] * 3)
+        for record in records:
+            self.assertGreater(record['render_ms'], 0)
+            self.assertGreaterEqual(record['frames'], 1)
+        for record in records[1::2]:
+            self.assertIsNone(record['input_ms'])
+            self.assertGreater(record['search_ms'], 0)
+            self.assertGreater(record['nodes'], 0)
+            self.assertEqual(record['depth'], 1)
+        self.assertIsNotNone(records[0]['input_ms'])
+
+
+if __name__ == '__main__':
+    unittest.main()